@@ -0,0 +1,237 @@
+# ─────────────────────────────────────────────
+# app/answer_cache.py
+# ─────────────────────────────────────────────
+"""
+Cache of generated answers keyed by a normalized question.
+
+Questions are lower-cased, stripped of punctuation and stop-words and
+whitespace-collapsed, so "What are the top funds for retirement clients?"
+and "top funds   for retirement clients" share one entry.  Near misses
+("retirement clients' top fund") are caught by a fuzzy layer: each entry
+keeps the per-word character 3-gram shingles of its normalized question plus a
+MinHash signature, banded for LSH so only a handful of candidates are
+compared, and a candidate whose Jaccard similarity reaches the threshold
+counts as a hit – provided both questions mention the same numbers and the
+same negation/polarity words, since "top 5 funds" and "top 10 funds", or
+"funds performing well" and "funds not performing well", are different
+questions however many letters they share.  Those words are never dropped
+as stop-words.
+
+Entries expire after a TTL and are evicted least-recently-used first.  Every
+hit adds the time the original answer took to ``seconds_saved``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from app.config import settings
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_NOT_RE = re.compile(r"n['’]t\b")  # "isn't" → "is not"
+# words that flip or rank a question: both sides must use the same ones
+_POLARITY_WORDS = frozenset(
+    """
+    not no non none nor neither never without except excluding exclude excluded
+    best worst top bottom most least high higher highest low lower lowest
+    increase increased increasing increases decrease decreased decreasing
+    decreases up down above below over under more less fewer greater
+    gain gains gained loss losses lost positive negative rise rising fall falling
+    largest smallest biggest max maximum min minimum outperform outperforming
+    underperform underperforming good bad well poorly
+    """.split()
+)
+_STOP_WORDS = frozenset(
+    """
+    a an and are as at be by can could do does for from give has have how i in
+    is it list me my of on or please show tell that the their them there these
+    this to was we were what which who why will with would you your
+    """.split()
+) - _POLARITY_WORDS
+
+_MERSENNE = (1 << 61) - 1
+_SHINGLE = 3
+
+
+def normalize_question(text: str) -> str:
+    text = _NOT_RE.sub(" not", unicodedata.normalize("NFKC", text).lower())
+    words = _PUNCT_RE.sub(" ", text).split()
+    kept = [w for w in words if w not in _STOP_WORDS]
+    return " ".join(kept or words)
+
+
+def shingles(norm: str) -> FrozenSet[str]:
+    """Character n-grams of each word (padded, so word order does not matter)."""
+    out: Set[str] = set()
+    for word in norm.split():
+        word = f"#{word}#"
+        out.update(word[i:i + _SHINGLE] for i in range(len(word) - _SHINGLE + 1))
+    return frozenset(out)
+
+
+def numbers(norm: str) -> FrozenSet[str]:
+    return frozenset(w for w in norm.split() if any(c.isdigit() for c in w))
+
+
+def polarity(norm: str) -> FrozenSet[str]:
+    return frozenset(w for w in norm.split() if w in _POLARITY_WORDS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHasher:
+    """MinHash signatures from ``num_perm`` universal hash functions."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        # deterministic coefficients: signatures are comparable across restarts
+        coeffs = []
+        state = seed
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % _MERSENNE or 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            coeffs.append((a, state % _MERSENNE))
+        self.coeffs = coeffs
+
+    def signature(self, items: FrozenSet[str]) -> Tuple[int, ...]:
+        xs = [zlib.crc32(s.encode()) for s in items] or [0]
+        return tuple(min((a * x + b) % _MERSENNE for x in xs) for a, b in self.coeffs)
+
+
+@dataclass
+class _Entry:
+    answer: Any
+    shingles: FrozenSet[str]
+    numbers: FrozenSet[str]
+    polarity: FrozenSet[str]
+    bands: Tuple[Tuple[int, Tuple[int, ...]], ...]
+    expires: float
+    cost: float  # seconds the answer took to produce
+
+
+class AnswerCache:
+    """Thread-safe TTL + LRU answer cache with MinHash/LSH near-duplicate lookup."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = settings.kb_cache_max_entries,
+        ttl: float = settings.kb_cache_ttl_seconds,
+        threshold: float = settings.kb_cache_similarity,
+        num_perm: int = 64,
+        bands: int = 16,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = self.fuzzy_hits = self.misses = self.evictions = 0
+        self.seconds_saved = 0.0
+
+    # ------------------------------------------------------------------
+    def get(self, question: str) -> Optional[Any]:
+        norm = normalize_question(question)
+        with self._lock:
+            entry = self._live(norm)
+            if entry is None and self.threshold <= 1:
+                entry = self._nearest(norm)
+                if entry is not None:
+                    self.fuzzy_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.seconds_saved += entry.cost
+            return entry.answer
+
+    def put(self, question: str, answer: Any, cost: float) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        norm = normalize_question(question)
+        sh = shingles(norm)
+        entry = _Entry(
+            answer, sh, numbers(norm), polarity(norm), self._bands(sh),
+            time.monotonic() + self.ttl, cost,
+        )
+        with self._lock:
+            if norm in self._entries:
+                self._drop(norm)
+            self._entries[norm] = entry
+            for band in entry.bands:
+                self._buckets.setdefault(band, set()).add(norm)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "seconds_saved": round(self.seconds_saved, 3),
+            }
+
+    # ------------------------------------------------------------------
+    def _bands(self, sh: FrozenSet[str]) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+        sig = self._hasher.signature(sh)
+        r = self._rows
+        return tuple((i, sig[i * r:(i + 1) * r]) for i in range(len(sig) // r))
+
+    def _live(self, norm: str) -> Optional[_Entry]:
+        entry = self._entries.get(norm)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._drop(norm)
+            return None
+        self._entries.move_to_end(norm)
+        return entry
+
+    def _nearest(self, norm: str) -> Optional[_Entry]:
+        sh, nums, pol = shingles(norm), numbers(norm), polarity(norm)
+        candidates: Set[str] = set()
+        for band in self._bands(sh):
+            candidates |= self._buckets.get(band, set())
+        best, best_score = None, self.threshold
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.numbers != nums or entry.polarity != pol:
+                continue
+            score = jaccard(sh, entry.shingles)
+            if score >= best_score:
+                best, best_score = key, score
+        return self._live(best) if best is not None else None
+
+    def _drop(self, norm: str) -> None:
+        entry = self._entries.pop(norm)
+        for band in entry.bands:
+            keys = self._buckets.get(band)
+            if keys is not None:
+                keys.discard(norm)
+                if not keys:
+                    del self._buckets[band]
@@ -0,0 +1,250 @@
+# ─────────────────────────────────────────────
+# app/athena_admission.py
+# ─────────────────────────────────────────────
+"""
+Priority admission for Athena executions.
+
+The workgroup runs a fixed number of queries at once; past that Athena
+answers ``TooManyRequestsException``.  Left alone, a burst of transaction
+scans takes every slot and a login or portfolio lookup behind it fails or
+waits for the slowest report.  :class:`AdmissionScheduler` therefore holds
+each execution until it gets one of ``ATHENA_MAX_CONCURRENT_QUERIES`` slots
+(0 = no admission control), from queueing until the query reaches a
+terminal state or is stopped.
+
+Every execution belongs to a priority class, chosen per route with
+``dependencies=[Depends(priority("report"))]`` (requests default to
+``standard``, work outside a request is ``background``).  Classes differ in
+
+* how full the workgroup may be for them to start (``ATHENA_PRIORITY_LIMITS``,
+  a fraction of the slots): reports stop at half, so the rest stays free for
+  interactive lookups however long the reports run;
+* their weight when several classes are queued (``ATHENA_PRIORITY_WEIGHTS``):
+  freed slots go round in proportion, FIFO within a class, so nobody starves;
+* how many executions may queue (``ATHENA_PRIORITY_QUEUE``).  Past that the
+  call fails straight away with :class:`AthenaBusy`, answered 429 with a
+  ``Retry-After`` estimated from how long slots are being held.
+
+Time spent queued is recorded per route and class in :mod:`app.metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Mapping, Optional
+
+from app import deadlines
+from app.config import settings
+from app.metrics import ATHENA_ADMISSION_REJECTED, ATHENA_ADMISSION_WAIT_SECONDS, current_route
+
+_priority: ContextVar[str] = ContextVar("athena_priority", default="background")
+
+
+class AthenaBusy(Exception):
+    """The execution's priority class has a full queue."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def priority(name: str = "standard"):
+    """Route dependency putting the request's Athena executions in class *name*."""
+    if name not in settings.athena_priority_weights:
+        raise ValueError(f"unknown Athena priority class {name!r}")
+
+    async def set_priority() -> None:
+        _priority.set(name)
+
+    return set_priority
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class Slot:
+    """One admitted execution; :meth:`release` (idempotent) hands the slot on."""
+
+    __slots__ = ("_release", "_started")
+
+    def __init__(self, release: Optional[Callable[[float], None]]) -> None:
+        self._release = release
+        self._started = time.monotonic()
+
+    def release(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release(time.monotonic() - self._started)
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake: Callable[[], None]) -> None:
+        self.wake = wake
+        self.granted = False
+
+
+class _Class:
+    def __init__(self, name: str, weight: float, share: float, max_queued: int) -> None:
+        self.name = name
+        self.weight = weight
+        self.share = share
+        self.max_queued = max_queued
+        self.queue: Deque[_Waiter] = collections.deque()
+        self.vtime = 0.0  # virtual finish time of its last admission
+        self.in_flight = 0
+        self.admitted = self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.queue),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionScheduler:
+    """Thread-safe gate in front of ``StartQueryExecution``, one queue per class."""
+
+    def __init__(
+        self,
+        limit: int = settings.athena_max_concurrent_queries,
+        *,
+        weights: Mapping[str, float] = settings.athena_priority_weights,
+        limits: Mapping[str, float] = settings.athena_priority_limits,
+        queues: Mapping[str, int] = settings.athena_priority_queue,
+    ) -> None:
+        self.limit = limit
+        self._classes = {
+            name: _Class(name, weight, limits.get(name, 1.0), queues.get(name, 100))
+            for name, weight in weights.items()
+        }
+        self._lock = threading.Lock()
+        self._vclock = 0.0
+        self.in_flight = 0
+        # smoothed seconds a slot is held, for Retry-After
+        self._hold_s = 1.0
+
+    # ------------------------------------------------------------------
+    def acquire(self, until: Optional[float] = None) -> Slot:
+        """Block until the current priority class is admitted (sync callers).
+
+        Raises :class:`AthenaBusy` when the class queue is full and
+        :class:`~app.deadlines.DeadlineExceeded` when *until* (monotonic)
+        passes first.
+        """
+        if self.limit <= 0:
+            return Slot(None)
+        cls, route = self._class(), current_route()
+        granted = threading.Event()
+        waiter = self._enqueue(cls, route, granted.set)
+        queued = time.perf_counter()
+        timeout = None if until is None else max(0.0, until - time.monotonic())
+        if not granted.wait(timeout) and not self._withdraw(cls, waiter):
+            raise deadlines.DeadlineExceeded("no Athena slot before the deadline")
+        ATHENA_ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - queued, route, cls.name)
+        return Slot(lambda held: self._release(cls, held))
+
+    async def aacquire(self) -> Slot:
+        """Async :meth:`acquire`; the deadline applies by cancelling the wait."""
+        if self.limit <= 0:
+            return Slot(None)
+        cls, route = self._class(), current_route()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        wake = lambda: loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+        waiter = self._enqueue(cls, route, wake)
+        queued = time.perf_counter()
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if self._withdraw(cls, waiter):
+                self._release(cls, None)  # granted as we were cancelled: pass it on
+            raise
+        ATHENA_ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - queued, route, cls.name)
+        return Slot(lambda held: self._release(cls, held))
+
+    def retry_after(self) -> float:
+        """Rough seconds until the current class could start another execution."""
+        with self._lock:
+            return self._retry_after(self._class())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "hold_seconds": round(self._hold_s, 3),
+                "classes": {name: c.stats() for name, c in self._classes.items()},
+            }
+
+    # ------------------------------------------------------------------
+    def _class(self) -> _Class:
+        name = current_priority()
+        return self._classes.get(name) or self._classes["standard"]
+
+    def _enqueue(self, cls: _Class, route: str, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(wake)
+        with self._lock:
+            if len(cls.queue) >= cls.max_queued:
+                cls.rejected += 1
+                ATHENA_ADMISSION_REJECTED.inc(route, cls.name)
+                raise AthenaBusy(
+                    f"Athena queue for {cls.name} queries is full", self._retry_after(cls)
+                )
+            if not cls.queue:
+                # an idle class resumes at the current virtual time, not with saved-up credit
+                cls.vtime = max(cls.vtime, self._vclock)
+            cls.queue.append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _withdraw(self, cls: _Class, waiter: _Waiter) -> bool:
+        """Take *waiter* out of the queue; True if it had been granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            cls.queue.remove(waiter)
+            return False
+
+    def _release(self, cls: _Class, held: Optional[float]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            cls.in_flight -= 1
+            if held is not None:
+                self._hold_s = 0.8 * self._hold_s + 0.2 * held
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued waiters, lowest virtual time first (lock held)."""
+        while True:
+            best: Optional[_Class] = None
+            for cls in self._classes.values():
+                if cls.queue and self.in_flight < self._cap(cls):
+                    if best is None or cls.vtime < best.vtime:
+                        best = cls
+            if best is None:
+                return
+            waiter = best.queue.popleft()
+            self._vclock = best.vtime
+            best.vtime += 1 / best.weight
+            best.in_flight += 1
+            best.admitted += 1
+            self.in_flight += 1
+            waiter.granted = True
+            waiter.wake()
+
+    def _cap(self, cls: _Class) -> int:
+        """Slots in use beyond which *cls* waits."""
+        return max(1, int(self.limit * cls.share))
+
+    def _retry_after(self, cls: _Class) -> float:
+        """Rough seconds until the class queue has drained (lock held)."""
+        return max(1.0, len(cls.queue) * self._hold_s / self._cap(cls))
@@ -2,60 +2,801 @@
 # app/athena_client.py
 # ─────────────────────────────────────────────
 """
-Thin synchronous wrapper around boto3-Athena for quick CRUD-ish queries.
+Thin wrapper around boto3-Athena for quick CRUD-ish queries.
+
+``query`` is the original blocking API; ``aquery`` is the asyncio flavour used
+by the routers.  Both poll with an adaptive interval: a few milliseconds at
+first, backing off towards ``ATHENA_POLL_MAX_MS``, and jumping straight to the
+expected finish when an earlier run of the same SQL told us how long it takes.
+The async flavour only hands the short boto3 round-trips to a worker thread –
+the waiting in between is an ``asyncio.sleep`` so no thread is parked on it.
+
+Successful results are kept in a :class:`~app.query_cache.QueryCache` keyed by
+normalized SQL – or ``(statement, params)`` for the prepared statements in
+:mod:`app.statements` – plus database and workgroup; on a local miss Athena's
+own result reuse still lets a repeated statement skip the rescan.  Misses for the same key
+that overlap in time are coalesced (:mod:`app.singleflight`): later callers
+wait for the execution already in flight rather than starting another.
+``query_many`` / ``aquery_many`` start several queries at once and poll them
+together with ``BatchGetQueryExecution``, so an endpoint that needs more than
+one result waits for the slowest query rather than the sum of them.
+``apage`` returns one page plus the ``(QueryExecutionId, NextToken)`` to resume
+from, which the cursor pagination in :mod:`app.pagination` hands back later.
+
+``iter_rows`` / ``aiter_pages`` follow ``NextToken`` lazily for callers that
+stream large results instead of buffering them.  Once a result spills past the
+first page and its CSV is at least ``S3_BULK_MIN_BYTES``, the remaining rows are
+read straight from the output object in S3 (see :mod:`app.s3_results`).  Either
+way cells come back typed according to the result's column metadata
+(:mod:`app.decoding`).
+
+Every execution's ``Statistics``, poll count and result-read time are
+recorded against the calling route (:mod:`app.metrics`).
+
+No call waits past the request's deadline (:mod:`app.deadlines`; calls made
+outside a request get ``ATHENA_QUERY_TIMEOUT_SECONDS``).  When the deadline
+passes, the client disconnects or the last caller sharing an execution is
+otherwise cancelled, the execution is stopped with ``StopQueryExecution``
+rather than left to hold a workgroup slot.
+
+Each execution first waits for a workgroup slot from the priority
+:class:`~app.athena_admission.AdmissionScheduler`, and holds it until it
+finishes, so report scans cannot crowd out interactive lookups.
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import re
+import threading
 import time
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from typing import (
+    Any, AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple,
+    Union,
+)
 
-import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 
+from app import aws_clients, deadlines
+from app.athena_admission import AdmissionScheduler, AthenaBusy, Slot
 from app.config import settings
+from app.decoding import Converter, column_converters, decode_result_rows, decode_value_rows
+from app.metrics import ATHENA_CANCELLED, ATHENA_FETCH_SECONDS, current_route, record_athena
+from app.query_cache import QueryCache, tables_in
+from app.result_set import ResultSet, Row
+from app.s3_results import S3ResultReader
+from app.singleflight import SingleFlight
+from app.statements import STATEMENTS, BoundStatement, Statement
+
+logger = logging.getLogger("athena")
+
+_TERMINAL_STATES = {"SUCCEEDED", "FAILED", "CANCELLED"}
+_PAGE_SIZE = 1_000  # GetQueryResults hard maximum
+_STATUS_BATCH = 50  # BatchGetQueryExecution hard maximum
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so formatting differences map to the same key."""
+    return _WS_RE.sub(" ", sql).strip()
+
+
+class _PollSchedule:
+    """Geometric back-off between status polls, nudged by a runtime estimate."""
+
+    def __init__(self, estimate_ms: Optional[float]) -> None:
+        self._delay_ms = float(settings.athena_poll_initial_ms)
+        self._estimate_ms = estimate_ms
+        self._started = time.monotonic()
+        self.polls = 1  # the status call that found the query finished
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next ``get_query_execution`` call."""
+        self.polls += 1
+        delay_ms = self._delay_ms
+        self._delay_ms = min(
+            self._delay_ms * settings.athena_poll_backoff,
+            float(settings.athena_poll_max_ms),
+        )
+        if self._estimate_ms is not None:
+            elapsed_ms = (time.monotonic() - self._started) * 1000
+            remaining_ms = self._estimate_ms - elapsed_ms
+            # Sleep right up to the expected finish instead of polling through it.
+            if remaining_ms > delay_ms:
+                delay_ms = min(remaining_ms, float(settings.athena_poll_max_ms))
+        return delay_ms / 1000
+
+
+@dataclass(frozen=True)
+class _Query:
+    """What to send to Athena plus the keys it is cached and estimated under."""
+
+    text: str
+    params: Tuple[str, ...]
+    key: Hashable  # result identity: normalized SQL or (statement, params)
+    shape: str  # runtime-estimate identity: normalized SQL or statement name
+    tables: Tuple[str, ...]
+
+
+QueryLike = Union[str, BoundStatement]
+
+
+def _has_header(meta: Dict[str, Any]) -> bool:
+    """Whether the result of an execution starts with a row of column labels.
+
+    Query (``DML``) results do; ``SHOW``, ``DESCRIBE`` and other ``UTILITY``
+    or ``DDL`` results do not, and dropping their first row would lose data.
+    """
+    return meta.get("StatementType", "DML") == "DML"
 
 
 class AthenaClient:
-    """Run SQL in Athena and return the first *N* rows as list-of-dict."""
+    """Run SQL in Athena and return rows as a :class:`ResultSet` (or stream them).
 
-    def __init__(self) -> None:
-        self._athena = boto3.client("athena", region_name=settings.aws_region)
+    Every query method accepts either raw SQL or a statement bound with
+    :func:`app.statements.bind`.
+    """
+
+    def __init__(
+        self,
+        athena: Any = None,
+        *,
+        cache: Optional[QueryCache] = None,
+        s3: Any = None,
+        admission: Optional[AdmissionScheduler] = None,
+    ) -> None:
+        self._client = athena  # built on first use, see _athena
+        self.cache = cache if cache is not None else QueryCache()
+        # workgroup slots, shared out by priority class
+        self.admission = admission if admission is not None else AdmissionScheduler()
+        self._s3 = s3
+        self._s3_reader: Optional[S3ResultReader] = None
+        # identical concurrent misses share one Athena execution
+        self.flights = SingleFlight()
+        # statement names that exist as prepared statements in the workgroup
+        self._prepared: Set[str] = set()
+        # query shape -> smoothed total runtime (ms) of previous executions
+        self._runtime_ms: Dict[str, float] = {}
+        # executions stopped early, by reason (deadline, disconnect, abandoned)
+        self.cancelled: Dict[str, int] = {}
 
     # ------------------------------------------------------------------
-    def query(self, sql: str, *, wait_ms: int = 1_000) -> List[Dict[str, Any]]:
-        """Synchronously execute *sql* and return ≤MAX_ROWS rows."""
-        res = self._athena.start_query_execution(
-            QueryString=sql,
-            QueryExecutionContext={"Database": settings.athena_database},
-            ResultConfiguration={"OutputLocation": settings.athena_output},
-            WorkGroup=settings.athena_workgroup,
+    def query(
+        self, sql: QueryLike, *, ttl: Optional[float] = None, max_rows: Optional[int] = None
+    ) -> ResultSet:
+        """Synchronously execute *sql* and return ≤MAX_ROWS rows.
+
+        *ttl* overrides the per-table cache lifetime (``0`` bypasses the cache);
+        *max_rows* overrides ``MAX_ROWS`` for callers that bound the SQL themselves.
+        The returned set may be shared with the cache, so treat it as read-only.
+        """
+        q = self._resolve(sql)
+        cache_key = self._cache_key(q)
+        max_rows = max_rows or settings.max_query_rows
+        rows = self._cached(cache_key, max_rows) if ttl != 0 else None
+        if rows is not None:
+            return rows
+
+        def run() -> ResultSet:
+            rows = self._collect(self._execute(q), max_rows)
+            self.cache.put(cache_key, rows, q.tables, ttl=ttl)
+            return rows
+
+        return self.flights.do((cache_key, max_rows), run)
+
+    async def aquery(
+        self, sql: QueryLike, *, ttl: Optional[float] = None, max_rows: Optional[int] = None
+    ) -> ResultSet:
+        """Async variant of :meth:`query`; only the API calls use a thread."""
+        q = self._resolve(sql)
+        cache_key = self._cache_key(q)
+        max_rows = max_rows or settings.max_query_rows
+        rows = self._cached(cache_key, max_rows) if ttl != 0 else None
+        if rows is not None:
+            return rows
+
+        return await deadlines.within(
+            self.flights.ado((cache_key, max_rows), lambda: self._arun(q, max_rows, ttl)),
+            settings.athena_query_timeout_seconds,
         )
-        qid = res["QueryExecutionId"]
 
-        # Poll status
-        while True:
-            meta = self._athena.get_query_execution(QueryExecutionId=qid)["QueryExecution"]
-            state = meta["Status"]["State"]
-            if state in {"SUCCEEDED", "FAILED", "CANCELLED"}:
-                break
-            time.sleep(wait_ms / 1000)
+    def query_many(
+        self,
+        sqls: Sequence[QueryLike],
+        *,
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = None,
+    ) -> List[ResultSet]:
+        """Run several queries at once; results come back in the order given.
+
+        Cache misses are all started before any of them is waited on and are
+        then polled together, so the wall time is that of the slowest query.
+        """
+        qs = [self._resolve(s) for s in sqls]
+        max_rows = max_rows or settings.max_query_rows
+        keys = [self._cache_key(q) for q in qs]
+        found = {k: self._cached(k, max_rows) for k in keys} if ttl != 0 else {}
+        todo = {k: q for k, q in zip(keys, qs) if found.get(k) is None}
+        if todo:
+            metas = self._execute_many(list(todo.values()))
+            for (k, q), meta in zip(todo.items(), metas):
+                found[k] = self._collect(meta, max_rows)
+                self.cache.put(k, found[k], q.tables, ttl=ttl)
+        return [found[k] for k in keys]
+
+    async def aquery_many(
+        self,
+        sqls: Sequence[QueryLike],
+        *,
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = None,
+    ) -> List[ResultSet]:
+        """Async variant of :meth:`query_many`.
+
+        Queries already running for another caller are joined rather than
+        started again, just as with :meth:`aquery`.
+        """
+        qs = [self._resolve(s) for s in sqls]
+        max_rows = max_rows or settings.max_query_rows
+        keys = [(self._cache_key(q), max_rows) for q in qs]
+        found = {k: self._cached(k[0], max_rows) for k in keys} if ttl != 0 else {}
+        todo = {
+            k: q for k, q in zip(keys, qs)
+            if found.get(k) is None and not self.flights.running(k)
+        }
+        batch = asyncio.ensure_future(self._arun_many(todo, max_rows, ttl)) if todo else None
+        waiting = [len(todo)]
+
+        async def pick(k: Hashable) -> ResultSet:
+            try:
+                return (await asyncio.shield(batch))[k]
+            except asyncio.CancelledError as e:
+                # every query of the batch abandoned: stop the batch too
+                waiting[0] -= 1
+                if not waiting[0] and not batch.done():
+                    batch.cancel(e.args[0] if e.args else None)
+                raise
+
+        async def one(k: Hashable, q: _Query) -> ResultSet:
+            rows = found.get(k)
+            if rows is not None:
+                return rows
+            if k in todo:
+                return await self.flights.ado(k, lambda: pick(k))
+            return await self.flights.ado(k, lambda: self._arun(q, max_rows, ttl))
+
+        async def every() -> List[ResultSet]:
+            # a coroutine rather than the bare gather future, whose CancelledError
+            # wait_for would leave unretrieved
+            return list(await asyncio.gather(*(one(k, q) for k, q in zip(keys, qs))))
+
+        return await deadlines.within(every(), settings.athena_query_timeout_seconds)
+
+    async def apage(
+        self,
+        sql: Optional[QueryLike],
+        limit: int,
+        *,
+        resume: Optional[Tuple[str, Optional[str]]] = None,
+    ) -> Tuple[ResultSet, str, Optional[str]]:
+        """First *limit* rows of *sql* – or the next *limit* rows of an earlier
+        execution when *resume* is its ``(QueryExecutionId, NextToken)``.
+
+        Returns the rows plus the execution id and token to continue from
+        (``None`` once the result is exhausted).  First pages are cached like
+        :meth:`aquery` results; resumed pages are plain ``GetQueryResults`` calls.
+        """
+        if resume is not None:
+            return await asyncio.to_thread(self._read_page, resume[0], resume[1], limit)
+        q = self._resolve(sql)
+        key = (self._cache_key(q), "page", limit)
+        page = self.cache.get(key)
+        if page is not None:
+            return page
+
+        async def run() -> Tuple[ResultSet, str, Optional[str]]:
+            meta = await self._aexecute(q)
+            page = await asyncio.to_thread(self._read_page, meta["QueryExecutionId"], None, limit)
+            self.cache.put(key, page, q.tables, nbytes=page[0].nbytes)
+            return page
+
+        return await deadlines.within(
+            self.flights.ado(key, run), settings.athena_query_timeout_seconds
+        )
+
+    def execute(self, sql: str, *, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a statement that returns no rows – DDL, ``CREATE TABLE AS``,
+        ``INSERT INTO`` – and return its ``QueryExecution``.
+
+        Nothing is cached or coalesced; *timeout* (seconds) replaces the usual
+        deadline for long rewrites.  Raises like :meth:`query` on failure.
+        """
+        until = None if timeout is None else time.monotonic() + timeout
+        return self._execute(self._resolve(sql), until)
+
+    def iter_rows(self, sql: QueryLike) -> Iterator[Row]:
+        """Yield every row of *sql*, fetching result pages only as they are consumed.
+
+        Unlike :meth:`query` there is no row cap and nothing is buffered beyond
+        the current page, so results are not stored in the cache either.
+        """
+        q = self._resolve(sql)
+        cached = self._cached(self._cache_key(q))
+        if cached is not None:
+            yield from cached
+            return
+        for rows in self._pages(self._execute(q)):
+            yield from rows
+
+    async def aiter_pages(self, sql: QueryLike) -> AsyncIterator[ResultSet]:
+        """Async counterpart of :meth:`iter_rows` yielding one result page at a time."""
+        q = self._resolve(sql)
+        cached = self._cached(self._cache_key(q))
+        if cached is not None:
+            yield cached
+            return
+        pages = self._pages(
+            await deadlines.within(self._aexecute(q), settings.athena_query_timeout_seconds)
+        )
+        # held by the worker thread while it fetches a page; a cancelled
+        # consumer can leave that fetch running, and the generator must not
+        # be closed under it
+        busy = threading.Lock()
+
+        def step() -> Optional[ResultSet]:
+            with busy:
+                return next(pages, None)
+
+        def close() -> None:
+            with busy:
+                pages.close()
+
+        try:
+            while True:
+                rows = await asyncio.to_thread(step)
+                if rows is None:
+                    return
+                yield rows
+        finally:
+            if busy.acquire(blocking=False):
+                try:
+                    pages.close()
+                finally:
+                    busy.release()
+            else:
+                # close once the fetch in flight returns; nobody waits for it
+                asyncio.get_running_loop().run_in_executor(None, close)
 
+    async def aiter_rows(self, sql: QueryLike) -> AsyncIterator[Row]:
+        """Row-at-a-time view over :meth:`aiter_pages`."""
+        async for rows in self.aiter_pages(sql):
+            for row in rows:
+                yield row
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats(),
+            "singleflight": self.flights.stats(),
+            "cancelled": dict(self.cancelled),
+            "admission": self.admission.stats(),
+        }
+
+    def invalidate(self, table: str) -> int:
+        """Forget cached results that read *table* (e.g. after a data load)."""
+        return self.cache.invalidate_table(table)
+
+    def prepare_statements(self, statements: Iterable[Statement] = ()) -> int:
+        """Create (or refresh) Athena prepared statements for the registry.
+
+        Statements that cannot be prepared – e.g. missing IAM permissions –
+        still run, as inline parameterized SQL.  Returns how many were prepared.
+        """
+        for stmt in statements or STATEMENTS.values():
+            kwargs = {
+                "StatementName": stmt.name,
+                "WorkGroup": settings.athena_workgroup,
+                "QueryStatement": stmt.sql,
+            }
+            try:
+                try:
+                    self._athena.create_prepared_statement(**kwargs)
+                except ClientError as e:
+                    if "already exists" not in str(e):
+                        raise
+                    self._athena.update_prepared_statement(**kwargs)
+            except ClientError as e:
+                logger.warning("Could not prepare statement %s: %s", stmt.name, e)
+                self._prepared.discard(stmt.name)
+            else:
+                self._prepared.add(stmt.name)
+        return len(self._prepared)
+
+    # ------------------------------------------------------------------
+    @property
+    def _athena(self) -> Any:
+        if self._client is None:
+            self._client = aws_clients.client("athena")
+        return self._client
+
+    def _resolve(self, sql: QueryLike) -> _Query:
+        if isinstance(sql, BoundStatement):
+            stmt = sql.statement
+            text = f"EXECUTE {stmt.name}" if stmt.name in self._prepared else stmt.sql
+            return _Query(text, sql.params, (stmt.name, sql.params), stmt.name, stmt.tables)
+        key = normalize_sql(sql)
+        return _Query(sql, (), key, key, tables_in(key))
+
+    @staticmethod
+    def _cache_key(q: _Query) -> Tuple[Hashable, str, str]:
+        return (q.key, settings.athena_database, settings.athena_workgroup)
+
+    def _cached(self, key: Hashable, max_rows: Optional[int] = None) -> Optional[ResultSet]:
+        """The cached result under *key*, unless it lacks rows the caller wants.
+
+        A result cut off at a smaller ``max_rows`` only serves callers capped
+        at or below its length; *max_rows* ``None`` means every row (the
+        streaming readers).
+        """
+        rows = self.cache.get(key)
+        if rows is None or not rows.truncated:
+            return rows
+        return rows if max_rows is not None and len(rows) >= max_rows else None
+
+    def _start(self, q: _Query) -> str:
+        kwargs: Dict[str, Any] = {}
+        if q.params:
+            kwargs["ExecutionParameters"] = list(q.params)
+        if settings.athena_result_reuse_minutes > 0:
+            kwargs["ResultReuseConfiguration"] = {
+                "ResultReuseByAgeConfiguration": {
+                    "Enabled": True,
+                    "MaxAgeInMinutes": settings.athena_result_reuse_minutes,
+                }
+            }
+        try:
+            res = self._athena.start_query_execution(
+                QueryString=q.text,
+                QueryExecutionContext={"Database": settings.athena_database},
+                ResultConfiguration={"OutputLocation": settings.athena_output},
+                WorkGroup=settings.athena_workgroup,
+                **kwargs,
+            )
+        except ClientError as e:
+            # still over the quota after botocore's retries (other clients share the workgroup)
+            if e.response.get("Error", {}).get("Code") == "TooManyRequestsException":
+                raise AthenaBusy("Athena workgroup is at its query limit", self.admission.retry_after()) from e
+            raise
+        return res["QueryExecutionId"]
+
+    def _status(self, qid: str) -> Dict[str, Any]:
+        return self._athena.get_query_execution(QueryExecutionId=qid)["QueryExecution"]
+
+    def _statuses(self, qids: List[str]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for i in range(0, len(qids), _STATUS_BATCH):
+            res = self._athena.batch_get_query_execution(
+                QueryExecutionIds=qids[i:i + _STATUS_BATCH]
+            )
+            out.extend(res.get("QueryExecutions", []))
+        return out
+
+    def _settle(self, pending: Dict[str, _PollSchedule], done: Dict[str, Dict[str, Any]]) -> float:
+        """One status round for *pending*; returns the delay before the next round."""
+        for meta in self._statuses(list(pending)):
+            if meta["Status"]["State"] in _TERMINAL_STATES:
+                done[meta["QueryExecutionId"]] = meta
+                pending.pop(meta["QueryExecutionId"], None)
+        return min((s.next_delay() for s in pending.values()), default=0.0)
+
+    def _finish_many(
+        self,
+        qs: List[_Query],
+        qids: List[str],
+        schedules: List[_PollSchedule],
+        done: Dict[str, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        metas = [done[qid] for qid in qids]
+        for q, meta, schedule in zip(qs, metas, schedules):
+            self._finish(q.shape, meta, schedule.polls)
+        return metas
+
+    def _execute(self, q: _Query, until: Optional[float] = None) -> Dict[str, Any]:
+        """Start *q*, block until it finishes and return its ``QueryExecution``."""
+        until = until or self._until()
+        (qid, slot), = self._start_all([q], until).items()
+        schedule = _PollSchedule(self._runtime_ms.get(q.shape))
+        try:
+            while True:
+                meta = self._status(qid)
+                if meta["Status"]["State"] in _TERMINAL_STATES:
+                    break
+                self._check_deadline(until, [qid])
+                time.sleep(min(schedule.next_delay(), max(0.0, until - time.monotonic())))
+        finally:
+            slot.release()
+        self._finish(q.shape, meta, schedule.polls)
+        return meta
+
+    async def _aexecute(self, q: _Query) -> Dict[str, Any]:
+        """Async :meth:`_execute`; the deadline is applied by the caller, by cancelling."""
+        qid, slot = await self._astart(q)
+        schedule = _PollSchedule(self._runtime_ms.get(q.shape))
+        try:
+            while True:
+                meta = await asyncio.to_thread(self._status, qid)
+                if meta["Status"]["State"] in _TERMINAL_STATES:
+                    break
+                await asyncio.sleep(schedule.next_delay())
+        except asyncio.CancelledError as e:
+            self._abandon([qid], deadlines.reason_for(e))
+            raise
+        finally:
+            slot.release()
+        self._finish(q.shape, meta, schedule.polls)
+        return meta
+
+    def _start_all(self, qs: List[_Query], until: float) -> Dict[str, Slot]:
+        """Admit and start every query in *qs*: ``{QueryExecutionId: slot}`` in order.
+
+        If one cannot start, those already running are stopped again.
+        """
+        started: Dict[str, Slot] = {}
+        try:
+            for q in qs:
+                slot = self.admission.acquire(until)
+                try:
+                    started[self._start(q)] = slot
+                except BaseException:
+                    slot.release()
+                    raise
+        except BaseException:
+            for qid, slot in started.items():
+                self._count_cancelled("abandoned")
+                self._stop(qid)
+                slot.release()
+            raise
+        return started
+
+    async def _astart(self, q: _Query) -> Tuple[str, Slot]:
+        """Wait for a slot and start *q*; if cancelled meanwhile, stop it once it has an id."""
+        slot = await self.admission.aacquire()
+        starting = asyncio.ensure_future(asyncio.to_thread(self._start, q))
+        try:
+            return await asyncio.shield(starting), slot
+        except asyncio.CancelledError as e:
+            reason = deadlines.reason_for(e)
+
+            def stop(t: "asyncio.Future[str]") -> None:
+                if not t.cancelled() and t.exception() is None:
+                    self._abandon([t.result()], reason)
+                slot.release()
+
+            starting.add_done_callback(stop)
+            raise
+        except BaseException:
+            slot.release()
+            raise
+
+    async def _astart_all(self, qs: List[_Query]) -> Dict[str, Slot]:
+        """Async :meth:`_start_all`; the queries queue for their slots side by side."""
+        started = await asyncio.gather(*(self._astart(q) for q in qs), return_exceptions=True)
+        failed = [r for r in started if isinstance(r, BaseException)]
+        if failed:
+            running = [r for r in started if not isinstance(r, BaseException)]
+            self._abandon([qid for qid, _ in running], "abandoned")
+            for _, slot in running:
+                slot.release()
+            raise failed[0]
+        return dict(started)
+
+    @staticmethod
+    def _until() -> float:
+        left = deadlines.remaining()
+        return time.monotonic() + (settings.athena_query_timeout_seconds if left is None else left)
+
+    def _check_deadline(self, until: float, qids: List[str]) -> None:
+        if time.monotonic() >= until:
+            for qid in qids:
+                self._count_cancelled("deadline")
+                self._stop(qid)
+            raise deadlines.DeadlineExceeded(f"Athena query {qids[0]} still running at the deadline")
+
+    def _abandon(self, qids: List[str], reason: str) -> None:
+        """Stop executions nobody waits for any more, without waiting for the calls."""
+        loop = asyncio.get_running_loop()
+        for qid in qids:
+            self._count_cancelled(reason)
+            loop.run_in_executor(None, self._stop, qid)
+
+    def _count_cancelled(self, reason: str) -> None:
+        self.cancelled[reason] = self.cancelled.get(reason, 0) + 1
+        ATHENA_CANCELLED.inc(current_route(), reason)
+
+    def _stop(self, qid: str) -> None:
+        try:
+            self._athena.stop_query_execution(QueryExecutionId=qid)
+        except (BotoCoreError, ClientError) as e:
+            logger.warning("Could not stop Athena query %s: %s", qid, e)
+
+    def _execute_many(self, qs: List[_Query]) -> List[Dict[str, Any]]:
+        """Start every query in *qs*, then poll them together until all finish."""
+        until = self._until()
+        slots = self._start_all(qs, until)
+        qids = list(slots)
+        schedules = [_PollSchedule(self._runtime_ms.get(q.shape)) for q in qs]
+        pending = dict(zip(qids, schedules))
+        done: Dict[str, Dict[str, Any]] = {}
+        try:
+            while pending:
+                delay = self._settle(pending, done)
+                for qid in done:
+                    slots[qid].release()
+                if pending:
+                    self._check_deadline(until, list(pending))
+                    time.sleep(min(delay, max(0.0, until - time.monotonic())))
+        finally:
+            for slot in slots.values():
+                slot.release()
+        return self._finish_many(qs, qids, schedules, done)
+
+    async def _aexecute_many(self, qs: List[_Query]) -> List[Dict[str, Any]]:
+        slots = await self._astart_all(qs)
+        qids = list(slots)
+        schedules = [_PollSchedule(self._runtime_ms.get(q.shape)) for q in qs]
+        pending = dict(zip(qids, schedules))
+        done: Dict[str, Dict[str, Any]] = {}
+        try:
+            while pending:
+                delay = await asyncio.to_thread(self._settle, pending, done)
+                for qid in done:
+                    slots[qid].release()
+                if pending:
+                    await asyncio.sleep(delay)
+        except asyncio.CancelledError as e:
+            self._abandon(list(pending), deadlines.reason_for(e))
+            raise
+        finally:
+            for slot in slots.values():
+                slot.release()
+        return self._finish_many(qs, qids, schedules, done)
+
+    async def _arun(self, q: _Query, max_rows: int, ttl: Optional[float]) -> ResultSet:
+        """Execute *q*, collect it and cache the result."""
+        meta = await self._aexecute(q)
+        rows = await asyncio.to_thread(self._collect, meta, max_rows)
+        self.cache.put(self._cache_key(q), rows, q.tables, ttl=ttl)
+        return rows
+
+    async def _arun_many(
+        self, todo: Dict[Hashable, _Query], max_rows: int, ttl: Optional[float]
+    ) -> Dict[Hashable, ResultSet]:
+        metas = await self._aexecute_many(list(todo.values()))
+        sets = await asyncio.gather(*(asyncio.to_thread(self._collect, m, max_rows) for m in metas))
+        for q, rows in zip(todo.values(), sets):
+            self.cache.put(self._cache_key(q), rows, q.tables, ttl=ttl)
+        return dict(zip(todo, sets))
+
+    def _finish(self, key: str, meta: Dict[str, Any], polls: int) -> None:
+        """Record the execution; raise on failure, otherwise remember how long this SQL took."""
+        record_athena(meta, polls)
+        state = meta["Status"]["State"]
         if state != "SUCCEEDED":
             reason = meta["Status"].get("StateChangeReason", "unknown")
             raise RuntimeError(f"Athena query failed ({state}): {reason}")
 
-        # Fetch first page (1 000 rows max by default)
-        page = self._athena.get_query_results(
-            QueryExecutionId=qid, MaxResults=settings.max_query_rows
-        )
+        stats = meta.get("Statistics") or {}
+        took = stats.get("TotalExecutionTimeInMillis") or stats.get("EngineExecutionTimeInMillis")
+        if took is None:
+            return
+        if len(self._runtime_ms) >= settings.athena_runtime_estimates and key not in self._runtime_ms:
+            self._runtime_ms.clear()
+        prev = self._runtime_ms.get(key)
+        self._runtime_ms[key] = float(took) if prev is None else 0.7 * prev + 0.3 * took
 
-        columns = [c["Label"] for c in page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]]
-        rows: List[Dict[str, Any]] = []
-        for r in page["ResultSet"]["Rows"][1:]:  # skip header row
-            rows.append(
-                {
-                    col: (r["Data"][idx].get("VarCharValue") if idx < len(r["Data"]) else None)
-                    for idx, col in enumerate(columns)
-                }
+    def _fetch_page(
+        self, qid: str, token: Optional[str], max_results: int = _PAGE_SIZE, header: bool = True
+    ) -> Tuple[List[str], List[Converter], ResultSet, Optional[str]]:
+        """One ``get_query_results`` page: labels, converters, typed rows, next token.
+
+        *header*: the result starts with a label row (see :func:`_has_header`).
+        """
+        kwargs: Dict[str, Any] = {"QueryExecutionId": qid, "MaxResults": max_results}
+        if token:
+            kwargs["NextToken"] = token
+        page = self._athena.get_query_results(**kwargs)
+
+        info = page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+        columns = [c["Label"] for c in info]
+        converters = column_converters(info)
+        data = page["ResultSet"]["Rows"]
+        if token is None and header:
+            data = data[1:]
+        rows = ResultSet.from_columns(columns, decode_result_rows(data, converters))
+        return columns, converters, rows, page.get("NextToken")
+
+    def _pages(
+        self, meta: Dict[str, Any], first_page_size: int = _PAGE_SIZE
+    ) -> Iterator[ResultSet]:
+        """Yield the result of a finished execution page by page.
+
+        The first page always comes from ``GetQueryResults`` (cheap for small
+        results, and it carries the column metadata).  If there is more and the
+        CSV is big enough, the rest is streamed from S3 instead.
+        """
+        qid = meta["QueryExecutionId"]
+        header = _has_header(meta)
+        columns, converters, rows, token = self._fetch_page(qid, None, first_page_size, header)
+        yield rows
+        if token is None:
+            return
+
+        # only query results are CSV; SHOW / DDL output is plain text
+        uri = (meta.get("ResultConfiguration") or {}).get("OutputLocation")
+        bulk = header and uri and settings.s3_bulk_min_bytes > 0
+        size = self._bulk_size(uri) if bulk else 0
+        if size and size >= settings.s3_bulk_min_bytes:
+            batch: List[List[Optional[str]]] = []
+            for values in self._bulk_reader().iter_rows(uri, size=size, skip=len(rows)):
+                batch.append(values)
+                if len(batch) == _PAGE_SIZE:
+                    yield ResultSet.from_columns(columns, decode_value_rows(batch, converters))
+                    batch = []
+            if batch:
+                yield ResultSet.from_columns(columns, decode_value_rows(batch, converters))
+            return
+
+        while token is not None:
+            _, _, rows, token = self._fetch_page(qid, token)
+            yield rows
+
+    def _read_page(
+        self, qid: str, token: Optional[str], limit: int
+    ) -> Tuple[ResultSet, str, Optional[str]]:
+        """Exactly *limit* rows (fewer at the end) from *token* on, plus the token after them."""
+        started = time.perf_counter()
+        rows: Optional[ResultSet] = None
+        while True:
+            want = limit - (len(rows) if rows is not None else 0)
+            size = min(_PAGE_SIZE, want + (1 if token is None else 0))  # +1: header row
+            _, _, page, token = self._fetch_page(qid, token, size)
+            if rows is None:
+                rows = page
+            else:
+                rows.extend(page)
+            if token is None or len(rows) >= limit:
+                ATHENA_FETCH_SECONDS.observe(time.perf_counter() - started, current_route())
+                return rows, qid, token
+
+    def _bulk_reader(self) -> S3ResultReader:
+        if self._s3_reader is None:
+            self._s3_reader = S3ResultReader(self._s3)
+        return self._s3_reader
+
+    def _bulk_size(self, uri: str) -> int:
+        """Size of the result CSV, or 0 when S3 can't be read (stay on GetQueryResults)."""
+        try:
+            return self._bulk_reader().size(uri)
+        except (BotoCoreError, ClientError) as e:
+            logger.warning("Bulk result download unavailable for %s: %s", uri, e)
+            return 0
+
+    def _collect(self, meta: Dict[str, Any], max_rows: int) -> ResultSet:
+        """Gather pages until the result or *max_rows* is exhausted."""
+        started = time.perf_counter()
+        pages = self._pages(meta, min(_PAGE_SIZE, max_rows + 1))  # +1: header row
+        rows = next(pages)
+        for page in pages:
+            rows.extend(page)
+            if len(rows) > max_rows:
+                pages.close()
+                break
+        if len(rows) > max_rows:
+            rows.truncate(max_rows)
+            logger.warning(
+                "Athena result %s truncated at %d rows; use iter_rows() or raise MAX_ROWS",
+                meta["QueryExecutionId"], max_rows,
             )
+        ATHENA_FETCH_SECONDS.observe(time.perf_counter() - started, current_route())
         return rows
@@ -0,0 +1,161 @@
+# ─────────────────────────────────────────────
+# app/aws_clients.py
+# ─────────────────────────────────────────────
+"""
+One shared, tuned boto3 client per AWS service.
+
+boto3's defaults – 10 pooled connections, "legacy" retries, a 60 s read
+timeout – are sized for a script, not for a server where dozens of worker
+threads poll Athena and wait on Bedrock at the same time.  Once more threads
+than pooled connections talk to one service, every extra request opens a new
+TLS connection and throws it away afterwards.
+
+:func:`client` therefore builds each service's client once, from one private
+session (creating clients from the shared default session is not
+thread-safe), with
+
+* ``max_pool_connections`` covering every thread that can be inside a boto3
+  call at once (``AWS_MAX_POOL_CONNECTIONS``, 0 = work it out),
+* connect/read timeouts per service (``AWS_READ_TIMEOUTS``), and
+* botocore's ``adaptive`` retry mode, which also rate-limits the client
+  after throttles.  Bedrock clients make a single attempt instead:
+  :mod:`app.bedrock_governor` retries them and must see every throttle.
+
+Clients are thread-safe once built and are shared by all callers.  Each one
+counts the requests it has in flight, so :func:`stats` (``GET
+/admin/aws``) shows how close a pool comes to saturation.
+
+Nothing here imports boto3 until the first client is asked for, which keeps
+it out of the import of :mod:`app.main`; :func:`warm_up` builds the clients
+(and resolves credentials) ahead of the first request instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+logger = logging.getLogger("aws")
+
+# services whose retries belong to app.bedrock_governor
+GOVERNED = {"bedrock-agent-runtime", "bedrock-runtime"}
+# what the routers use, built by warm_up()
+SERVICES = ("athena", "bedrock-agent-runtime", "bedrock-runtime", "quicksight")
+
+# anyio's default thread limit, which runs the sync routes (kb, quicksight)
+_SYNC_ROUTE_THREADS = 40
+
+_lock = threading.Lock()
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_pools: Dict[str, "_PoolGauge"] = {}
+
+
+class _PoolGauge:
+    """In-flight request count of one client, fed by botocore events."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.in_flight = self.peak = 0
+        self.requests = self.saturated = 0
+        self._lock = threading.Lock()
+
+    def sent(self, **_: Any) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+            self.peak = max(self.peak, self.in_flight)
+            if self.in_flight > self.size:
+                self.saturated += 1  # no idle pooled connection: a throwaway one is opened
+
+    def received(self, **_: Any) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.size,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak,
+            "requests": self.requests,
+            "saturated_requests": self.saturated,
+        }
+
+
+def pool_size() -> int:
+    """Connections per client: ``AWS_MAX_POOL_CONNECTIONS`` or every thread that may call AWS."""
+    if settings.aws_max_pool_connections > 0:
+        return settings.aws_max_pool_connections
+    to_thread_workers = min(32, (os.cpu_count() or 1) + 4)  # asyncio's default executor
+    return to_thread_workers + _SYNC_ROUTE_THREADS + settings.s3_bulk_concurrency
+
+
+def config_for(service: str) -> Config:
+    from botocore.config import Config
+
+    retries = (
+        {"total_max_attempts": 1, "mode": "standard"}
+        if service in GOVERNED
+        else {"total_max_attempts": settings.aws_max_attempts, "mode": "adaptive"}
+    )
+    return Config(
+        region_name=settings.aws_region,
+        max_pool_connections=pool_size(),
+        connect_timeout=settings.aws_connect_timeout_seconds,
+        read_timeout=settings.aws_read_timeouts.get(service, settings.aws_read_timeout_seconds),
+        retries=retries,
+        tcp_keepalive=True,
+    )
+
+
+def session() -> boto3.session.Session:
+    """The session every shared client is built from (credentials resolve once)."""
+    global _session
+    with _lock:
+        if _session is None:
+            import boto3
+
+            _session = boto3.session.Session()
+        return _session
+
+
+def client(service: str, *, endpoint_url: Optional[str] = None) -> Any:
+    """The shared client for *service* (built on first use)."""
+    key = (service, endpoint_url)
+    found = _clients.get(key)
+    if found is not None:
+        return found
+    sess = session()
+    with _lock:
+        found = _clients.get(key)
+        if found is None:
+            config = config_for(service)
+            found = sess.client(service, endpoint_url=endpoint_url, config=config)
+            gauge = _pools.setdefault(service, _PoolGauge(config.max_pool_connections))
+            events = found.meta.events
+            events.register("before-send", gauge.sent)
+            events.register("response-received", gauge.received)
+            _clients[key] = found
+            logger.info("%s client: %d pooled connections", service, config.max_pool_connections)
+        return found
+
+
+def warm_up(services: Sequence[str] = SERVICES) -> None:
+    """Build *services*' clients and resolve credentials now rather than on first use."""
+    session().get_credentials()
+    for service in services:
+        client(service)
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        pools = dict(_pools)
+    return {service: gauge.stats() for service, gauge in pools.items()}
@@ -0,0 +1,208 @@
+# ─────────────────────────────────────────────
+# app/bedrock_governor.py
+# ─────────────────────────────────────────────
+"""
+Admission control and retries for Bedrock calls.
+
+Every call is routed through a per-model *lane* that combines
+
+* a token bucket (``BEDROCK_RATE_PER_SECOND`` / ``BEDROCK_BURST``) so a burst
+  of requests is spread out instead of hitting the service quota at once, and
+* an AIMD concurrency limit: it grows by roughly one slot per limit's worth of
+  successful calls and is halved (at most once per second) on a throttle.
+
+Throttled or transiently unavailable calls are retried with full-jitter
+exponential back-off, but never past the call's deadline; when the deadline
+runs out :class:`BedrockBusy` is raised so the router can answer 503 with a
+``Retry-After`` instead of a 502.
+
+Admission waits and the duration of every attempt are recorded per model in
+:mod:`app.metrics`.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from botocore.exceptions import ClientError
+
+from app import deadlines
+from app.config import settings
+from app.metrics import BEDROCK_SECONDS, BEDROCK_WAIT_SECONDS, current_route
+
+T = TypeVar("T")
+
+# Codes that mean "slow down": they shrink the concurrency limit.
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException"}
+# Codes worth another attempt without blaming our own concurrency.
+TRANSIENT_CODES = {"ServiceUnavailableException", "ModelNotReadyException", "InternalServerException"}
+
+_DECREASE_COOLDOWN = 1.0  # seconds between two multiplicative decreases
+
+
+class BedrockBusy(Exception):
+    """The call could not be admitted or completed before its deadline."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def error_code(e: ClientError) -> str:
+    return e.response.get("Error", {}).get("Code", "")
+
+
+class _Lane:
+    """Token bucket + AIMD concurrency limit for one model."""
+
+    def __init__(self, rate: float, burst: float, min_limit: int, max_limit: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(max_limit, settings.bedrock_initial_concurrency)))
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.calls = self.throttles = self.retries = self.rejected = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, deadline: float) -> None:
+        with self.cond:
+            self.queued += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+                    self.refilled = now
+                    if self.in_flight < int(self.limit) and self.tokens >= 1:
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise BedrockBusy("no Bedrock capacity before the deadline", self.retry_after())
+                    wait = remaining
+                    if self.tokens < 1:
+                        wait = min(wait, (1 - self.tokens) / self.rate)
+                    self.cond.wait(wait)
+            finally:
+                self.queued -= 1
+
+    def release(self, outcome: str) -> None:
+        """Free the slot; *outcome* is ``"ok"``, ``"throttled"`` or ``"error"``."""
+        with self.cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if outcome == "ok":
+                self.calls += 1
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            elif outcome == "throttled":
+                self.throttles += 1
+                if now - self.last_decrease >= _DECREASE_COOLDOWN:
+                    self.limit = max(float(self.min_limit), self.limit / 2)
+                    self.last_decrease = now
+            self.cond.notify_all()
+
+    def retry_after(self) -> float:
+        """Rough seconds until a queued call would get through."""
+        backlog = self.queued + max(0, self.in_flight - int(self.limit) + 1)
+        return max(1.0, backlog / self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "calls": self.calls,
+                "throttles": self.throttles,
+                "retries": self.retries,
+                "rejected": self.rejected,
+            }
+
+
+class BedrockGovernor:
+    """Thread-safe gate in front of the Bedrock clients, one lane per model."""
+
+    def __init__(
+        self,
+        *,
+        rate: float = settings.bedrock_rate_per_second,
+        burst: float = settings.bedrock_burst,
+        min_concurrency: int = settings.bedrock_min_concurrency,
+        max_concurrency: int = settings.bedrock_max_concurrency,
+        deadline: float = settings.bedrock_deadline_seconds,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self._lanes: Dict[str, _Lane] = {}
+        self._lock = threading.Lock()
+
+    def call(self, model: str, fn: Callable[[], T], *, deadline: Optional[float] = None) -> T:
+        """Run *fn* (one Bedrock API call for *model*) under admission control.
+
+        Non-retryable ``ClientError``\\ s propagate unchanged; running out of
+        time – queued or between retries – raises :class:`BedrockBusy`.
+        """
+        lane = self._lane(model)
+        if deadline is None:
+            # the request's own deadline, when there is one and it is sooner
+            left = deadlines.remaining()
+            deadline = self.deadline if left is None else min(self.deadline, max(0.0, left))
+        until = time.monotonic() + deadline
+        route = current_route()
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            lane.acquire(until)
+            started = time.perf_counter()
+            BEDROCK_WAIT_SECONDS.observe(started - queued, route, model)
+            outcome = "error"
+            try:
+                result = fn()
+                outcome = "ok"
+                return result
+            except ClientError as e:
+                code = error_code(e)
+                if code in THROTTLE_CODES:
+                    outcome = "throttled"
+                elif code not in TRANSIENT_CODES:
+                    raise
+                pause = random.uniform(0, min(
+                    settings.bedrock_retry_max_ms, settings.bedrock_retry_base_ms * 2 ** attempt
+                )) / 1000
+                if time.monotonic() + pause >= until:
+                    with lane.cond:
+                        lane.rejected += 1
+                    raise BedrockBusy(f"Bedrock kept failing with {code}", lane.retry_after()) from e
+            finally:
+                lane.release(outcome)
+                BEDROCK_SECONDS.observe(time.perf_counter() - started, route, model, outcome)
+            with lane.cond:
+                lane.retries += 1
+            attempt += 1
+            time.sleep(pause)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            lanes = dict(self._lanes)
+        return {model: lane.stats() for model, lane in lanes.items()}
+
+    def _lane(self, model: str) -> _Lane:
+        with self._lock:
+            lane = self._lanes.get(model)
+            if lane is None:
+                lane = self._lanes[model] = _Lane(
+                    self.rate, self.burst, self.min_concurrency, self.max_concurrency
+                )
+            return lane
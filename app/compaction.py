@@ -0,0 +1,249 @@
+# ─────────────────────────────────────────────
+# app/compaction.py
+# ─────────────────────────────────────────────
+"""
+Rewrite the big CSV tables as compressed, partitioned Parquet.
+
+    python -m app.compaction [transactions] [portfolio_holdings] [--full] [--dry-run]
+
+Every query on the CSV ``transactions`` or ``portfolio_holdings`` table reads
+the whole table, uncompressed, whatever it filters on.  This command builds a
+Parquet copy with Athena itself (``CREATE TABLE AS`` / ``INSERT INTO``):
+
+* ZSTD-compressed Parquet, so a query reads only the columns it selects;
+* ``transactions`` partitioned by month of ``transaction_date``
+  (:data:`app.statements.TRANSACTION_MONTH`), so a date range reads only
+  its months;
+* ``portfolio_holdings`` bucketed by ``portfolio_id``, so an equality or
+  ``IN`` filter on it reads one bucket.
+
+Athena cannot ``INSERT INTO`` a bucketed table, so bucketing is only for
+tables that are always rebuilt in one ``CREATE TABLE AS``.  ``transactions``
+is appended to (and built in chunks of months), so it is partitioned but
+not bucketed; a ``client_id`` lookup still reads only the months asked for.
+
+Each full build is a new table ``<table>_parquet_v<timestamp>`` under
+``COMPACTION_LOCATION``; the view ``<table>_parquet`` is then pointed at it
+and older versions are dropped (their files stay in S3 – expire them with a
+lifecycle rule).  Queries never see a half-built copy.
+
+Later runs of a date-partitioned table are incremental: rows dated after the
+newest one already compacted are appended with ``INSERT INTO`` to the copy
+the view reads – never simply the newest version, which may be left over
+from a full build that failed before the view was switched to it (such
+leftovers are dropped by the next full build).  That assumes
+rows arrive in date order; after corrections or back-dated loads run
+``--full``.  Tables without a date column are always rebuilt.  Athena writes
+at most 100 partitions per statement, so longer histories are written in
+chunks of months.
+
+Once a table has been built, add it to ``COMPACTED_TABLES`` and the routers
+read the view instead of the CSV table (:func:`app.statements.table`).  The
+copy is as fresh as the last run, so schedule this after every data load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from app.athena_client import AthenaClient
+from app.config import settings
+from app.statements import COMPACTED_SUFFIX, TRANSACTION_MONTH, literal
+
+logger = logging.getLogger("compaction")
+
+# Athena's limit on partitions written by one CTAS / INSERT INTO
+MAX_PARTITIONS_PER_STATEMENT = 100
+
+
+@dataclass(frozen=True)
+class Compaction:
+    """How one CSV table is laid out as Parquet."""
+
+    table: str
+    date_column: Optional[str] = None  # partition by its month and append incrementally
+    partition: Optional[str] = None
+    bucket_by: Optional[str] = None  # the column lookups filter on
+    buckets: int = 0
+
+    def __post_init__(self) -> None:
+        if self.bucket_by and self.partition:
+            # partitioned tables are appended to and built in chunks: INSERT INTO
+            raise ValueError(f"{self.table}: Athena cannot INSERT INTO a bucketed table")
+
+    @property
+    def view(self) -> str:
+        return self.table + COMPACTED_SUFFIX
+
+    @property
+    def month(self) -> str:
+        return f"substr(CAST({self.date_column} AS varchar), 1, 7)"
+
+    @property
+    def date(self) -> str:
+        return f"CAST({self.date_column} AS varchar)"
+
+
+COMPACTIONS = {
+    "transactions": Compaction(
+        "transactions", date_column="transaction_date", partition=TRANSACTION_MONTH
+    ),
+    "portfolio_holdings": Compaction("portfolio_holdings", bucket_by="portfolio_id", buckets=16),
+}
+
+
+def months(first: str, last: str) -> List[str]:
+    """Every ``YYYY-MM`` from *first* to *last*, inclusive."""
+    year, month = int(first[:4]), int(first[5:7])
+    out = []
+    while f"{year:04d}-{month:02d}" <= last:
+        out.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return out
+
+
+def select_sql(c: Compaction, conditions: List[str]) -> str:
+    """The source rows to write, partition column last as CTAS requires."""
+    columns = f"*, {c.month} AS {c.partition}" if c.partition else "*"
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM {c.table}{where}"
+
+
+def ctas_sql(c: Compaction, name: str, location: str, conditions: List[str]) -> str:
+    props = [
+        "format = 'PARQUET'",
+        "write_compression = 'ZSTD'",
+        f"external_location = {literal(location)}",
+    ]
+    if c.bucket_by:
+        props += [f"bucketed_by = ARRAY[{literal(c.bucket_by)}]", f"bucket_count = {c.buckets}"]
+    if c.partition:
+        props.append(f"partitioned_by = ARRAY[{literal(c.partition)}]")
+    return f"CREATE TABLE {name} WITH ({', '.join(props)}) AS {select_sql(c, conditions)}"
+
+
+def insert_sql(c: Compaction, name: str, conditions: List[str]) -> str:
+    return f"INSERT INTO {name} {select_sql(c, conditions)}"
+
+
+def _scalar_pair(athena: AthenaClient, sql: str) -> Tuple[Optional[str], Optional[str]]:
+    rows = athena.query(sql, ttl=0).tuples
+    return (rows[0][0], rows[0][1]) if rows else (None, None)
+
+
+def _month_chunks(athena: AthenaClient, c: Compaction, conditions: List[str]) -> List[List[str]]:
+    """Months holding rows that match *conditions*, at most 100 per chunk."""
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    first, last = _scalar_pair(athena, f"SELECT min({c.month}), max({c.month}) FROM {c.table}{where}")
+    if first is None:
+        return []
+    span = months(first, last)
+    step = MAX_PARTITIONS_PER_STATEMENT
+    return [span[i:i + step] for i in range(0, len(span), step)]
+
+
+def _in_months(c: Compaction, chunk: List[str]) -> str:
+    return f"{c.month} BETWEEN {literal(chunk[0])} AND {literal(chunk[-1])}"
+
+
+def versions(athena: AthenaClient, c: Compaction) -> List[str]:
+    """Built copies of *c*, oldest first."""
+    rows = athena.query(
+        f"SHOW TABLES IN {settings.athena_database} {literal(c.view + '_v*')}", ttl=0
+    )
+    return sorted(str(t[0]) for t in rows.tuples)
+
+
+def current_version(athena: AthenaClient, c: Compaction) -> Optional[str]:
+    """The built copy the view reads, or ``None`` if there is no view yet."""
+    rows = athena.query(
+        "SELECT view_definition FROM information_schema.views"
+        f" WHERE table_schema = {literal(settings.athena_database)}"
+        f" AND table_name = {literal(c.view)}",
+        ttl=0,
+    ).tuples
+    m = re.search(rf"\b{re.escape(c.view)}_v\d+\b", str(rows[0][0]), re.I) if rows else None
+    return m.group(0).lower() if m else None
+
+
+def plan(athena: AthenaClient, c: Compaction, *, full: bool = False) -> List[str]:
+    """Statements bringing the Parquet copy of *c* up to date (reads run now)."""
+    built = versions(athena, c)
+    if built and c.partition and not full:
+        current = current_version(athena, c)
+        if current in built:
+            return _plan_append(athena, c, current)
+    if not settings.compaction_location:
+        raise SystemExit("COMPACTION_LOCATION is not set: where should the Parquet files go?")
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    name = f"{c.view}_v{stamp}"
+    location = f"{settings.compaction_location.rstrip('/')}/{c.view}/v{stamp}/"
+    chunks = _month_chunks(athena, c, []) if c.partition else []
+    if not chunks:
+        statements = [ctas_sql(c, name, location, [])]
+    else:
+        statements = [ctas_sql(c, name, location, [_in_months(c, chunks[0])])]
+        statements += [insert_sql(c, name, [_in_months(c, chunk)]) for chunk in chunks[1:]]
+    statements.append(f"CREATE OR REPLACE VIEW {c.view} AS SELECT * FROM {name}")
+    statements += [f"DROP TABLE IF EXISTS {old}" for old in built]
+    return statements
+
+
+def _plan_append(athena: AthenaClient, c: Compaction, current: str) -> List[str]:
+    rows = athena.query(f"SELECT max({c.date}) FROM {current}", ttl=0).tuples
+    watermark = rows[0][0] if rows else None
+    newer = [f"{c.date} > {literal(watermark)}"] if watermark is not None else []
+    return [
+        insert_sql(c, current, newer + [_in_months(c, chunk)])
+        for chunk in _month_chunks(athena, c, newer)
+    ]
+
+
+def run(athena: AthenaClient, c: Compaction, *, full: bool = False, dry_run: bool = False,
+        timeout: float = 3_600) -> None:
+    statements = plan(athena, c, full=full)
+    if not statements:
+        logger.info("%s: nothing new to compact", c.table)
+    for sql in statements:
+        if dry_run:
+            print(sql + ";")
+            continue
+        started = time.monotonic()
+        meta = athena.execute(sql, timeout=timeout)
+        stats = meta.get("Statistics") or {}
+        logger.info(
+            "%s: %s … done in %.1f s, %.1f MB scanned",
+            c.table, sql[:60], time.monotonic() - started,
+            (stats.get("DataScannedInBytes") or 0) / 2**20,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("tables", nargs="*", help=f"any of {', '.join(COMPACTIONS)} (default: all)")
+    parser.add_argument("--full", action="store_true", help="rebuild instead of appending")
+    parser.add_argument("--dry-run", action="store_true", help="print the writes instead of running them")
+    parser.add_argument("--timeout", type=float, default=3_600, help="seconds per statement")
+    args = parser.parse_args()
+    unknown = [t for t in args.tables if t not in COMPACTIONS]
+    if unknown:
+        parser.error(f"no compaction defined for {', '.join(unknown)}")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    athena = AthenaClient()
+    for name in args.tables or list(COMPACTIONS):
+        run(athena, COMPACTIONS[name], full=args.full, dry_run=args.dry_run, timeout=args.timeout)
+    missing = [t for t in args.tables or COMPACTIONS if t not in settings.compacted_tables]
+    if missing and not args.dry_run:
+        print(f"add {', '.join(missing)} to COMPACTED_TABLES to query the Parquet copies")
+
+
+if __name__ == "__main__":
+    main()
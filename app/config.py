@@ -4,6 +4,8 @@ Pydantic-v2 compliant settings loader.
 Keeps env-var names in ALL_CAPS yet exposes nice snake_case fields.
 """
 
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -23,4 +25,152 @@ class Settings(BaseSettings):
     athena_workgroup: str = Field("primary", alias="ATHENA_WORKGROUP")
     max_query_rows: int = Field(1_000, alias="MAX_ROWS")
 
+    # ---- Athena polling ----------------------------------------------------
+    athena_poll_initial_ms: int = Field(25, alias="ATHENA_POLL_INITIAL_MS")
+    athena_poll_max_ms: int = Field(2_000, alias="ATHENA_POLL_MAX_MS")
+    athena_poll_backoff: float = Field(1.6, alias="ATHENA_POLL_BACKOFF")
+    athena_runtime_estimates: int = Field(1_024, alias="ATHENA_RUNTIME_ESTIMATES")
+    # Let Athena hand back a previous result instead of rescanning (0 = off)
+    athena_result_reuse_minutes: int = Field(10, alias="ATHENA_RESULT_REUSE_MINUTES")
+
+    # ---- bulk result download from ATHENA_OUTPUT ---------------------------
+    # Results spilling past one GetQueryResults page and at least this big are
+    # read straight from S3 instead (0 = always GetQueryResults)
+    s3_bulk_min_bytes: int = Field(1024 * 1024, alias="S3_BULK_MIN_BYTES")
+    s3_bulk_part_size: int = Field(8 * 1024 * 1024, alias="S3_BULK_PART_SIZE")
+    s3_bulk_concurrency: int = Field(8, alias="S3_BULK_CONCURRENCY")
+    # point at a local S3 stand-in (moto, MinIO …) for tests and benchmarks
+    s3_endpoint_url: Optional[str] = Field(None, alias="S3_ENDPOINT_URL")
+
+    # ---- deadlines (app/deadlines.py) --------------------------------------------
+    # default per-request budget; routes may set their own, callers may ask for
+    # another with X-Request-Timeout up to the max
+    request_timeout_seconds: float = Field(30, alias="REQUEST_TIMEOUT_SECONDS")
+    request_timeout_max_seconds: float = Field(120, alias="REQUEST_TIMEOUT_MAX_SECONDS")
+    # Athena calls made outside a request (snapshot, credential index)
+    athena_query_timeout_seconds: float = Field(300, alias="ATHENA_QUERY_TIMEOUT_SECONDS")
+
+    # ---- Athena admission (app/athena_admission.py) ---------------------------
+    # the workgroup's concurrent-query quota; 0 = start every query at once
+    athena_max_concurrent_queries: int = Field(20, alias="ATHENA_MAX_CONCURRENT_QUERIES")
+    # JSON objects keyed by priority class: share of freed slots when several
+    # classes queue, fraction of the slots that may be busy for the class to
+    # start, and executions it may queue before answering 429
+    athena_priority_weights: Dict[str, float] = Field(
+        default_factory=lambda: {"interactive": 8, "standard": 4, "report": 1, "background": 1},
+        alias="ATHENA_PRIORITY_WEIGHTS",
+    )
+    athena_priority_limits: Dict[str, float] = Field(
+        default_factory=lambda: {"interactive": 1.0, "standard": 0.75, "report": 0.5, "background": 0.25},
+        alias="ATHENA_PRIORITY_LIMITS",
+    )
+    athena_priority_queue: Dict[str, int] = Field(
+        default_factory=lambda: {"interactive": 500, "standard": 200, "report": 50, "background": 100},
+        alias="ATHENA_PRIORITY_QUEUE",
+    )
+
+    # ---- cursor pagination ---------------------------------------------------
+    # rows one list query asks Athena for; later pages of the same window are
+    # read with NextToken instead of a new execution
+    page_window_rows: int = Field(10_000, alias="PAGE_WINDOW_ROWS")
+    # largest ``limit`` a list endpoint accepts (422 above it)
+    page_max_limit: int = Field(10_000, alias="PAGE_MAX_LIMIT")
+
+    # ---- batch endpoints -------------------------------------------------------
+    batch_max_ids: int = Field(1_000, alias="BATCH_MAX_IDS")
+
+    # ---- list responses (app/serialization.py) -------------------------------
+    # bodies at least this big go out gzipped to clients that accept it
+    response_gzip_min_bytes: int = Field(1024, alias="RESPONSE_GZIP_MIN_BYTES")
+
+    # ---- query result cache ------------------------------------------------
+    query_cache_max_entries: int = Field(2_048, alias="QUERY_CACHE_MAX_ENTRIES")
+    query_cache_max_bytes: int = Field(64 * 1024 * 1024, alias="QUERY_CACHE_MAX_BYTES")
+    query_cache_ttl_seconds: float = Field(60, alias="QUERY_CACHE_TTL_SECONDS")
+    # JSON object, e.g. {"transactions": 30, "advisors": 900}; 0 disables caching
+    query_cache_table_ttls: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "advisors": 900,
+            "clients": 300,
+            "client_advisor_assignments": 300,
+            "products": 900,
+            "thought_leadership_content": 900,
+            "portfolios": 120,
+            "portfolio_holdings": 60,
+            "transactions": 30,
+            "role": 0,
+        },
+        alias="QUERY_CACHE_TABLE_TTLS",
+    )
+
+    # ---- Bedrock admission control (per model) ----------------------------
+    bedrock_rate_per_second: float = Field(5.0, alias="BEDROCK_RATE_PER_SECOND")
+    bedrock_burst: float = Field(10.0, alias="BEDROCK_BURST")
+    bedrock_initial_concurrency: int = Field(4, alias="BEDROCK_INITIAL_CONCURRENCY")
+    bedrock_min_concurrency: int = Field(1, alias="BEDROCK_MIN_CONCURRENCY")
+    bedrock_max_concurrency: int = Field(16, alias="BEDROCK_MAX_CONCURRENCY")
+    # total time a call may spend queued + retrying before answering 503
+    bedrock_deadline_seconds: float = Field(30.0, alias="BEDROCK_DEADLINE_SECONDS")
+    bedrock_retry_base_ms: int = Field(200, alias="BEDROCK_RETRY_BASE_MS")
+    bedrock_retry_max_ms: int = Field(5_000, alias="BEDROCK_RETRY_MAX_MS")
+
+    # ---- knowledge-base answer cache (per endpoint) ------------------------
+    kb_cache_max_entries: int = Field(512, alias="KB_CACHE_MAX_ENTRIES")
+    kb_cache_ttl_seconds: float = Field(3_600, alias="KB_CACHE_TTL_SECONDS")
+    # Jaccard similarity of 3-gram shingles needed for a fuzzy hit (>1 = exact only)
+    kb_cache_similarity: float = Field(0.85, alias="KB_CACHE_SIMILARITY")
+
+    # ---- QuickSight embedding ----------------------------------------------
+    quicksight_session_minutes: int = Field(600, alias="QUICKSIGHT_SESSION_MINUTES")
+
+    # ---- local snapshot of dimension tables ---------------------------------
+    # JSON list; [] turns the snapshot off (every lookup goes to Athena)
+    snapshot_tables: List[str] = Field(
+        default_factory=lambda: [
+            "advisors", "clients", "products", "thought_leadership_content", "portfolios",
+        ],
+        alias="SNAPSHOT_TABLES",
+    )
+    # a table bigger than this stays in Athena
+    snapshot_max_rows: int = Field(500_000, alias="SNAPSHOT_MAX_ROWS")
+
+    # ---- Parquet copies of the CSV fact tables (app/compaction.py) ----------
+    # JSON list of tables the routers read from their compacted copy; only
+    # list a table once `python -m app.compaction` has built it
+    compacted_tables: List[str] = Field(default_factory=list, alias="COMPACTED_TABLES")
+    # S3 prefix the Parquet files are written under, e.g. s3://bucket/compacted/
+    compaction_location: Optional[str] = Field(None, alias="COMPACTION_LOCATION")
+
+    # ---- auth ----------------------------------------------------------------
+    # rebuild the in-memory credential index this often (0 = load once)
+    auth_index_refresh_seconds: float = Field(300, alias="AUTH_INDEX_REFRESH_SECONDS")
+    auth_index_max_users: int = Field(100_000, alias="AUTH_INDEX_MAX_USERS")
+    # HMAC key for session tokens; unset = random per process
+    session_secret: Optional[str] = Field(None, alias="SESSION_SECRET")
+    session_ttl_seconds: float = Field(12 * 3600, alias="SESSION_TTL_SECONDS")
+    # JSON list of ``role`` values allowed to call /admin (compared case-insensitively)
+    admin_roles: List[str] = Field(default_factory=lambda: ["admin"], alias="ADMIN_ROLES")
+
+    # ---- boto3 clients (app/aws_clients.py) ----------------------------------
+    # build clients, resolve credentials and prepare statements in the
+    # background right after startup instead of on the first requests
+    warm_up: bool = Field(True, alias="WARM_UP")
+    # connections kept per client; 0 = one per thread that can call AWS at once
+    aws_max_pool_connections: int = Field(0, alias="AWS_MAX_POOL_CONNECTIONS")
+    aws_connect_timeout_seconds: float = Field(3, alias="AWS_CONNECT_TIMEOUT_SECONDS")
+    # JSON object of per-service read timeouts, e.g. {"athena": 10}
+    aws_read_timeouts: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "athena": 20,
+            "s3": 30,
+            "bedrock-agent-runtime": 120,
+            "bedrock-runtime": 90,
+            "quicksight": 30,
+        },
+        alias="AWS_READ_TIMEOUTS",
+    )
+    aws_read_timeout_seconds: float = Field(60, alias="AWS_READ_TIMEOUT_SECONDS")
+    # attempts per call in botocore's "adaptive" retry mode (Bedrock: see bedrock_governor)
+    aws_max_attempts: int = Field(5, alias="AWS_MAX_ATTEMPTS")
+
 settings = Settings()
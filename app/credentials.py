@@ -0,0 +1,134 @@
+# ─────────────────────────────────────────────
+# app/credentials.py
+# ─────────────────────────────────────────────
+"""
+In-memory index of the ``role`` table for checking logins.
+
+The table is read once through Athena (``role_credentials``) and kept as
+``username -> [(salt, digest, user details)]``, where *digest* is a keyed
+BLAKE2b of the password with a per-entry random salt and a per-process key.
+Plaintext passwords are not kept.  A login is then one hash and a
+constant-time compare – microseconds instead of an Athena scan.
+
+The index is rebuilt in the background every ``AUTH_INDEX_REFRESH_SECONDS``
+(and on demand through ``POST /admin/auth/refresh``); a rebuild swaps the
+whole map at once and a failed one keeps the previous map.  Until the first
+load succeeds, :attr:`CredentialIndex.loaded` is false and the login router
+falls back to querying Athena.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.config import settings
+from app.statements import bind
+
+logger = logging.getLogger("auth")
+
+_Entry = Tuple[bytes, bytes, Dict[str, Any]]
+
+
+def user_details(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Rename ``role`` columns to the python-friendly ``UserDetails`` fields."""
+    return {
+        "user_id":      record["UserId"],
+        "aws_user_name":record["AwsUserName"],
+        "user":         record["User"],
+        "user_arn":     record["UserARN"],
+        "dashboard_id": record["DashboardId"],
+        "role":         record["Role"],
+        "email":        record["Email"],
+        "region":       record["Region"],
+    }
+
+
+class CredentialIndex:
+    def __init__(self) -> None:
+        self._key = os.urandom(32)
+        self._users: Dict[str, List[_Entry]] = {}
+        self._dummy_salt = os.urandom(16)
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+        self.refreshes = self.refresh_failures = 0
+        self.accepted = self.rejected = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def _digest(self, password: str, salt: bytes) -> bytes:
+        return hashlib.blake2b(password.encode(), key=self._key, salt=salt, digest_size=32).digest()
+
+    # ------------------------------------------------------------------
+    def verify(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """``UserDetails`` fields for a matching username/password, else ``None``."""
+        entries = self._users.get(username)
+        if not entries:
+            # same amount of work as a wrong password for an existing user
+            self._digest(password, self._dummy_salt)
+            self.rejected += 1
+            return None
+        for salt, digest, details in entries:
+            if hmac.compare_digest(self._digest(password, salt), digest):
+                self.accepted += 1
+                return details
+        self.rejected += 1
+        return None
+
+    def load(self, rows) -> int:
+        """Replace the index with *rows* of ``role_credentials``; returns the user count."""
+        users: Dict[str, List[_Entry]] = {}
+        for row in rows:
+            salt = os.urandom(16)
+            entry = (salt, self._digest(row["user_password"] or "", salt), user_details(row))
+            users.setdefault(row["User"], []).append(entry)
+        with self._lock:
+            self._users = users
+            self.loaded_at = time.time()
+            self.refreshes += 1
+        return len(users)
+
+    async def refresh(self, athena) -> int:
+        """Re-read the ``role`` table through *athena* (never from the query cache)."""
+        try:
+            rows = await athena.aquery(
+                bind("role_credentials"), ttl=0, max_rows=settings.auth_index_max_users
+            )
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        count = await asyncio.to_thread(self.load, rows)
+        logger.info("Credential index loaded: %d users", count)
+        return count
+
+    async def run(self, athena) -> None:
+        """Load now, then keep refreshing; meant to run as a background task."""
+        while True:
+            try:
+                await self.refresh(athena)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Credential index refresh failed: %s", e)
+            if settings.auth_index_refresh_seconds <= 0 and self.loaded:
+                return
+            await asyncio.sleep(settings.auth_index_refresh_seconds or 30)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "users": len(self._users),
+            "age_seconds": round(time.time() - self.loaded_at, 1) if self.loaded_at else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
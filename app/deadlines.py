@@ -0,0 +1,175 @@
+# ─────────────────────────────────────────────
+# app/deadlines.py
+# ─────────────────────────────────────────────
+"""
+Per-request deadlines, and cancelling work nobody is waiting for any more.
+
+Every request gets a deadline: ``REQUEST_TIMEOUT_SECONDS`` by default, a
+route's own budget where it declares ``dependencies=[Depends(deadline(60))]``,
+or what the caller asks for in ``X-Request-Timeout`` (seconds, capped at
+``REQUEST_TIMEOUT_MAX_SECONDS``).  It lives in a context variable, so the
+Athena client and the Bedrock governor see it without it being passed down;
+a call that runs past it raises :class:`DeadlineExceeded` (answered 504).
+
+:class:`CancelOnDisconnect` cancels the request's task when the HTTP client
+goes away.  Either way the cancellation reaches the Athena poll loop, which
+stops the execution (``StopQueryExecution``) so it no longer holds one of
+the workgroup's concurrent-query slots – unless another request is still
+waiting on the same execution (see :meth:`app.singleflight.SingleFlight.ado`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+from fastapi import Header
+
+from app.config import settings
+from app.metrics import Counter, current_route_of
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+# set by CancelOnDisconnect once the client has gone; seen by tasks the request spawned
+_gone: ContextVar[Optional[asyncio.Event]] = ContextVar("client_gone", default=None)
+
+# loop timers may fire up to a clock tick early
+_SLACK = 0.01
+
+DISCONNECTS = Counter(
+    "http_disconnects_total", "Requests cancelled because the client went away.", ("route",)
+)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before the work finished."""
+
+
+def deadline(seconds: Optional[float] = None):
+    """Route dependency setting the request's deadline to *seconds* from now
+    (default ``REQUEST_TIMEOUT_SECONDS``); ``X-Request-Timeout`` overrides it."""
+
+    async def set_deadline(x_request_timeout: Optional[float] = Header(None)) -> None:
+        budget = settings.request_timeout_seconds if seconds is None else seconds
+        if x_request_timeout is not None and x_request_timeout > 0:
+            budget = min(x_request_timeout, settings.request_timeout_max_seconds)
+        _deadline.set(time.monotonic() + budget)
+
+    return set_deadline
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline; ``None`` outside a request."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= _SLACK
+
+
+async def within(aw: Awaitable[T], default: Optional[float] = None) -> T:
+    """Await *aw*, cancelling it at the deadline (or after *default* seconds
+    outside a request) and raising :class:`DeadlineExceeded`."""
+    left = remaining()
+    if left is None:
+        left = default
+    if left is not None and left <= 0:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise DeadlineExceeded("deadline passed before the call started")
+    try:
+        return await asyncio.wait_for(aw, left)
+    except asyncio.TimeoutError:
+        if _deadline.get() is not None and not expired():
+            raise  # a timeout from inside the call, not ours
+        raise DeadlineExceeded(f"gave up after {left:.1f}s") from None
+
+
+def reason_for(error: BaseException) -> str:
+    """Why a task was cancelled: its cancel message, else disconnect/deadline/abandoned."""
+    if error.args and error.args[0]:
+        return str(error.args[0])
+    gone = _gone.get()
+    if gone is not None and gone.is_set():
+        return "disconnect"
+    return "deadline" if expired() else "abandoned"
+
+
+class CancelOnDisconnect:
+    """Pure ASGI middleware cancelling the handler when the client disconnects.
+
+    The (small, JSON) request body is read up front so that a watcher can
+    own ``receive`` for the rest of the request and notice
+    ``http.disconnect`` while the handler is still busy.  Once the last
+    body chunk has been sent the watcher stops: servers report a disconnect
+    after every finished response, and background tasks still running then
+    must not be cancelled (or counted).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        body = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.append(message)
+            if not message.get("more_body"):
+                break
+
+        gone = asyncio.Event()
+        watcher: Optional[asyncio.Future] = None
+        responded = False
+
+        async def replay():
+            if body:
+                return body.pop(0)
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send_and_track(message) -> None:
+            nonlocal responded
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                # the server reports http.disconnect once a response is done:
+                # background work after this point is not abandoned
+                responded = True
+                if watcher is not None:
+                    watcher.cancel()
+
+        token = _gone.set(gone)
+        try:
+            handler = asyncio.ensure_future(self.app(scope, replay, send_and_track))
+        finally:
+            _gone.reset(token)
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            if responded:
+                return
+            gone.set()
+            if not handler.done():
+                DISCONNECTS.inc(current_route_of(scope))
+                handler.cancel("disconnect")
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not gone.is_set():
+                handler.cancel()
+                raise
+        finally:
+            watcher.cancel()
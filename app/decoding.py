@@ -0,0 +1,108 @@
+# ─────────────────────────────────────────────
+# app/decoding.py
+# ─────────────────────────────────────────────
+"""
+Type-aware decoding of Athena result pages.
+
+Athena hands every cell back as a string.  Rather than leave that to
+pydantic row by row, the column types in ``ResultSetMetadata.ColumnInfo`` are
+looked at once per result to pick a converter per column, and each page is
+then decoded one column at a time with a single list comprehension.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+Converter = Optional[Callable[[str], Any]]  # None: keep the string as-is
+
+_INT_TYPES = {"tinyint", "smallint", "integer", "int", "bigint"}
+# decimal lands on float because that is what the API models declare
+_FLOAT_TYPES = {"double", "float", "real", "decimal"}
+_INF = float("inf")
+
+
+def _to_bool(value: str) -> bool:
+    return value == "true"
+
+
+def converter_for(athena_type: str) -> Converter:
+    """Converter for one ``ColumnInfo.Type`` (dates, timestamps, … stay strings)."""
+    base = athena_type.lower().split("(", 1)[0].strip()
+    if base in _INT_TYPES:
+        return int
+    if base in _FLOAT_TYPES:
+        return float
+    if base == "boolean":
+        return _to_bool
+    return None
+
+
+def as_text(value: Any) -> Any:
+    """The string Athena sent for a decoded *value* (the inverse of the converters).
+
+    Doubles are written the way Athena writes them (Java's ``Double.toString``);
+    a decimal's trailing zeros are gone once it is a float.  Values of other
+    types, and ``None``, are returned unchanged.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if not isinstance(value, float):
+        return value
+    if value != value:
+        return "NaN"
+    if value in (_INF, -_INF):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == 0 or 1e-3 <= abs(value) < 1e7:
+        return repr(value)
+    digits = Decimal(repr(value))
+    mantissa = digits.scaleb(-digits.adjusted()).normalize()
+    text = str(mantissa) if "." in str(mantissa) else f"{mantissa}.0"
+    return f"{text}E{digits.adjusted()}"
+
+
+def column_converters(column_info: Sequence[Dict[str, Any]]) -> List[Converter]:
+    return [converter_for(c.get("Type", "varchar")) for c in column_info]
+
+
+def _convert(values: List[Optional[str]], conv: Converter) -> List[Any]:
+    if conv is None:
+        return values
+    if None not in values:
+        return list(map(conv, values))
+    return [None if v is None else conv(v) for v in values]
+
+
+def decode_result_rows(
+    data: Sequence[Dict[str, Any]], converters: Sequence[Converter]
+) -> List[List[Any]]:
+    """Columns of typed values from ``ResultSet.Rows`` (header already removed)."""
+    cells = [r["Data"] for r in data]
+    try:
+        return [
+            _convert([c[i].get("VarCharValue") for c in cells], conv)
+            for i, conv in enumerate(converters)
+        ]
+    except IndexError:
+        # Ragged rows (short ``Data``) – pad the missing trailing cells with NULL.
+        width = len(converters)
+        raw = [[c.get("VarCharValue") for c in r] + [None] * (width - len(r)) for r in cells]
+        return decode_value_rows(raw, converters)
+
+
+def decode_value_rows(
+    raw: Sequence[Sequence[Optional[str]]], converters: Sequence[Converter]
+) -> List[List[Any]]:
+    """Columns of typed values from already-split string rows (e.g. CSV)."""
+    return [_convert([r[i] for r in raw], conv) for i, conv in enumerate(converters)]
+
+
+def to_dicts(names: Sequence[str], columns: Sequence[List[Any]]) -> List[Dict[str, Any]]:
+    """Re-assemble decoded columns as list-of-dict rows."""
+    if not columns:
+        return []
+    return list(map(dict, map(zip, repeat(names), zip(*columns))))
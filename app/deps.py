@@ -2,18 +2,63 @@
 # app/deps.py
 # ─────────────────────────────────────────────
 """
-FastAPI dependency helpers – gives each request access to a singleton Athena client.
+FastAPI dependency helpers – gives each request access to a singleton Athena client
+(and the process-wide Bedrock governor, credential index and dimension
+snapshot), plus the
+session-token check for routes that require a logged-in user (or an admin).
 """
 
 from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, Header, HTTPException, status
 
 from app.athena_client import AthenaClient
-from .config import Settings
-import boto3
-from botocore.config import Config
+from app.bedrock_governor import BedrockGovernor
 from app.config import settings
+from app.credentials import CredentialIndex
+from app.sessions import InvalidToken, verify
+from app.snapshot import DimensionSnapshot
 
 
 @lru_cache(maxsize=1)
 def get_athena_client() -> AthenaClient:  # pragma: no cover
-    return AthenaClient()
\ No newline at end of file
+    return AthenaClient()
+
+
+@lru_cache(maxsize=1)
+def get_bedrock_governor() -> BedrockGovernor:
+    return BedrockGovernor()
+
+
+@lru_cache(maxsize=1)
+def get_credential_index() -> CredentialIndex:
+    return CredentialIndex()
+
+
+@lru_cache(maxsize=1)
+def get_snapshot() -> DimensionSnapshot:
+    return DimensionSnapshot()
+
+
+def current_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Claims of the ``Authorization: Bearer <token>`` session token."""
+    scheme, _, token = (authorization or "").partition(" ")
+    try:
+        if scheme.lower() != "bearer":
+            raise InvalidToken("missing bearer token")
+        return verify(token.strip())
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid session: {e}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def admin_user(claims: Dict[str, Any] = Depends(current_user)) -> Dict[str, Any]:
+    """Like :func:`current_user`, but the session's role must be in ``ADMIN_ROLES``."""
+    allowed = {r.lower() for r in settings.admin_roles}
+    if str(claims.get("role", "")).lower() not in allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
+    return claims
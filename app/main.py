@@ -1,8 +1,21 @@
 # ─────────────────────────────────────────────
 # app/main.py
 # ─────────────────────────────────────────────
-from fastapi import FastAPI
+import asyncio
+import logging
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app import aws_clients
+from app.athena_admission import AthenaBusy, priority
+from app.config import settings
+from app.deadlines import CancelOnDisconnect, DeadlineExceeded, deadline
+from app.deps import get_athena_client, get_credential_index, get_snapshot
+from app.metrics import MetricsMiddleware
+from app.pagination import NEXT_CURSOR_HEADER
 from app.routers import kb
 
 from app.routers import (
@@ -13,14 +26,71 @@ from app.routers import (
     transactions,
     content,
     quicksight_embed,
+    admin,
+    metrics,
 )
 
+
+
+logger = logging.getLogger("startup")
+
+
+async def warm_up(athena) -> None:
+    """Work that would otherwise land on the first requests.
+
+    Runs as a task once startup has returned, i.e. while uvicorn binds the
+    port, so it never delays the server from accepting connections.
+    Statements that are not prepared yet simply run as inline SQL.
+    """
+    try:
+        if settings.warm_up:
+            await asyncio.to_thread(aws_clients.warm_up)
+        await asyncio.to_thread(athena.prepare_statements)
+    except Exception as e:
+        logger.warning("Warm-up incomplete: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Honour dependency overrides so tests/benchmarks never reach real AWS.
+    athena = app.dependency_overrides.get(get_athena_client, get_athena_client)()
+    index = app.dependency_overrides.get(get_credential_index, get_credential_index)()
+    snapshot = app.dependency_overrides.get(get_snapshot, get_snapshot)()
+    background = [
+        asyncio.create_task(warm_up(athena)),
+        asyncio.create_task(index.run(athena)),
+        asyncio.create_task(snapshot.run(athena)),
+    ]
+    yield
+    for task in background:
+        task.cancel()
+
+
 app = FastAPI(
     title="GenBI-Pioneers",
     version="0.1.0",
     description="FastAPI service backed by AWS Athena (CSV tables in S3)",
+    lifespan=lifespan,
+    # REQUEST_TIMEOUT_SECONDS and the "standard" Athena priority class unless a
+    # router or route sets its own
+    dependencies=[Depends(deadline()), Depends(priority())],
 )
 
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": f"Deadline exceeded: {exc}"})
+
+
+@app.exception_handler(AthenaBusy)
+async def athena_busy(request: Request, exc: AthenaBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Athena busy: {exc}"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 # Allow Angular dev server & other browser front-ends
 app.add_middleware(
     CORSMiddleware,
@@ -32,7 +102,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(CancelOnDisconnect)
+# Outermost, so request timings include CORS and error handling
+app.add_middleware(MetricsMiddleware)
 
 # Register feature routers
 app.include_router(auth.router)
@@ -43,3 +117,5 @@ app.include_router(transactions.router)
 app.include_router(content.router)
 app.include_router(quicksight_embed.router)
 app.include_router(kb.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
@@ -0,0 +1,247 @@
+# ─────────────────────────────────────────────
+# app/metrics.py
+# ─────────────────────────────────────────────
+"""
+Process-wide latency histograms and counters in the Prometheus text format.
+
+:class:`MetricsMiddleware` times every HTTP request and makes the request's
+ASGI scope available to whatever runs underneath it, so an Athena execution,
+a Bedrock call or a QuickSight call is labelled with the *route template*
+(``/clients/{client_id}``, never the raw path) that caused it – see
+:func:`current_route`.  Work outside a request (snapshot and credential
+refreshes) is labelled ``background``.
+
+For Athena each execution records what ``QueryExecution.Statistics`` says
+about it – queue time, engine time, bytes scanned, whether a previous result
+was reused – plus how many status polls we spent waiting and how long reading
+the result took.  ``GET /metrics`` renders everything.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("metrics_scope", default=None)
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11)
+POLLS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def current_route() -> str:
+    """Route template of the request being served, ``background`` outside one."""
+    scope = _scope.get()
+    if scope is None:
+        return "background"
+    return current_route_of(scope)
+
+
+def current_route_of(scope: Mapping[str, Any]) -> str:
+    # unmatched paths share one label so 404 probes can't grow the series count
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = super().render()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = SECONDS
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {k: (list(c), s[0]) for k, (c, s) in self._series.items()}
+        lines = super().render()
+        for key, (counts, total) in sorted(series.items()):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {running}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to serve a request.", ("route", "method", "status")
+)
+ATHENA_QUEUE_SECONDS = Histogram(
+    "athena_queue_seconds", "QueryQueueTimeInMillis of Athena executions.", ("route",)
+)
+ATHENA_ENGINE_SECONDS = Histogram(
+    "athena_engine_seconds", "EngineExecutionTimeInMillis of Athena executions.", ("route",)
+)
+ATHENA_TOTAL_SECONDS = Histogram(
+    "athena_total_seconds", "TotalExecutionTimeInMillis of Athena executions.", ("route",)
+)
+ATHENA_SCANNED_BYTES = Histogram(
+    "athena_scanned_bytes", "DataScannedInBytes of Athena executions.", ("route",), BYTES
+)
+ATHENA_POLLS = Histogram(
+    "athena_polls", "Status polls spent waiting for an Athena execution.", ("route",), POLLS
+)
+ATHENA_FETCH_SECONDS = Histogram(
+    "athena_fetch_seconds", "Time to read and decode an Athena result.", ("route",)
+)
+ATHENA_EXECUTIONS = Counter(
+    "athena_executions_total", "Athena executions by final state.", ("route", "state")
+)
+ATHENA_CANCELLED = Counter(
+    "athena_cancelled_total", "Executions stopped because nobody waited for them.",
+    ("route", "reason"),
+)
+ATHENA_ADMISSION_WAIT_SECONDS = Histogram(
+    "athena_admission_wait_seconds", "Time an Athena execution queued for a workgroup slot.",
+    ("route", "priority"),
+)
+ATHENA_ADMISSION_REJECTED = Counter(
+    "athena_admission_rejected_total", "Executions turned away because their queue was full.",
+    ("route", "priority"),
+)
+ATHENA_REUSED = Counter(
+    "athena_reused_results_total", "Executions answered from Athena's result reuse.", ("route",)
+)
+BEDROCK_SECONDS = Histogram(
+    "bedrock_call_seconds", "Duration of one Bedrock API attempt.", ("route", "model", "outcome")
+)
+BEDROCK_WAIT_SECONDS = Histogram(
+    "bedrock_wait_seconds", "Time a Bedrock call waited for admission.", ("route", "model")
+)
+QUICKSIGHT_SECONDS = Histogram(
+    "quicksight_embed_seconds", "Duration of GenerateEmbedUrlForRegisteredUser.", ("route", "outcome")
+)
+
+
+def record_athena(meta: Mapping[str, Any], polls: int) -> None:
+    """Record one finished ``QueryExecution`` against the current route."""
+    route = current_route()
+    stats = meta.get("Statistics") or {}
+    ATHENA_EXECUTIONS.inc(route, meta["Status"]["State"])
+    ATHENA_POLLS.observe(polls, route)
+    for hist, field in (
+        (ATHENA_QUEUE_SECONDS, "QueryQueueTimeInMillis"),
+        (ATHENA_ENGINE_SECONDS, "EngineExecutionTimeInMillis"),
+        (ATHENA_TOTAL_SECONDS, "TotalExecutionTimeInMillis"),
+    ):
+        if stats.get(field) is not None:
+            hist.observe(stats[field] / 1000, route)
+    if stats.get("DataScannedInBytes") is not None:
+        ATHENA_SCANNED_BYTES.observe(stats["DataScannedInBytes"], route)
+    if (stats.get("ResultReuseInformation") or {}).get("ReusedPreviousResult"):
+        ATHENA_REUSED.inc(route)
+
+
+def gauges(prefix: str, values: Mapping[str, Any]) -> List[str]:
+    """Numeric entries of a ``stats()`` dict as untyped samples, one level deep."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        lines.append(f"{prefix}_{key} {value:g}")
+    return lines
+
+
+def render(extra: Sequence[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing requests and exposing their scope to :func:`current_route`.
+
+    Pure ASGI rather than ``BaseHTTPMiddleware`` so streamed responses are not
+    buffered and the context variable reaches the endpoint's task.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 499  # nothing sent: the client went away (nginx's code for it)
+        started = time.perf_counter()
+
+        async def send_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _scope.set(scope)
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            _scope.reset(token)
+            HTTP_SECONDS.observe(
+                time.perf_counter() - started, current_route_of(scope), scope["method"], str(status)
+            )
@@ -1,20 +1,48 @@
 # ─────────────────────────────────────────────
 # app/models.py
 # ─────────────────────────────────────────────
-from typing import Optional, List
+from collections.abc import Mapping
+from typing import Any, Optional, List
 
-from pydantic import BaseModel,Extra
+from pydantic import BaseModel,Extra, ConfigDict, Field, model_validator
+
+from app.config import settings
+from app.decoding import as_text
 
 # ---------- Core domain ----------
 
 
-class Advisor(BaseModel):
+class AthenaRow(BaseModel):
+    """
+    Base for models filled from Athena rows.
+    Rows arrive typed from the column metadata, so an id column stored as
+    bigint still has to fit a ``str`` field.
+    """
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+class Advisor(AthenaRow):
     advisor_id: str
     first_name: str
     last_name: str
     email: Optional[str]
 
-class AdvisorDetail(BaseModel, extra=Extra.allow):
+class AthenaDetail(BaseModel, extra=Extra.allow):
+    """
+    Base for detail models that pass every Athena column through.
+    Undeclared columns go out as the strings Athena sent, as they always
+    have, even though rows now arrive typed.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _extras_as_text(cls, data: Any) -> Any:
+        if not isinstance(data, Mapping):  # e.g. an AthenaDetail instance
+            return data
+        return {k: v if k in cls.model_fields else as_text(v) for k, v in dict(data).items()}
+
+
+class AdvisorDetail(AthenaDetail):
     """
     Accepts every column Athena returns for one advisor.
     Nothing is hard-coded, so new columns are picked up automatically.
@@ -22,28 +50,28 @@ class AdvisorDetail(BaseModel, extra=Extra.allow):
     pass    
 
 
-class Client(BaseModel):
+class Client(AthenaRow):
     client_id: str
     first_name: str
     last_name: str
     age: Optional[int]
 
 
-class Portfolio(BaseModel):
+class Portfolio(AthenaRow):
     portfolio_id: str
     client_id: str
     portfolio_name: str
     total_value: Optional[float]
 
 
-class Holding(BaseModel):
+class Holding(AthenaRow):
     product_id: str
     shares: float
     market_value: float
     product_name: Optional[str]
 
 
-class Transaction(BaseModel):
+class Transaction(AthenaRow):
     transaction_id: str
     account_id: str
     product_id: str
@@ -53,7 +81,7 @@ class Transaction(BaseModel):
     transaction_date: str
 
 
-class Content(BaseModel):
+class Content(AthenaRow):
     content_id: str
     title: str
     content_type: str
@@ -61,6 +89,11 @@ class Content(BaseModel):
     creation_date: str
 
 
+class IdBatch(BaseModel):
+    """Body of the ``…:batch`` endpoints."""
+    ids: List[str] = Field(min_length=1, max_length=settings.batch_max_ids)
+
+
 # ---------- Auth ----------
 
 
@@ -73,7 +106,7 @@ class LoginResponse(BaseModel):
     user_id: str
     role: str
 
-class UserDetails(BaseModel):
+class UserDetails(AthenaRow):
     user_id: str
     aws_user_name: str
     user: str
@@ -81,4 +114,5 @@ class UserDetails(BaseModel):
     dashboard_id: str
     role: str
     email: str
-    region: str    
+    region: str
+    token: Optional[str] = None  # signed session token (see app/sessions.py)    
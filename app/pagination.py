@@ -0,0 +1,101 @@
+# ─────────────────────────────────────────────
+# app/pagination.py
+# ─────────────────────────────────────────────
+"""
+Opaque keyset cursors for the list endpoints.
+
+A list query asks Athena for a *window* of ``PAGE_WINDOW_ROWS`` rows but
+reads only the first page of it.  The cursor returned in ``X-Next-Cursor``
+is a signed token (:func:`app.sessions.sign`) holding
+
+* the sort key of the last row sent – the next query becomes a range
+  predicate on it (the statement's ``_after`` twin) instead of an offset, and
+* while the window lasts and is younger than its table's cache TTL, the
+  execution id and ``NextToken`` to read the next page straight from the same
+  Athena result without running anything.
+
+So consecutive pages cost one ``GetQueryResults`` call, and a page past the
+window costs one execution, the same as the first page.  A cursor is bound
+to the statement and filters it was issued for.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+
+from app.config import settings
+from app.result_set import ResultSet
+from app.sessions import InvalidToken, sign, unsign
+from app.statements import bind, keyset_params
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class Keyset:
+    """How one list endpoint pages."""
+
+    first: str  # statement taking (*filters, limit)
+    after: str  # statement taking (*filters, *keyset_params(key), limit)
+    key: Tuple[str, ...]  # result columns forming the sort key, most significant first
+    table: str
+
+
+def _binding(keyset: Keyset, filters: Sequence[Any]) -> str:
+    return hashlib.blake2b(repr((keyset.first, tuple(filters))).encode(), digest_size=8).hexdigest()
+
+
+def _decode(cursor: str, binding: str) -> Dict[str, Any]:
+    try:
+        state = unsign(cursor, purpose="cursor")
+    except InvalidToken as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Invalid cursor: {e}")
+    if state.get("b") != binding:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor was issued for other filters")
+    return state
+
+
+def page_limit(default: int) -> Any:
+    """The ``limit`` query parameter of a list endpoint: 1 ≤ limit ≤ ``PAGE_MAX_LIMIT``."""
+    return Query(default, ge=1, le=settings.page_max_limit)
+
+
+async def paginate(
+    athena,
+    keyset: Keyset,
+    filters: Sequence[Any],
+    limit: int,
+    cursor: Optional[str],
+    response: Response,
+) -> ResultSet:
+    """One page of rows; sets ``X-Next-Cursor`` on *response* when there is more."""
+    binding = _binding(keyset, filters)
+    state = _decode(cursor, binding) if cursor else None
+    window = max(limit, settings.page_window_rows)
+
+    fresh = state is not None and time.time() - state["at"] < athena.cache.ttl_for((keyset.table,))
+    if state is not None and state.get("q") and fresh:
+        rows, qid, token = await athena.apage(None, limit, resume=(state["q"], state["t"]))
+        left = state["w"] - len(rows)
+        issued = state["at"]
+    else:
+        if state is None:
+            query = bind(keyset.first, *filters, window)
+        else:
+            query = bind(keyset.after, *filters, *keyset_params(state["k"]), window)
+        rows, qid, token = await athena.apage(query, limit)
+        left = window - len(rows)
+        issued = time.time()
+
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        nxt: Dict[str, Any] = {"b": binding, "k": [str(last[c]) for c in keyset.key], "at": issued}
+        if token is not None and left > 0:
+            nxt.update(q=qid, t=token, w=left)
+        response.headers[NEXT_CURSOR_HEADER] = sign(nxt, purpose="cursor")
+    return rows
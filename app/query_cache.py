@@ -0,0 +1,159 @@
+# ─────────────────────────────────────────────
+# app/query_cache.py
+# ─────────────────────────────────────────────
+"""
+In-process result cache for ``AthenaClient``.
+
+Entries are bounded both by count and by an estimate of their size in bytes
+and are evicted least-recently-used first.  Each entry also carries an expiry
+derived from the TTL of the tables it reads (``QUERY_CACHE_TABLE_TTLS``) so
+fast-moving fact tables age out quicker than dimension tables.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+
+_TABLE_RE = re.compile(r"\b(?:FROM|JOIN)\s+\"?([A-Za-z_][\w.]*)\"?", re.IGNORECASE)
+
+
+def tables_in(sql: str) -> Tuple[str, ...]:
+    """Best-effort list of the tables a statement reads (schema stripped)."""
+    return tuple(sorted({m.split(".")[-1].lower() for m in _TABLE_RE.findall(sql)}))
+
+
+def estimate_bytes(rows: List[Dict[str, Any]]) -> int:
+    """Rough heap footprint of a list-of-dict result."""
+    total = sys.getsizeof(rows)
+    for row in rows:
+        total += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+    return total
+
+
+@dataclass
+class _Entry:
+    rows: Any
+    tables: Tuple[str, ...]
+    expires: float
+    nbytes: int
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU map from query key to result rows."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = settings.query_cache_max_entries,
+        max_bytes: int = settings.query_cache_max_bytes,
+        default_ttl: float = settings.query_cache_ttl_seconds,
+        table_ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = {
+            k.lower(): v
+            for k, v in (settings.query_cache_table_ttls if table_ttls is None else table_ttls).items()
+        }
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_table: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    def ttl_for(self, tables: Iterable[str]) -> float:
+        """Shortest TTL among *tables*, falling back to the default."""
+        ttls = [self.table_ttls[t] for t in tables if t in self.table_ttls]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.rows
+
+    def put(
+        self,
+        key: Hashable,
+        rows: Any,
+        tables: Tuple[str, ...],
+        *,
+        ttl: Optional[float] = None,
+        nbytes: Optional[int] = None,
+    ) -> None:
+        ttl = self.ttl_for(tables) if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        if nbytes is None:
+            nbytes = rows.nbytes if hasattr(rows, "nbytes") else estimate_bytes(rows)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(rows, tables, time.monotonic() + ttl, nbytes)
+            self._bytes += nbytes
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_table(self, table: str) -> int:
+        """Drop every entry that reads *table*; returns how many were removed."""
+        with self._lock:
+            keys = list(self._by_table.get(table.lower(), ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    # ------------------------------------------------------------------
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
@@ -0,0 +1,166 @@
+# ─────────────────────────────────────────────
+# app/result_set.py
+# ─────────────────────────────────────────────
+"""
+Compact, read-only container for Athena query results.
+
+A list-of-dict result repeats every column name in every row and pays for a
+hash table per row.  ``ResultSet`` keeps the column names (and a name → index
+map) once and each row as a plain tuple; indexing or iterating hands out
+``Row`` views that behave like read-only dicts, so router code
+(``rows[0]["col"]``, ``dict(row)``) and pydantic models work unchanged.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping, Sequence
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union, overload,
+)
+
+T = TypeVar("T")
+
+
+class Row(Mapping):
+    """Read-only mapping view over one result tuple."""
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: Dict[str, int], values: Tuple[Any, ...]) -> None:
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Cheaper than the Mapping mixins; pydantic walks ``items()`` when validating.
+    def keys(self):  # type: ignore[override]
+        return self._index.keys()
+
+    def values(self):  # type: ignore[override]
+        return list(self._values)
+
+    def items(self):  # type: ignore[override]
+        return list(zip(self._index, self._values))
+
+    def __repr__(self) -> str:
+        return f"Row({dict(zip(self._index, self._values))!r})"
+
+
+class ResultSet(Sequence):
+    """Column names stored once plus one tuple per row."""
+
+    __slots__ = ("columns", "_index", "_rows", "_memo", "truncated")
+
+    def __init__(self, columns: Iterable[str], rows: Iterable[Tuple[Any, ...]] = ()) -> None:
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self._rows: List[Tuple[Any, ...]] = rows if isinstance(rows, list) else list(rows)
+        self._memo: Optional[Dict[Hashable, Any]] = None
+        self.truncated = False  # rows were cut off at a row cap (see truncate)
+
+    @classmethod
+    def from_columns(cls, columns: Iterable[str], data: Sequence[List[Any]]) -> "ResultSet":
+        """Build from column-major values (one list per column)."""
+        return cls(columns, list(zip(*data)) if data else [])
+
+    # ------------------------------------------------------------------
+    @overload
+    def __getitem__(self, i: int) -> Row: ...
+    @overload
+    def __getitem__(self, i: slice) -> "ResultSet": ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Row, "ResultSet"]:
+        if isinstance(i, slice):
+            return ResultSet(self.columns, self._rows[i])
+        return Row(self._index, self._rows[i])
+
+    def __iter__(self) -> Iterator[Row]:
+        index = self._index
+        for values in self._rows:
+            yield Row(index, values)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return f"ResultSet(columns={self.columns!r}, rows={len(self._rows)})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ResultSet):
+            return self.columns == other.columns and self._rows == other._rows
+        return NotImplemented
+
+    __hash__ = None  # mutable (pages are appended while collecting)
+
+    # ------------------------------------------------------------------
+    @property
+    def tuples(self) -> List[Tuple[Any, ...]]:
+        """The underlying row tuples (do not mutate)."""
+        return self._rows
+
+    def column(self, name: str) -> List[Any]:
+        i = self._index[name]
+        return [r[i] for r in self._rows]
+
+    def extend(self, other: "ResultSet") -> None:
+        """Append rows of a later page of the same result."""
+        self._rows.extend(other._rows)
+        self._memo = None
+
+    def truncate(self, n: int) -> None:
+        """Keep the first *n* rows; marks the set :attr:`truncated` if any are dropped."""
+        if len(self._rows) > n:
+            del self._rows[n:]
+            self.truncated = True
+        self._memo = None
+
+    def memo(self, key: Hashable, build: Callable[["ResultSet"], T]) -> T:
+        """``build(self)``, computed once per *key* while the rows stay as they are.
+
+        A cached result is handed to every request that asks for it, so what
+        is derived from it (a response body, say) is worth keeping with it.
+        """
+        if self._memo is None:
+            self._memo = {}
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = build(self)
+            return value
+
+    def group_by(self, name: str, key: Callable[[Any], Any] = str) -> Dict[Any, "ResultSet"]:
+        """Split into one ResultSet per distinct ``key(row[name])``, rows in order."""
+        i = self._index[name]
+        groups: Dict[Any, List[Tuple[Any, ...]]] = {}
+        for r in self._rows:
+            groups.setdefault(key(r[i]), []).append(r)
+        return {k: ResultSet(self.columns, rows) for k, rows in groups.items()}
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        cols = self.columns
+        return [dict(zip(cols, r)) for r in self._rows]
+
+    @property
+    def nbytes(self) -> int:
+        """Rough heap footprint, used to bound the query cache."""
+        total = sys.getsizeof(self._rows)
+        for r in self._rows:
+            total += sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r)
+        return total
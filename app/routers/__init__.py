@@ -12,4 +12,5 @@ from . import (
     portfolios,
     transactions,
     content,
+    admin,
 )  # noqa: F401
@@ -0,0 +1,103 @@
+# ─────────────────────────────────────────────
+# app/routers/admin.py
+# ─────────────────────────────────────────────
+"""
+Operational endpoints for tuning the service under load.
+
+Every route needs a session token whose role is in ``ADMIN_ROLES``.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from typing import Optional
+
+from app import aws_clients
+from app.athena_admission import priority
+from app.deps import (
+    admin_user, get_athena_client, get_bedrock_governor, get_credential_index, get_snapshot,
+)
+from app.routers.kb import answer_caches
+
+# refreshes reload whole tables: same class as the loads done at startup
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(admin_user), Depends(priority("background"))],
+)
+
+
+@router.get("/athena")
+async def athena_stats(athena=Depends(get_athena_client)):
+    return athena.stats()
+
+
+@router.get("/bedrock")
+async def bedrock_stats(governor=Depends(get_bedrock_governor)):
+    """Per-model concurrency limit, queue depth and throttle counts."""
+    return governor.stats()
+
+
+@router.get("/kb-cache")
+async def kb_cache_stats():
+    """Hit rate and generation time saved per knowledge-base endpoint."""
+    return {kind: cache.stats() for kind, cache in answer_caches.items()}
+
+
+@router.delete("/kb-cache")
+async def clear_kb_cache():
+    for cache in answer_caches.values():
+        cache.clear()
+    return {kind: cache.stats() for kind, cache in answer_caches.items()}
+
+
+@router.get("/aws")
+async def aws_stats():
+    """Connection pool size and peak in-flight requests per boto3 client."""
+    return aws_clients.stats()
+
+
+@router.get("/auth")
+async def auth_stats(index=Depends(get_credential_index)):
+    return index.stats()
+
+
+@router.post("/auth/refresh")
+async def refresh_auth(athena=Depends(get_athena_client), index=Depends(get_credential_index)):
+    """Reload the credential index now (e.g. right after adding a user)."""
+    await index.refresh(athena)
+    return index.stats()
+
+
+@router.get("/snapshot")
+async def snapshot_stats(snapshot=Depends(get_snapshot)):
+    """Rows and age of each locally snapshotted dimension table."""
+    return snapshot.stats()
+
+
+@router.post("/snapshot/refresh")
+async def refresh_snapshot(
+    table: Optional[str] = None,
+    athena=Depends(get_athena_client),
+    snapshot=Depends(get_snapshot),
+):
+    """Re-pull one snapshotted table (``?table=``) or all of them right now."""
+    if table is not None and table not in snapshot.tables:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f"{table!r} is not a snapshotted table")
+    loaded = await snapshot.refresh(athena, [table] if table else ())
+    return {"loaded": loaded, **snapshot.stats()}
+
+
+@router.get("/cache")
+async def cache_stats(athena=Depends(get_athena_client)):
+    return athena.cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache(athena=Depends(get_athena_client)):
+    athena.cache.clear()
+    return athena.cache.stats()
+
+
+@router.delete("/cache/{table}")
+async def invalidate_table(table: str, athena=Depends(get_athena_client)):
+    return {"table": table, "invalidated": athena.invalidate(table)}
@@ -3,40 +3,35 @@
 # ─────────────────────────────────────────────
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-from app.deps import get_athena_client
+from app.athena_admission import priority
+from app.deps import get_athena_client, get_snapshot
 from app.models import Advisor, Client ,AdvisorDetail
+from app.serialization import RowsResponse
+from app.statements import bind
 
 router = APIRouter(prefix="/advisors", tags=["Advisors"])
 
 
 @router.get("/", response_model=List[Advisor])
-def list_advisors(athena=Depends(get_athena_client)):
-    sql = "SELECT advisor_id, first_name, last_name, email FROM advisors"
-    return athena.query(sql)
+async def list_advisors(request: Request, athena=Depends(get_athena_client)):
+    return RowsResponse(await athena.aquery(bind("advisors_list")), Advisor, request)
 
 
 @router.get("/{advisor_id}/clients", response_model=List[Client])
-def clients_of_advisor(advisor_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT c.client_id, c.first_name, c.last_name, c.age
-        FROM clients c
-        JOIN client_advisor_assignments a ON a.client_id = c.client_id
-        WHERE a.advisor_id = '{advisor_id}'
-    """
-    return athena.query(sql)
+async def clients_of_advisor(advisor_id: str, request: Request, athena=Depends(get_athena_client)):
+    rows = await athena.aquery(bind("clients_of_advisor", advisor_id))
+    return RowsResponse(rows, Client, request)
 
 # 3️⃣  **NEW**: full details for one advisor  ────────────────────────────
-@router.get("/{advisor_id}", response_model=AdvisorDetail)
-def advisor_detail(advisor_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT *
-        FROM advisors
-        WHERE advisor_id = '{advisor_id}'
-        LIMIT 1
-    """
-    rows = athena.query(sql)
+@router.get("/{advisor_id}", response_model=AdvisorDetail, dependencies=[Depends(priority("interactive"))])
+async def advisor_detail(
+    advisor_id: str, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    rows = snapshot.lookup("advisors", "advisor_id", advisor_id)
+    if rows is None:
+        rows = await athena.aquery(bind("advisor_detail", advisor_id))
     if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
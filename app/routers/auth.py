@@ -1,47 +1,49 @@
 # ─────────────────────────────────────────────
 # app/routers/auth.py
 # ─────────────────────────────────────────────
+from typing import Any, Dict
+
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.deps import get_athena_client
+from app.athena_admission import priority
+from app.credentials import user_details
+from app.deps import current_user, get_athena_client, get_credential_index
 from app.models import LoginRequest, LoginResponse ,UserDetails
+from app.sessions import issue
+from app.statements import bind
 
-router = APIRouter()
+# logins are what users notice first: never queue them behind reports
+router = APIRouter(dependencies=[Depends(priority("interactive"))])
 
 
 # app/routers/auth.py
 @router.post("/login", response_model=UserDetails)
-def login(credentials: LoginRequest, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT
-            "UserId",
-            "AwsUserName",
-            "User",
-            "UserARN",
-            "DashboardId",
-            "Role",
-            "Email",
-            "Region"
-        FROM role
-        WHERE "user" = '{credentials.username}'
-          AND "user_password" = '{credentials.password}'
-        LIMIT 1
-    """
-    rows = athena.query(sql)
-    if not rows:
+async def login(
+    credentials: LoginRequest,
+    athena=Depends(get_athena_client),
+    index=Depends(get_credential_index),
+):
+    if index.loaded:
+        user = index.verify(credentials.username, credentials.password)
+    else:
+        # index not loaded yet (startup, Athena hiccup) – ask Athena directly
+        rows = await athena.aquery(bind("login", credentials.username, credentials.password))
+        user = user_details(rows[0]) if rows else None
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
-    # Rename keys from DB to python-friendly field names
-    record = rows[0]
-    return {
-        "user_id":      record["UserId"],
-        "aws_user_name":record["AwsUserName"],
-        "user":         record["User"],
-        "user_arn":     record["UserARN"],
-        "dashboard_id": record["DashboardId"],
-        "role":         record["Role"],
-        "email":        record["Email"],
-        "region":       record["Region"],
-    }
+    token = issue({
+        "sub": str(user["user_id"]),
+        "user": user["user"],
+        "role": user["role"],
+        "dashboard_id": user["dashboard_id"],
+    })
+    return {**user, "token": token}
+
+
+@router.get("/me")
+async def me(claims: Dict[str, Any] = Depends(current_user)):
+    """Claims of the caller's session token – no Athena round-trip."""
+    return claims
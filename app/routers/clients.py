@@ -1,65 +1,91 @@
 # ─────────────────────────────────────────────
 # app/routers/clients.py
 # ─────────────────────────────────────────────
-from typing import List
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field, Extra
-from app.deps import get_athena_client
-from app.models import Client, Portfolio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import Field
+from app.athena_admission import priority
+from app.deps import get_athena_client, get_snapshot
+from app.models import AthenaDetail, Client, IdBatch, Portfolio
+from app.pagination import Keyset, page_limit, paginate
+from app.result_set import ResultSet
+from app.serialization import RowsResponse
+from app.statements import bind, bind_batch
+from app.streaming import ndjson_response, wants_ndjson
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
 
+_PAGES = Keyset("clients_list", "clients_list_after", ("client_id",), "clients")
+
+
 @router.get("/", response_model=List[Client])
-def list_clients(limit: int = 100, athena=Depends(get_athena_client)):
-    sql = f"SELECT client_id, first_name, last_name, age FROM clients LIMIT {limit}"
-    return athena.query(sql)
+async def list_clients(
+    request: Request,
+    response: Response,
+    limit: int = page_limit(100),
+    cursor: Optional[str] = None,
+    athena=Depends(get_athena_client),
+):
+    """Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the next page."""
+    if wants_ndjson(request):
+        return await ndjson_response(athena.aiter_pages(bind("clients_list", limit)), Client)
+    rows = await paginate(athena, _PAGES, (), limit, cursor, response)
+    return RowsResponse(rows, Client, request, headers=response.headers)
+
 
+@router.post("/portfolios:batch", response_model=Dict[str, List[Portfolio]])
+async def portfolios_batch(
+    batch: IdBatch, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    """Portfolios of many clients at once, keyed by client id."""
+    ids = list(dict.fromkeys(batch.ids))
+    rows = snapshot.lookup_many(
+        "portfolios", "client_id", ids,
+        ("portfolio_id", "client_id", "portfolio_name", "total_value"),
+    )
+    parts = [rows] if rows is not None else await athena.aquery_many(
+        bind_batch("portfolios_for_clients", ids)
+    )
+    groups: Dict[str, ResultSet] = {}
+    for part in parts:
+        groups.update(part.group_by("client_id"))
+    return {cid: groups.get(cid, ()) for cid in ids}
 
-class ClientDetail(BaseModel, extra=Extra.allow):
+
+class ClientDetail(AthenaDetail):
     """
     Dynamically accepts *all* columns returned by Athena for a client
     and adds a `funds` field with the list of invested-in funds.
     """
     funds: List[str] = Field(default_factory=list, description="Funds invested in")
 
-@router.get("/{client_id}", response_model=ClientDetail)
-def client_detail(client_id: str, athena=Depends(get_athena_client)):
-    # ── 1. Full client record ─────────────────────────────────────────────
-    client_sql = f"""
-        SELECT *
-        FROM clients
-        WHERE client_id = '{client_id}'
-        LIMIT 1
-    """
-    client_rows = athena.query(client_sql)
+@router.get("/{client_id}", response_model=ClientDetail, dependencies=[Depends(priority("interactive"))])
+async def client_detail(
+    client_id: str, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    # ── 1. Full client record + list of funds the client holds ────────────
+    client_rows = snapshot.lookup("clients", "client_id", client_id)
+    if client_rows is not None:
+        funds_rows = await athena.aquery(bind("client_funds", client_id))
+    else:  # no snapshot: both from Athena, in parallel
+        client_rows, funds_rows = await athena.aquery_many(
+            [bind("client_detail", client_id), bind("client_funds", client_id)]
+        )
     if not client_rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client not found",
         )
     client_record = dict(client_rows[0])          # make it mutable
+    client_record["funds"] = funds_rows.column("product_name")
 
-    # ── 2. List of funds the client holds ────────────────────────────────
-    funds_sql = f"""
-        SELECT DISTINCT product_name
-        FROM portfolio_holdings
-        WHERE client_id = '{client_id}'
-          AND product_name IS NOT NULL
-    """
-    funds_rows = athena.query(funds_sql)
-    client_record["funds"] = [row["product_name"] for row in funds_rows]
-
-    # ── 3. Return combined result ────────────────────────────────────────
+    # ── 2. Return combined result ────────────────────────────────────────
     return client_record
 
 
 @router.get("/{client_id}/portfolios", response_model=List[Portfolio])
-def portfolios_for_client(client_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT portfolio_id, client_id, portfolio_name, total_value
-        FROM portfolios
-        WHERE client_id = '{client_id}'
-    """
-    return athena.query(sql)
+async def portfolios_for_client(client_id: str, request: Request, athena=Depends(get_athena_client)):
+    rows = await athena.aquery(bind("portfolios_for_client", client_id))
+    return RowsResponse(rows, Portfolio, request)
@@ -3,40 +3,52 @@
 # ─────────────────────────────────────────────
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
-from app.deps import get_athena_client
+from app.athena_admission import priority
+from app.deps import get_athena_client, get_snapshot
 from app.models import Content
+from app.pagination import Keyset, page_limit, paginate
+from app.serialization import RowsResponse
+from app.statements import bind
+from app.streaming import ndjson_response, wants_ndjson
 
 router = APIRouter(prefix="/content", tags=["ThoughtLeadership"])
 
 
+_KEY = ("creation_date", "content_id")
+_TABLE = "thought_leadership_content"
+_PAGES = Keyset("content_list", "content_list_after", _KEY, _TABLE)
+_THEME_PAGES = Keyset("content_list_by_theme", "content_list_by_theme_after", _KEY, _TABLE)
+
+
 @router.get("/", response_model=List[Content])
-def list_content(
-    limit: int = 100,
+async def list_content(
+    request: Request,
+    response: Response,
+    limit: int = page_limit(100),
     theme: Optional[str] = None,
+    cursor: Optional[str] = None,
     athena=Depends(get_athena_client),
 ):
-    theme_filter = f"WHERE theme = '{theme}'" if theme else ""
-    sql = f"""
-        SELECT content_id, title, content_type, theme, creation_date
-        FROM thought_leadership_content
-        {theme_filter}
-        ORDER BY creation_date DESC
-        LIMIT {limit}
-    """
-    return athena.query(sql)
-
-
-@router.get("/{content_id}", response_model=Content)
-def content_detail(content_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT content_id, title, content_type, theme, creation_date
-        FROM thought_leadership_content
-        WHERE content_id = '{content_id}'
-        LIMIT 1
-    """
-    rows = athena.query(sql)
+    """Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the next page."""
+    pages, filters = (_THEME_PAGES, (theme,)) if theme else (_PAGES, ())
+    if wants_ndjson(request):
+        query = bind(pages.first, *filters, limit)
+        return await ndjson_response(athena.aiter_pages(query), Content)
+    rows = await paginate(athena, pages, filters, limit, cursor, response)
+    return RowsResponse(rows, Content, request, headers=response.headers)
+
+
+@router.get("/{content_id}", response_model=Content, dependencies=[Depends(priority("interactive"))])
+async def content_detail(
+    content_id: str, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    rows = snapshot.lookup(
+        "thought_leadership_content", "content_id", content_id, list(Content.model_fields)
+    )
+    if rows is None:
+        rows = await athena.aquery(bind("content_detail", content_id))
     if not rows:
         raise HTTPException(status_code=404, detail="Content not found")
     return rows[0]
@@ -1,11 +1,18 @@
 # app/routers/kb.py
-import logging, os
-from fastapi import APIRouter, HTTPException, Request
+import logging, math, os, time
+from typing import Callable
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-import boto3
 from botocore.exceptions import ClientError
 
-router = APIRouter(tags=["knowledge-base"])
+from app import aws_clients
+from app.answer_cache import AnswerCache
+from app.bedrock_governor import BedrockBusy
+from app.deadlines import deadline
+from app.deps import get_bedrock_governor
+
+# up to three model calls in a row (combined endpoint)
+router = APIRouter(tags=["knowledge-base"], dependencies=[Depends(deadline(90))])
 
 # ── logger (same pattern as quicksight_embed) ─────────────────────────────
 logger = logging.getLogger("kb")
@@ -35,20 +42,55 @@ SUMMARY_MODEL_ID = os.getenv(
 )
 
 # ── boto clients (credentials via env/instance role; no hard-coded keys) ─
-agent   = boto3.client("bedrock-agent-runtime", region_name=AWS_REGION)
-runtime = boto3.client("bedrock-runtime",        region_name=AWS_REGION)
+# shared and pooled (app/aws_clients.py), built on first use; botocore's own
+# retries are off for Bedrock: the governor retries, and it needs to see every
+# throttle.  Tests and benchmarks may assign stand-ins here.
+agent   = None
+runtime = None
+
+def _agent():
+    return agent or aws_clients.client("bedrock-agent-runtime")
+
+def _runtime():
+    return runtime or aws_clients.client("bedrock-runtime")
+
+# ── answer caches (one per endpoint; see app/answer_cache.py) ────────────
+answer_caches = {
+    "structured": AnswerCache(),
+    "unstructured": AnswerCache(),
+    "combined": AnswerCache(),
+}
+
+def _cached(kind: str, txt: str, produce: Callable[[str], str]) -> str:
+    """Answer *txt* from the *kind* cache, or produce it and remember how long it took."""
+    cache = answer_caches[kind]
+    hit = cache.get(txt)
+    if hit is not None:
+        logger.info("Answer cache hit (%s)", kind)
+        return hit
+    started = time.perf_counter()
+    ans = produce(txt)
+    cache.put(txt, ans, time.perf_counter() - started)
+    return ans
 
 # ── request model ─────────────────────────────────────────────────────────
 class QueryRequest(BaseModel):
     query: str
 
 # ── helpers (function names/flow analogous to your file) ──────────────────
+def _busy(what: str, e: BedrockBusy) -> HTTPException:
+    """503 + Retry-After for calls the governor could not get through in time."""
+    logger.warning("Bedrock (%s) busy: %s", what, e)
+    return HTTPException(
+        503, f"Bedrock ({what}) busy: {e}", headers={"Retry-After": str(math.ceil(e.retry_after))}
+    )
+
 def getResponseFromKB(txt: str) -> str:
     """
     Your original getResponseFromKB() but without hard-coded creds and using KB_MODEL_ARN.
     """
     try:
-        resp = agent.retrieve_and_generate(
+        resp = get_bedrock_governor().call(KB_MODEL_ARN, lambda: _agent().retrieve_and_generate(
             input={"text": txt},
             retrieveAndGenerateConfiguration={
                 "type": "KNOWLEDGE_BASE",
@@ -57,8 +99,10 @@ def getResponseFromKB(txt: str) -> str:
                     "modelArn": KB_MODEL_ARN,
                 },
             },
-        )
+        ))
         return (resp.get("output") or {}).get("text", "")
+    except BedrockBusy as e:
+        raise _busy("structured KB", e)
     except ClientError as e:
         msg = e.response.get("Error", {}).get("Message", str(e))
         raise HTTPException(502, f"Bedrock (structured KB) error: {msg}")
@@ -70,7 +114,7 @@ def getResponseFromUSKB(txt: str) -> str:
     Your original getResponseFromUSKB() but without hard-coded creds and using KB_MODEL_ARN.
     """
     try:
-        resp = agent.retrieve_and_generate(
+        resp = get_bedrock_governor().call(KB_MODEL_ARN, lambda: _agent().retrieve_and_generate(
             input={"text": txt},
             retrieveAndGenerateConfiguration={
                 "type": "KNOWLEDGE_BASE",
@@ -79,8 +123,10 @@ def getResponseFromUSKB(txt: str) -> str:
                     "modelArn": KB_MODEL_ARN,
                 },
             },
-        )
+        ))
         return (resp.get("output") or {}).get("text", "")
+    except BedrockBusy as e:
+        raise _busy("unstructured KB", e)
     except ClientError as e:
         msg = e.response.get("Error", {}).get("Message", str(e))
         raise HTTPException(502, f"Bedrock (unstructured KB) error: {msg}")
@@ -93,13 +139,15 @@ def _converse_text(model_id: str, prompt: str) -> str:
     with the same effect but no explicit keys.
     """
     try:
-        out = runtime.converse(
+        out = get_bedrock_governor().call(model_id, lambda: _runtime().converse(
             modelId=model_id,
             messages=[{"role": "user", "content": [{"text": prompt}]}],
             inferenceConfig={"maxTokens": 512, "temperature": 0.7},
-        )
+        ))
         parts = out.get("output", {}).get("message", {}).get("content", []) or []
         return "".join(p.get("text", "") for p in parts).strip()
+    except BedrockBusy as e:
+        raise _busy("summarize", e)
     except ClientError as e:
         msg = e.response.get("Error", {}).get("Message", str(e))
         raise HTTPException(502, f"Bedrock summarize error: {msg}")
@@ -125,14 +173,15 @@ def getCombinedResponse(request: QueryRequest, req: Request):
     ua = req.headers.get("user-agent", "-")
     logger.info("REQ /getCombinedResponse from %s | ua=%s", client_ip, ua)
 
-    txt = request.query
-    resp_structured   = getResponseFromKB(txt)
-    resp_unstructured = getResponseFromUSKB(txt)
-    combined          = generate_response(txt, resp_structured, resp_unstructured)
+    def produce(txt: str) -> str:
+        resp_structured   = _cached("structured", txt, getResponseFromKB)
+        resp_unstructured = _cached("unstructured", txt, getResponseFromUSKB)
+        combined          = generate_response(txt, resp_structured, resp_unstructured)
+        logger.info("Combined response generated (len structured=%d, len unstructured=%d)",
+                    len(resp_structured), len(resp_unstructured))
+        return combined
 
-    logger.info("Combined response generated (len structured=%d, len unstructured=%d)",
-                len(resp_structured), len(resp_unstructured))
-    return {"answer": combined}
+    return {"answer": _cached("combined", request.query, produce)}
 
 @router.post("/getstructuredresponse")
 def getstructuredresponse(request: QueryRequest, req: Request):
@@ -140,8 +189,7 @@ def getstructuredresponse(request: QueryRequest, req: Request):
     ua = req.headers.get("user-agent", "-")
     logger.info("REQ /getstructuredresponse from %s | ua=%s", client_ip, ua)
 
-    txt = request.query
-    ans = getResponseFromKB(txt)
+    ans = _cached("structured", request.query, getResponseFromKB)
     return {"answer": ans}
 
 @router.post("/getunstructuredresponse")
@@ -150,6 +198,5 @@ def getunstructuredresponse(request: QueryRequest, req: Request):
     ua = req.headers.get("user-agent", "-")
     logger.info("REQ /getunstructuredresponse from %s | ua=%s", client_ip, ua)
 
-    txt = request.query
-    ans = getResponseFromUSKB(txt)
+    ans = _cached("unstructured", request.query, getResponseFromUSKB)
     return {"answer": ans}
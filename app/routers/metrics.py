@@ -0,0 +1,27 @@
+# ─────────────────────────────────────────────
+# app/routers/metrics.py
+# ─────────────────────────────────────────────
+"""
+Prometheus scrape endpoint (see :mod:`app.metrics`).
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app import aws_clients
+from app.deps import get_athena_client
+from app.metrics import gauges, render
+
+router = APIRouter(tags=["Admin"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(athena=Depends(get_athena_client)):
+    stats = athena.stats()
+    extra = gauges("athena_cache", stats["cache"]) + gauges("athena_singleflight", stats["singleflight"])
+    extra += gauges("athena_admission", stats["admission"])
+    for name, cls in stats["admission"]["classes"].items():
+        extra += gauges(f"athena_admission_{name}", cls)
+    for service, pool in aws_clients.stats().items():
+        extra += gauges("aws_pool_" + service.replace("-", "_"), pool)
+    return PlainTextResponse(render(extra), media_type="text/plain; version=0.0.4")
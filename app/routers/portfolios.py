@@ -1,36 +1,79 @@
 # ─────────────────────────────────────────────
 # app/routers/portfolios.py
 # ─────────────────────────────────────────────
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
-from app.deps import get_athena_client
-from app.models import Portfolio, Holding
+from app.athena_admission import priority
+from app.deps import get_athena_client, get_snapshot
+from app.result_set import ResultSet
+from app.models import Holding, IdBatch, Portfolio
+from app.serialization import RowsResponse
+from app.statements import bind, bind_batch
 
 router = APIRouter(prefix="/portfolios", tags=["Portfolios"])
 
 
-@router.get("/{portfolio_id}", response_model=Portfolio)
-def get_portfolio(portfolio_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT portfolio_id, client_id, portfolio_name, total_value
-        FROM portfolios
-        WHERE portfolio_id = '{portfolio_id}'
-        LIMIT 1
+@router.post("/holdings:batch", response_model=Dict[str, List[Holding]])
+async def holdings_batch(
+    batch: IdBatch, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    """Holdings of many portfolios at once, keyed by portfolio id.
+
+    One ``IN (...)`` query per chunk of ids (chunks run in parallel) instead
+    of one execution per portfolio.
     """
-    rows = athena.query(sql)
+    ids = list(dict.fromkeys(batch.ids))
+    if "products" in snapshot.loaded_at:
+        parts = await athena.aquery_many(bind_batch("holdings_rows_for_portfolios", ids))
+        parts = [join_product_names(p, snapshot) for p in parts]
+    else:
+        parts = await athena.aquery_many(bind_batch("holdings_for_portfolios", ids))
+    groups: Dict[str, ResultSet] = {}
+    for part in parts:
+        groups.update(part.group_by("portfolio_id"))
+    return {pid: groups.get(pid, ()) for pid in ids}
+
+
+@router.get("/{portfolio_id}", response_model=Portfolio, dependencies=[Depends(priority("interactive"))])
+async def get_portfolio(
+    portfolio_id: str, athena=Depends(get_athena_client), snapshot=Depends(get_snapshot)
+):
+    rows = snapshot.lookup(
+        "portfolios", "portfolio_id", portfolio_id,
+        ("portfolio_id", "client_id", "portfolio_name", "total_value"),
+    )
+    if rows is None:
+        rows = await athena.aquery(bind("portfolio_detail", portfolio_id))
     if not rows:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     return rows[0]
 
 
-@router.get("/{portfolio_id}/holdings", response_model=List[Holding])
-def holdings_in_portfolio(portfolio_id: str, athena=Depends(get_athena_client)):
-    sql = f"""
-        SELECT h.product_id, h.shares, h.market_value, p.product_name
-        FROM portfolio_holdings h
-        JOIN products p ON p.product_id = h.product_id
-        WHERE h.portfolio_id = '{portfolio_id}'
-    """
-    return athena.query(sql)
+@router.get("/{portfolio_id}/holdings", response_model=List[Holding], dependencies=[Depends(priority("interactive"))])
+async def holdings_in_portfolio(
+    portfolio_id: str,
+    request: Request,
+    athena=Depends(get_athena_client),
+    snapshot=Depends(get_snapshot),
+):
+    if "products" not in snapshot.loaded_at:
+        rows = await athena.aquery(bind("holdings_in_portfolio", portfolio_id))
+    else:
+        # Holdings are a fact table (Athena); product names come from the snapshot.
+        holdings = await athena.aquery(bind("holdings_rows", portfolio_id))
+        rows = join_product_names(holdings, snapshot)
+    return RowsResponse(rows, Holding, request)
+
+
+def join_product_names(holdings: ResultSet, snapshot) -> ResultSet:
+    """Inner join of holding rows with snapshotted product names, like the SQL JOIN."""
+    ids = list({str(pid) for pid in holdings.column("product_id")})
+    products = snapshot.lookup_many("products", "product_id", ids, ("product_id", "product_name"))
+    names = {str(pid): name for pid, name in products.tuples}
+    i = holdings.columns.index("product_id")
+    return ResultSet(
+        holdings.columns + ("product_name",),
+        [row + (names[str(row[i])],) for row in holdings.tuples if str(row[i]) in names],
+    )
@@ -1,10 +1,13 @@
 # app/routers/quicksight_embed.py
-import logging, os, re
+import logging, os, re, threading, time
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-import boto3
 from botocore.exceptions import ClientError
 
+from app import aws_clients
+from app.config import settings
+from app.metrics import QUICKSIGHT_SECONDS, current_route
+
 router = APIRouter(tags=["quicksight"])
 
 # ── logger ────────────────────────────────────────────────────────────────
@@ -15,8 +18,12 @@ if not logger.handlers:
     _h.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s in %(name)s: %(message)s"))
     logger.addHandler(_h)
 
-# ── boto client (uses env or instance role) ───────────────────────────────
-qs = boto3.client("quicksight", region_name=os.getenv("AWS_REGION", "us-east-1"))
+# ── boto client (uses env or instance role; shared, see app/aws_clients.py) ──
+# built on first use; tests and benchmarks may assign a stand-in
+qs = None
+
+def _qs():
+    return qs or aws_clients.client("quicksight")
 
 # ── request model (only 2 fields) ────────────────────────────────────────
 class DashboardEmbedRequest(BaseModel):
@@ -37,6 +44,26 @@ def summarize_qs_user_arn(arn: str | None) -> dict:
     region, account, namespace, username = m.groups()
     return {"present": True, "region": region, "account": account, "namespace": namespace, "username": username}
 
+def _credentials_fingerprint() -> tuple:
+    """Cheap identity of the current credentials; changes when they rotate."""
+    # the shared long-lived session: resolving credentials per request is not free
+    creds = aws_clients.session().get_credentials()
+    access_key = creds.get_frozen_credentials().access_key if creds else None
+    return (access_key, os.getenv("AWS_ACCESS_KEY_ID"), os.getenv("AWS_PROFILE"))
+
+_snapshot_lock = threading.Lock()
+_snapshot: tuple = (None, None)  # (fingerprint, snapshot)
+
+def env_snapshot() -> dict:
+    """``safe_env_snapshot()`` computed once per set of credentials (logged when it changes)."""
+    global _snapshot
+    fingerprint = _credentials_fingerprint()
+    with _snapshot_lock:
+        if _snapshot[0] != fingerprint or _snapshot[1] is None:
+            _snapshot = (fingerprint, safe_env_snapshot())
+            logger.info("ENV snapshot: %s", _snapshot[1])
+        return _snapshot[1]
+
 def safe_env_snapshot() -> dict:
     return {
         "AWS_REGION": os.getenv("AWS_REGION", "us-east-1"),
@@ -48,13 +75,21 @@ def safe_env_snapshot() -> dict:
         "AWS_SECRET_ACCESS_KEY_present": bool(os.getenv("AWS_SECRET_ACCESS_KEY")),
         "AWS_SESSION_TOKEN_present": bool(os.getenv("AWS_SESSION_TOKEN")),
         "boto3_credentials_provider": (
-            boto3.Session().get_credentials().method if boto3.Session().get_credentials() else None
+            aws_clients.session().get_credentials().method
+            if aws_clients.session().get_credentials() else None
         ),
     }
 
 # ── endpoint ─────────────────────────────────────────────────────────────
 @router.post("/dashBoardEmbeddedUrl")
 def generate_dashboard_embed_url(req: DashboardEmbedRequest, request: Request):
+    """A fresh embed URL on every call.
+
+    The URL carries a one-time auth code: it must be opened within five
+    minutes and cannot be redeemed again, so it is never cached or shared
+    between requests – not even concurrent ones for the same user and
+    dashboard (a second tab or a reload would get an expired session).
+    """
     # request logging (sanitized)
     client_ip = request.client.host if request.client else "unknown"
     ua = request.headers.get("user-agent", "-")
@@ -64,7 +99,7 @@ def generate_dashboard_embed_url(req: DashboardEmbedRequest, request: Request):
         "REQ /dashBoardEmbeddedUrl from %s | ua=%s | dashboard_id=%s | user=%s",
         client_ip, ua, req.dashboardid, user_label
     )
-    logger.info("ENV snapshot: %s", safe_env_snapshot())
+    env_snapshot()
 
     # validations
     if not req.dashboardid:
@@ -84,15 +119,15 @@ def generate_dashboard_embed_url(req: DashboardEmbedRequest, request: Request):
 
     logger.info("Generating embed URL | account_id=%s | dashboard_id=%s | user=%s",
                 aws_account_id, req.dashboardid, user_label)
-
+    started, outcome = time.perf_counter(), "error"
     try:
-        resp = qs.generate_embed_url_for_registered_user(
+        resp = _qs().generate_embed_url_for_registered_user(
             AwsAccountId=aws_account_id,
             UserArn=req.userarn,
             ExperienceConfiguration={"Dashboard": {"InitialDashboardId": req.dashboardid}},
-            SessionLifetimeInMinutes=600,
-
+            SessionLifetimeInMinutes=settings.quicksight_session_minutes,
         )
+        outcome = "ok"
         logger.info("Embed URL generated | expiresAt=%s", resp.get("Expiration"))
         return {"embedUrl": resp["EmbedUrl"], "expiresAt": resp.get("Expiration")}
     except ClientError as e:
@@ -101,3 +136,5 @@ def generate_dashboard_embed_url(req: DashboardEmbedRequest, request: Request):
     except Exception as e:
         logger.exception("Unexpected error while generating embed URL")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        QUICKSIGHT_SECONDS.observe(time.perf_counter() - started, current_route(), outcome)
@@ -1,43 +1,52 @@
 # ─────────────────────────────────────────────
 # app/routers/transactions.py
 # ─────────────────────────────────────────────
+from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
+from app.athena_admission import priority
+from app.deadlines import deadline
 from app.deps import get_athena_client
 from app.models import Transaction
+from app.pagination import Keyset, page_limit, paginate
+from app.serialization import RowsResponse
+from app.statements import bind, transactions_query
+from app.streaming import ndjson_response, wants_ndjson
 
-router = APIRouter(prefix="/transactions", tags=["Transactions"])
+# the biggest table: give its scans longer than the default, and let them
+# queue behind interactive lookups rather than crowd them out
+router = APIRouter(
+    prefix="/transactions",
+    tags=["Transactions"],
+    dependencies=[Depends(deadline(60)), Depends(priority("report"))],
+)
 
 
 @router.get("/", response_model=List[Transaction])
-def list_transactions(
-    limit: int = 200,
+async def list_transactions(
+    request: Request,
+    response: Response,
+    limit: int = page_limit(200),
     client_id: Optional[str] = None,
     portfolio_id: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    cursor: Optional[str] = None,
     athena=Depends(get_athena_client),
 ):
-    where = []
-    if client_id:
-        where.append(f"client_id = '{client_id}'")
-    if portfolio_id:
-        where.append(f"portfolio_id = '{portfolio_id}'")
+    """Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
 
-    where_sql = "WHERE " + " AND ".join(where) if where else ""
-
-    sql = f"""
-        SELECT
-            transaction_id,
-            account_id,
-            product_id,
-            transaction_type,
-            quantity,
-            amount,
-            transaction_date
-        FROM transactions
-        {where_sql}
-        ORDER BY transaction_date DESC
-        LIMIT {limit}
+    ``from_date`` / ``to_date`` (inclusive, ``YYYY-MM-DD``) bound the transaction
+    date; on the compacted table they also limit the months Athena reads.
     """
-    return athena.query(sql)
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "from_date is after to_date")
+    name, filters = transactions_query(client_id, portfolio_id, from_date, to_date)
+    if wants_ndjson(request):
+        query = bind(name, *filters, limit)
+        return await ndjson_response(athena.aiter_pages(query), Transaction)
+    pages = Keyset(name, name + "_after", ("transaction_date", "transaction_id"), "transactions")
+    rows = await paginate(athena, pages, filters, limit, cursor, response)
+    return RowsResponse(rows, Transaction, request, headers=response.headers)
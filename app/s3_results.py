@@ -0,0 +1,157 @@
+# ─────────────────────────────────────────────
+# app/s3_results.py
+# ─────────────────────────────────────────────
+"""
+Bulk reader for the CSV file Athena writes under ``ATHENA_OUTPUT``.
+
+``GetQueryResults`` hands back at most 1 000 rows per API call; for big
+results it is much quicker to pull the CSV object itself.  The object is
+fetched as parallel ranged GETs (a bounded window ahead of the parser) and
+parsed as a stream, so memory stays at roughly ``window × part size``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from app import aws_clients
+from app.config import settings
+
+
+def split_s3_uri(uri: str) -> Tuple[str, str]:
+    """``s3://bucket/key`` → ``(bucket, key)``."""
+    if not uri.startswith("s3://"):
+        raise ValueError(f"not an S3 URI: {uri}")
+    bucket, _, key = uri[5:].partition("/")
+    return bucket, key
+
+
+def _records(lines: Iterable[str]) -> Iterator[str]:
+    """Join lines into whole CSV records (a quoted value may span lines)."""
+    pending = ""
+    for line in lines:
+        pending += line
+        if pending.count('"') % 2 == 0:
+            yield pending
+            pending = ""
+    if pending:
+        yield pending
+
+
+_QUOTED = re.compile(r'"((?:[^"]|"")*)"')
+
+
+def _split(record: str) -> List[Optional[str]]:
+    """Fields of one record, ``None`` for unquoted empty ones (Athena's NULL)."""
+    record = record.rstrip("\r\n")
+    out: List[Optional[str]] = []
+    i, n = 0, len(record)
+    while True:
+        if record.startswith('"', i):
+            m = _QUOTED.match(record, i)
+            value = m.group(1) if m else record[i + 1:]
+            out.append(value.replace('""', '"'))
+            i = m.end() if m else n
+        else:
+            j = record.find(",", i)
+            j = n if j < 0 else j
+            out.append(record[i:j] or None)
+            i = j
+        if i >= n:
+            return out
+        i += 1  # the comma
+
+
+class S3ResultReader:
+    """Stream rows out of an Athena CSV result with parallel ranged GETs."""
+
+    def __init__(
+        self,
+        s3: Any = None,
+        *,
+        part_size: int = settings.s3_bulk_part_size,
+        concurrency: int = settings.s3_bulk_concurrency,
+    ) -> None:
+        self._s3 = s3 or aws_clients.client("s3", endpoint_url=settings.s3_endpoint_url)
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="s3-results")
+
+    # ------------------------------------------------------------------
+    def size(self, uri: str) -> int:
+        bucket, key = split_s3_uri(uri)
+        return self._s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+
+    def iter_rows(
+        self, uri: str, *, size: Optional[int] = None, skip: int = 0
+    ) -> Iterator[List[Optional[str]]]:
+        """Yield data rows (header and the first *skip* rows dropped).
+
+        Athena quotes every value and writes NULL as an empty unquoted
+        field, which comes back as ``None`` here just like a missing
+        ``VarCharValue`` does; an empty string (``""``) stays ``""``.
+        """
+        size = self.size(uri) if size is None else size
+        last = [""]
+
+        def records() -> Iterator[str]:
+            for record in _records(self._iter_lines(uri, size)):
+                last[0] = record
+                yield record
+
+        reader = csv.reader(records())
+        next(reader, None)  # header
+        for _ in range(skip):
+            if next(reader, None) is None:
+                return
+        for values in reader:
+            # csv reads NULL and "" alike; only then look at the quoting
+            yield _split(last[0]) if "" in values else values
+
+    # ------------------------------------------------------------------
+    def _iter_lines(self, uri: str, size: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        tail = ""
+        for chunk in self._iter_chunks(uri, size):
+            # Split on "\n" only: str.splitlines would also break on \x1c etc.
+            lines = (tail + decoder.decode(chunk)).split("\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line + "\n"
+        tail += decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def _iter_chunks(self, uri: str, size: int) -> Iterator[bytes]:
+        """Ranged GETs in order, keeping up to ``concurrency`` requests in flight."""
+        bucket, key = split_s3_uri(uri)
+        ranges = iter(range(0, size, self.part_size))
+        window: Deque[Future] = deque()
+
+        def submit() -> bool:
+            start = next(ranges, None)
+            if start is None:
+                return False
+            end = min(start + self.part_size, size) - 1
+            window.append(self._pool.submit(self._get_range, bucket, key, start, end))
+            return True
+
+        try:
+            while len(window) < self.concurrency and submit():
+                pass
+            while window:
+                chunk = window.popleft().result()
+                submit()
+                yield chunk
+        finally:
+            for fut in window:
+                fut.cancel()
+
+    def _get_range(self, bucket: str, key: str, start: int, end: int) -> bytes:
+        resp = self._s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+        return resp["Body"].read()
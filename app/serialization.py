@@ -0,0 +1,167 @@
+# ─────────────────────────────────────────────
+# app/serialization.py
+# ─────────────────────────────────────────────
+"""
+JSON bodies for list endpoints without a pydantic model per row.
+
+Given a ``response_model=List[Transaction]``, FastAPI builds one
+``Transaction`` per row, dumps each back to a dict and encodes the lot –
+three passes over every row, two of them in Python.  The rows a router
+returns here come from :class:`~app.athena_client.AthenaClient` already
+decoded to Python types, so :class:`RowsResponse` skips the models: each
+*model* is mirrored once as a ``TypedDict`` with the same fields and config,
+and a ``TypeAdapter`` for a list of those validates the whole page (the
+coercions ``AthenaRow`` relies on still apply, extra columns are dropped)
+and writes JSON bytes in one call each, inside pydantic-core.
+
+Routes keep ``response_model`` for the OpenAPI schema; returning a
+``Response`` makes FastAPI send it as is.
+
+The front end polls the same lists over and over, so a response also
+carries an ``ETag`` (a hash of the JSON) with ``Cache-Control: no-cache``:
+the browser revalidates with ``If-None-Match`` and gets an empty 304 while
+the rows are unchanged.  Bodies of ``RESPONSE_GZIP_MIN_BYTES`` or more go
+out gzipped when the client accepts it.  The JSON, its ETag and the gzipped
+copy are kept with the ``ResultSet`` (:meth:`~app.result_set.ResultSet.memo`),
+so while a result sits in the query cache a repeat request – 304 or not –
+neither serializes nor compresses again.  (These bodies are not counted
+against ``QUERY_CACHE_MAX_BYTES``; gzipped JSON is a fraction of the rows.)
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, Union
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+from app.config import settings
+from app.result_set import ResultSet
+
+Rows = Union[ResultSet, Iterable[Mapping[str, Any]]]
+
+# zlib's default: most of level 9's ratio for a fraction of its CPU
+GZIP_LEVEL = 6
+
+_REFUSED = re.compile(r"q=0(\.0{0,3})?")
+
+
+@lru_cache(maxsize=None)
+def _shape(model: Type[BaseModel]) -> type:
+    """A ``TypedDict`` with *model*'s fields; defaulted fields may be missing."""
+    fields: Dict[str, Any] = {
+        name: f.annotation if f.is_required() else NotRequired[f.annotation]  # type: ignore[valid-type]
+        for name, f in model.model_fields.items()
+    }
+    shape = TypedDict(f"{model.__name__}Row", fields)  # type: ignore[misc]
+    shape.__pydantic_config__ = dict(model.model_config)  # type: ignore[attr-defined]
+    return shape
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[_shape(model)])  # type: ignore[misc]
+
+
+@lru_cache(maxsize=None)
+def row_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(_shape(model))
+
+
+def _dicts(rows: Rows) -> List[Any]:
+    return rows.to_dicts() if isinstance(rows, ResultSet) else list(rows)
+
+
+def dump_rows(rows: Rows, model: Type[BaseModel]) -> bytes:
+    """*rows* as a JSON array of *model*-shaped objects."""
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(_dicts(rows)))
+
+
+def dump_lines(rows: Rows, model: Type[BaseModel]) -> bytes:
+    """*rows* as newline-terminated JSON objects (NDJSON)."""
+    items = list_adapter(model).validate_python(_dicts(rows))
+    dump = row_adapter(model).dump_json
+    return b"".join(dump(item) + b"\n" for item in items)
+
+
+class _Body:
+    """One result serialized as one model: JSON, its ETag, gzipped on demand."""
+
+    __slots__ = ("json", "etag", "_gzip")
+
+    def __init__(self, json: bytes) -> None:
+        self.json = json
+        # weak: the gzipped and plain bodies are the same representation
+        self.etag = f'W/"{hashlib.blake2b(json, digest_size=16).hexdigest()}"'
+        self._gzip: Optional[bytes] = None
+
+    def gzip(self) -> bytes:
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.json, GZIP_LEVEL, mtime=0)
+        return self._gzip
+
+
+def _body(rows: Rows, model: Type[BaseModel]) -> _Body:
+    if isinstance(rows, ResultSet):
+        return rows.memo(("json", model), lambda r: _Body(dump_rows(r, model)))
+    return _Body(dump_rows(rows, model))
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches *etag* (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == tag for t in if_none_match.split(","))
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an ``Accept-Encoding`` header allows gzip (``;q=0`` refuses it)."""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return not _REFUSED.fullmatch(params.replace(" ", "").lower())
+    return False
+
+
+class RowsResponse(Response):
+    """*rows* serialized as ``List[model]``: 304, gzipped or plain JSON.
+
+    Pass the *request* for the ``If-None-Match`` / ``Accept-Encoding``
+    handling; without it the body is always plain JSON.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        rows: Rows,
+        model: Type[BaseModel],
+        request: Optional[Request] = None,
+        *,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        body = _body(rows, model)
+        out: Dict[str, str] = dict(headers or {})
+        out.update({"ETag": body.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+        request_headers = request.headers if request is not None else {}
+        if not_modified(request_headers.get("if-none-match"), body.etag):
+            self.media_type = None
+            super().__init__(None, 304, out)
+        elif (
+            len(body.json) >= settings.response_gzip_min_bytes
+            and accepts_gzip(request_headers.get("accept-encoding"))
+        ):
+            out["Content-Encoding"] = "gzip"
+            super().__init__(body.gzip(), status_code, out)
+        else:
+            super().__init__(body.json, status_code, out)
@@ -0,0 +1,97 @@
+# ─────────────────────────────────────────────
+# app/sessions.py
+# ─────────────────────────────────────────────
+"""
+Stateless, HMAC-signed session tokens.
+
+A token is ``<payload>.<signature>``, both base64url without padding: the
+payload is the JSON claims (including ``exp``) and the signature is
+HMAC-SHA256 over it with ``SESSION_SECRET``.  Verifying one needs neither
+Athena nor the credential index.  Without ``SESSION_SECRET`` a random secret
+is used, so tokens only survive as long as the process (and are not shared
+between workers).
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger("auth")
+
+_secret: Optional[bytes] = None
+
+
+class InvalidToken(Exception):
+    """Malformed, tampered-with or expired session token."""
+
+
+def _key() -> bytes:
+    global _secret
+    if _secret is None:
+        if settings.session_secret:
+            _secret = settings.session_secret.encode()
+        else:
+            logger.warning("SESSION_SECRET not set; session tokens end with this process")
+            _secret = os.urandom(32)
+    return _secret
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str, purpose: str) -> str:
+    # the purpose is part of the MAC, so e.g. a page cursor is never a valid session
+    message = f"{purpose}.{payload}".encode()
+    return _b64(hmac.new(_key(), message, hashlib.sha256).digest())
+
+
+def sign(data: Dict[str, Any], purpose: str = "session") -> str:
+    """Tamper-proof (not encrypted) token for *data*; also used for page cursors."""
+    payload = _b64(json.dumps(data, separators=(",", ":"), sort_keys=True).encode())
+    return f"{payload}.{_sign(payload, purpose)}"
+
+
+def unsign(token: str, purpose: str = "session") -> Dict[str, Any]:
+    # tokens are base64url; anything else would make compare_digest raise TypeError
+    if not token.isascii():
+        raise InvalidToken("bad signature")
+    payload, _, signature = token.partition(".")
+    if not payload or not signature or not hmac.compare_digest(
+        signature.encode(), _sign(payload, purpose).encode()
+    ):
+        raise InvalidToken("bad signature")
+    try:
+        data = json.loads(_unb64(payload))
+    except ValueError as e:
+        raise InvalidToken("bad payload") from e
+    if not isinstance(data, dict):
+        raise InvalidToken("bad payload")
+    return data
+
+
+def issue(claims: Dict[str, Any], ttl: Optional[float] = None) -> str:
+    """Signed token carrying *claims* plus an ``exp`` timestamp."""
+    ttl = settings.session_ttl_seconds if ttl is None else ttl
+    return sign(dict(claims, exp=int(time.time() + ttl)))
+
+
+def verify(token: str) -> Dict[str, Any]:
+    """Claims of a valid token; raises :class:`InvalidToken` otherwise."""
+    claims = unsign(token)
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("expired")
+    return claims
@@ -0,0 +1,114 @@
+# ─────────────────────────────────────────────
+# app/singleflight.py
+# ─────────────────────────────────────────────
+"""
+Coalesce identical concurrent calls into one execution.
+
+While a call for some key is running, later callers with the same key wait
+for that call instead of starting their own, and all of them receive the
+same result (or exception).  ``do`` is the thread flavour, ``ado`` the
+asyncio one; both count how many executions were saved.
+
+An ``ado`` call outlives any single waiter being cancelled, but once the last
+waiter has given up (deadline, client gone) the call itself is cancelled, so
+nothing keeps running on behalf of nobody.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        self.executions = 0  # calls that really ran
+        self.coalesced = 0  # calls that piggy-backed on a running one
+        self.abandoned = 0  # calls cancelled because every waiter went away
+
+    # ------------------------------------------------------------------
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await *fn()* once per key; the shared task survives a waiter being
+        cancelled, but not the last one (it is cancelled with the same message)."""
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = loop.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError as e:
+            if self._waiters[task] == 1 and not task.done():
+                self.abandoned += 1
+                task.cancel(e.args[0] if e.args else None)
+            raise
+        finally:
+            left = self._waiters.pop(task) - 1
+            if left:
+                self._waiters[task] = left
+
+    def running(self, key: Hashable) -> bool:
+        """Whether a call for *key* is in flight right now."""
+        task = self._tasks.get(key)
+        return key in self._calls or (task is not None and not task.done())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls) + len(self._tasks),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+    # ------------------------------------------------------------------
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
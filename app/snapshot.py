@@ -0,0 +1,216 @@
+# ─────────────────────────────────────────────
+# app/snapshot.py
+# ─────────────────────────────────────────────
+"""
+Local SQLite copy of the small, slowly changing dimension tables.
+
+Each table in ``SNAPSHOT_TABLES`` is pulled with one ``SELECT *`` through
+Athena and loaded into its own in-memory SQLite database with an index on its
+key columns, so detail endpoints and small joins are answered in microseconds
+and only fact-table queries still go to Athena.
+
+A background task re-pulls a table once it is older than its entry in
+``QUERY_CACHE_TABLE_TTLS`` – never staler than the result cache would serve –
+and ``POST /admin/snapshot/refresh`` forces it.  A reload fills a new database
+off to the side and lookups (which run on the event loop) only wait for the
+swap, never for the load.  A table is swapped in only
+once fully loaded; a failed or oversized pull keeps the previous copy, and a
+table that never loaded makes :meth:`DimensionSnapshot.lookup` return
+``None`` so the caller falls back to Athena.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.result_set import ResultSet
+
+logger = logging.getLogger("snapshot")
+
+# table -> columns to index (the first one is the lookup key)
+INDEXES: Dict[str, Tuple[str, ...]] = {
+    "advisors": ("advisor_id",),
+    "clients": ("client_id",),
+    "products": ("product_id",),
+    "thought_leadership_content": ("content_id", "theme"),
+    "portfolios": ("portfolio_id", "client_id"),
+}
+
+_MIN_REFRESH_SECONDS = 30.0
+
+
+def _affinity(values: Iterable[Any]) -> str:
+    """SQLite column type matching the decoded Python values.
+
+    Declaring it matters: an INTEGER column compares equal to the string id
+    a route receives, an untyped one does not.
+    """
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool) or isinstance(v, int):
+            return "INTEGER"
+        if isinstance(v, float):
+            return "REAL"
+        return "TEXT"
+    return "TEXT"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DimensionSnapshot:
+    """Thread-safe in-memory SQLite store of whole dimension tables."""
+
+    def __init__(self, tables: Sequence[str] = ()) -> None:
+        self.tables = list(tables or settings.snapshot_tables)
+        # one database per table, replaced whole on reload
+        self._dbs: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()  # queries and swaps; never held while loading
+        self._columns: Dict[str, Tuple[str, ...]] = {}
+        self.loaded_at: Dict[str, float] = {}
+        self.row_counts: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.hits = self.fallbacks = 0
+
+    # ------------------------------------------------------------------
+    def lookup(
+        self, table: str, column: str, value: Any, columns: Sequence[str] = ()
+    ) -> Optional[ResultSet]:
+        """Rows of *table* where *column* = *value*, or ``None`` if not snapshotted."""
+        return self.select(table, {column: value}, columns)
+
+    def lookup_many(
+        self, table: str, column: str, values: Sequence[Any], columns: Sequence[str] = ()
+    ) -> Optional[ResultSet]:
+        """Rows of *table* where *column* is one of *values*."""
+        if table not in self._columns:
+            self.fallbacks += 1
+            return None
+        cols = ", ".join(_quote(c) for c in columns) if columns else "*"
+        out: Optional[ResultSet] = None
+        values = list(values)
+        for i in range(0, max(len(values), 1), 500):  # SQLite variable limit
+            chunk = values[i:i + 500]
+            marks = ", ".join("?" * len(chunk)) or "NULL"
+            part = self._run(
+                table, f"SELECT {cols} FROM {_quote(table)} WHERE {_quote(column)} IN ({marks})", chunk
+            )
+            if out is None:
+                out = part
+            else:
+                out.extend(part)
+        self.hits += 1
+        return out
+
+    def select(
+        self, table: str, where: Dict[str, Any], columns: Sequence[str] = ()
+    ) -> Optional[ResultSet]:
+        if table not in self._columns:
+            self.fallbacks += 1
+            return None
+        cols = ", ".join(_quote(c) for c in columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {_quote(table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(f"{_quote(c)} = ?" for c in where)
+        self.hits += 1
+        return self._run(table, sql, list(where.values()))
+
+    def _run(self, table: str, sql: str, params: List[Any]) -> ResultSet:
+        with self._lock:
+            cur = self._dbs[table].execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return ResultSet(names, cur.fetchall())
+
+    # ------------------------------------------------------------------
+    def load(self, table: str, rows: ResultSet) -> None:
+        """Replace *table* with *rows*: built in a new database, then swapped in."""
+        defs = ", ".join(
+            f"{_quote(c)} {_affinity(r[i] for r in rows.tuples)}" for i, c in enumerate(rows.columns)
+        )
+        marks = ", ".join("?" * len(rows.columns))
+        db = sqlite3.connect(":memory:", check_same_thread=False)
+        with db:
+            db.execute(f"CREATE TABLE {_quote(table)} ({defs})")
+            db.executemany(f"INSERT INTO {_quote(table)} VALUES ({marks})", rows.tuples)
+            for column in INDEXES.get(table, ()):
+                if column in rows.columns:
+                    db.execute(
+                        f"CREATE INDEX {_quote(f'{table}__{column}')} "
+                        f"ON {_quote(table)} ({_quote(column)})"
+                    )
+        with self._lock:
+            old = self._dbs.get(table)
+            self._dbs[table] = db
+            self._columns[table] = rows.columns
+            self.loaded_at[table] = time.time()
+            self.row_counts[table] = len(rows)
+        if old is not None:
+            old.close()  # every query on it ran under the lock, so none is left
+
+    async def refresh(self, athena, tables: Sequence[str] = ()) -> Dict[str, int]:
+        """Re-pull *tables* (default: all) through *athena*; returns rows loaded per table.
+
+        Only tables configured in ``SNAPSHOT_TABLES`` can be pulled: their
+        names go into the SQL as is.
+        """
+        unknown = [t for t in tables if t not in self.tables]
+        if unknown:
+            raise KeyError(f"not snapshotted: {', '.join(unknown)}")
+        tables = list(tables or self.tables)
+        counts = await asyncio.gather(*(self._refresh_one(athena, t) for t in tables))
+        return {t: n for t, n in zip(tables, counts) if n is not None}
+
+    async def _refresh_one(self, athena, table: str) -> Optional[int]:
+        limit = settings.snapshot_max_rows
+        try:
+            rows = await athena.aquery(f"SELECT * FROM {table}", ttl=0, max_rows=limit + 1)
+            if len(rows) > limit:
+                raise ValueError(f"more than SNAPSHOT_MAX_ROWS={limit} rows")
+            await asyncio.to_thread(self.load, table, rows)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures[table] = self.failures.get(table, 0) + 1
+            logger.warning("Snapshot of %s not refreshed: %s", table, e)
+            return None
+        logger.info("Snapshot of %s loaded: %d rows", table, len(rows))
+        return len(rows)
+
+    async def run(self, athena) -> None:
+        """Load everything, then refresh each table as its TTL runs out."""
+        await self.refresh(athena)
+        while True:
+            now = time.time()
+            due = [t for t in self.tables if now - self.loaded_at.get(t, 0) >= self.max_age(t)]
+            if due:
+                await self.refresh(athena, due)
+            await asyncio.sleep(min(self.max_age(t) for t in self.tables) if self.tables else 3600)
+
+    @staticmethod
+    def max_age(table: str) -> float:
+        ttl = settings.query_cache_table_ttls.get(table, settings.query_cache_ttl_seconds)
+        return max(_MIN_REFRESH_SECONDS, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "tables": {
+                t: {
+                    "rows": self.row_counts.get(t),
+                    "age_seconds": round(now - self.loaded_at[t], 1) if t in self.loaded_at else None,
+                    "max_age_seconds": self.max_age(t),
+                    "failures": self.failures.get(t, 0),
+                }
+                for t in self.tables
+            },
+        }
@@ -0,0 +1,389 @@
+# ─────────────────────────────────────────────
+# app/statements.py
+# ─────────────────────────────────────────────
+"""
+Named, parameterized queries used by the routers.
+
+Every statement is declared once here with ``?`` placeholders.  At startup
+``AthenaClient.prepare_statements`` registers them as Athena prepared
+statements in the workgroup; routers then run them with ``bind(name, ...)``
+and the values travel as ``ExecutionParameters`` – never spliced into SQL.
+Because the SQL text is fixed, results are cached by ``(statement, params)``.
+
+Tables listed in ``COMPACTED_TABLES`` are read from their partitioned Parquet
+copy (:mod:`app.compaction`) instead of the CSV table; the statements over
+``transactions`` then also constrain its month partitions, so a date range
+only scans the months it covers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    tables: Tuple[str, ...]
+
+    def bind(self, *params: Any) -> "BoundStatement":
+        if len(params) != self.sql.count("?"):
+            raise ValueError(
+                f"statement {self.name!r} takes {self.sql.count('?')} parameters, got {len(params)}"
+            )
+        return BoundStatement(self, tuple(literal(p) for p in params))
+
+
+@dataclass(frozen=True)
+class BoundStatement:
+    statement: Statement
+    params: Tuple[str, ...]  # already rendered as SQL literals
+
+
+def literal(value: Any) -> str:
+    """Render *value* as the SQL literal Athena expects in ExecutionParameters."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+STATEMENTS: Dict[str, Statement] = {}
+
+
+def statement(name: str, sql: str, tables: Tuple[str, ...]) -> Statement:
+    stmt = Statement(name, " ".join(sql.split()), tables)
+    STATEMENTS[name] = stmt
+    return stmt
+
+
+def bind(name: str, *params: Any) -> BoundStatement:
+    return STATEMENTS[name].bind(*params)
+
+
+# IN (...) lists come in a few fixed sizes so the statements can be prepared
+# once; a chunk is padded up to the next size by repeating its last id.
+BATCH_ARITIES = (10, 50, 200)
+
+
+def _in_list(n: int) -> str:
+    return "(" + ", ".join("?" * n) + ")"
+
+
+def bind_batch(prefix: str, ids: Sequence[Any]) -> List[BoundStatement]:
+    """``{prefix}_{n}`` statements covering *ids*, at most ``BATCH_ARITIES[-1]`` per chunk."""
+    bound = []
+    step = BATCH_ARITIES[-1]
+    for i in range(0, len(ids), step):
+        chunk = list(ids[i:i + step])
+        n = next(a for a in BATCH_ARITIES if a >= len(chunk))
+        bound.append(bind(f"{prefix}_{n}", *chunk, *[chunk[-1]] * (n - len(chunk))))
+    return bound
+
+
+# the view app.compaction keeps pointing at the newest Parquet copy of a table
+COMPACTED_SUFFIX = "_parquet"
+
+
+def table(name: str) -> str:
+    """Table to read for *name*: its Parquet copy once compacted, else the CSV table."""
+    return name + COMPACTED_SUFFIX if name in settings.compacted_tables else name
+
+
+def keyset_after(keys: Sequence[str], descending: bool) -> str:
+    """Predicate selecting rows strictly past a sort key, e.g. for (a, b) DESC:
+    ``(a < ?) OR (a = ? AND b < ?)`` – bind it with :func:`keyset_params`."""
+    op = "<" if descending else ">"
+    terms = []
+    for i, key in enumerate(keys):
+        terms.append("(" + " AND ".join([f"{k} = ?" for k in keys[:i]] + [f"{key} {op} ?"]) + ")")
+    return "(" + " OR ".join(terms) + ")"
+
+
+def keyset_params(values: Sequence[Any]) -> Tuple[Any, ...]:
+    return tuple(v for i in range(len(values)) for v in values[:i + 1])
+
+
+# ---------- Auth ----------
+
+statement(
+    "login",
+    """
+    SELECT "UserId", "AwsUserName", "User", "UserARN", "DashboardId", "Role", "Email", "Region"
+    FROM role
+    WHERE "user" = ? AND "user_password" = ?
+    LIMIT 1
+    """,
+    ("role",),
+)
+
+statement(
+    "role_credentials",
+    """
+    SELECT "UserId", "AwsUserName", "User", "UserARN", "DashboardId", "Role", "Email", "Region",
+           "user_password"
+    FROM role
+    """,
+    ("role",),
+)
+
+# ---------- Advisors ----------
+
+statement(
+    "advisors_list",
+    "SELECT advisor_id, first_name, last_name, email FROM advisors",
+    ("advisors",),
+)
+statement(
+    "advisor_detail",
+    "SELECT * FROM advisors WHERE advisor_id = ? LIMIT 1",
+    ("advisors",),
+)
+statement(
+    "clients_of_advisor",
+    """
+    SELECT c.client_id, c.first_name, c.last_name, c.age
+    FROM clients c
+    JOIN client_advisor_assignments a ON a.client_id = c.client_id
+    WHERE a.advisor_id = ?
+    """,
+    ("clients", "client_advisor_assignments"),
+)
+
+# ---------- Clients ----------
+
+# Sort keys are compared as varchar so a cursor value works whatever the
+# column type; the ORDER BY uses the same expressions to stay consistent.
+_CLIENT_KEY = ("CAST(client_id AS varchar)",)
+
+statement(
+    "clients_list",
+    f"""
+    SELECT client_id, first_name, last_name, age FROM clients
+    ORDER BY {_CLIENT_KEY[0]}
+    LIMIT ?
+    """,
+    ("clients",),
+)
+statement(
+    "clients_list_after",
+    f"""
+    SELECT client_id, first_name, last_name, age FROM clients
+    WHERE {keyset_after(_CLIENT_KEY, descending=False)}
+    ORDER BY {_CLIENT_KEY[0]}
+    LIMIT ?
+    """,
+    ("clients",),
+)
+statement(
+    "client_detail",
+    "SELECT * FROM clients WHERE client_id = ? LIMIT 1",
+    ("clients",),
+)
+_HOLDINGS = table("portfolio_holdings")
+
+statement(
+    "client_funds",
+    f"""
+    SELECT DISTINCT product_name
+    FROM {_HOLDINGS}
+    WHERE client_id = ? AND product_name IS NOT NULL
+    """,
+    ("portfolio_holdings",),
+)
+statement(
+    "portfolios_for_client",
+    """
+    SELECT portfolio_id, client_id, portfolio_name, total_value
+    FROM portfolios
+    WHERE client_id = ?
+    """,
+    ("portfolios",),
+)
+
+for _n in BATCH_ARITIES:
+    statement(
+        f"portfolios_for_clients_{_n}",
+        f"""
+        SELECT portfolio_id, client_id, portfolio_name, total_value
+        FROM portfolios
+        WHERE client_id IN {_in_list(_n)}
+        """,
+        ("portfolios",),
+    )
+
+# ---------- Portfolios ----------
+
+statement(
+    "portfolio_detail",
+    """
+    SELECT portfolio_id, client_id, portfolio_name, total_value
+    FROM portfolios
+    WHERE portfolio_id = ?
+    LIMIT 1
+    """,
+    ("portfolios",),
+)
+statement(
+    "holdings_in_portfolio",
+    f"""
+    SELECT h.product_id, h.shares, h.market_value, p.product_name
+    FROM {_HOLDINGS} h
+    JOIN products p ON p.product_id = h.product_id
+    WHERE h.portfolio_id = ?
+    """,
+    ("portfolio_holdings", "products"),
+)
+
+# without the products join, for when product names come from the snapshot
+statement(
+    "holdings_rows",
+    f"""
+    SELECT product_id, shares, market_value
+    FROM {_HOLDINGS}
+    WHERE portfolio_id = ?
+    """,
+    ("portfolio_holdings",),
+)
+
+for _n in BATCH_ARITIES:
+    statement(
+        f"holdings_for_portfolios_{_n}",
+        f"""
+        SELECT h.portfolio_id, h.product_id, h.shares, h.market_value, p.product_name
+        FROM {_HOLDINGS} h
+        JOIN products p ON p.product_id = h.product_id
+        WHERE h.portfolio_id IN {_in_list(_n)}
+        """,
+        ("portfolio_holdings", "products"),
+    )
+    statement(
+        f"holdings_rows_for_portfolios_{_n}",
+        f"""
+        SELECT portfolio_id, product_id, shares, market_value
+        FROM {_HOLDINGS}
+        WHERE portfolio_id IN {_in_list(_n)}
+        """,
+        ("portfolio_holdings",),
+    )
+
+# ---------- Thought-leadership content ----------
+
+_CONTENT_COLUMNS = "content_id, title, content_type, theme, creation_date"
+_CONTENT_KEY = ("CAST(creation_date AS varchar)", "CAST(content_id AS varchar)")
+_CONTENT_ORDER = ", ".join(f"{k} DESC" for k in _CONTENT_KEY)
+
+for _name, _where in (
+    ("content_list", ""),
+    ("content_list_by_theme", "theme = ?"),
+):
+    for _suffix, _after in (("", ""), ("_after", keyset_after(_CONTENT_KEY, descending=True))):
+        _conditions = " AND ".join(c for c in (_where, _after) if c)
+        statement(
+            _name + _suffix,
+            f"""
+            SELECT {_CONTENT_COLUMNS}
+            FROM thought_leadership_content
+            {"WHERE " + _conditions if _conditions else ""}
+            ORDER BY {_CONTENT_ORDER}
+            LIMIT ?
+            """,
+            ("thought_leadership_content",),
+        )
+statement(
+    "content_detail",
+    f"""
+    SELECT {_CONTENT_COLUMNS}
+    FROM thought_leadership_content
+    WHERE content_id = ?
+    LIMIT 1
+    """,
+    ("thought_leadership_content",),
+)
+
+# ---------- Transactions ----------
+# One statement per filter combination, with and without a date range, each
+# with a keyset "_after" twin for the next page, so each keeps a fixed SQL text.
+
+# month partition of the Parquet copy (see app.compaction)
+TRANSACTION_MONTH = "transaction_month"
+
+_TRANSACTIONS = table("transactions")
+_TRANSACTION_FILTERS = {
+    "transactions_list": (),
+    "transactions_by_client": ("client_id",),
+    "transactions_by_portfolio": ("portfolio_id",),
+    "transactions_by_client_portfolio": ("client_id", "portfolio_id"),
+}
+
+_TRANSACTION_KEY = ("CAST(transaction_date AS varchar)", "CAST(transaction_id AS varchar)")
+_TRANSACTION_ORDER = ", ".join(f"{k} DESC" for k in _TRANSACTION_KEY)
+
+# [from, to) on the date; on the Parquet copy also the months it spans, which
+# Athena resolves from partition metadata before reading anything
+_TRANSACTION_RANGE = f"{_TRANSACTION_KEY[0]} >= ? AND {_TRANSACTION_KEY[0]} < ?"
+_MONTH_PRUNING = _TRANSACTIONS != "transactions"
+if _MONTH_PRUNING:
+    _TRANSACTION_RANGE += f" AND {TRANSACTION_MONTH} BETWEEN ? AND ?"
+
+for _name, _columns in _TRANSACTION_FILTERS.items():
+    for _dated in ("", "_dated"):
+        for _suffix, _after in (("", ""), ("_after", keyset_after(_TRANSACTION_KEY, descending=True))):
+            _where = " AND ".join(
+                [f"{c} = ?" for c in _columns]
+                + ([_TRANSACTION_RANGE] if _dated else [])
+                + ([_after] if _after else [])
+            )
+            statement(
+                _name + _dated + _suffix,
+                f"""
+                SELECT transaction_id, account_id, product_id, transaction_type,
+                       quantity, amount, transaction_date
+                FROM {_TRANSACTIONS}
+                {"WHERE " + _where if _where else ""}
+                ORDER BY {_TRANSACTION_ORDER}
+                LIMIT ?
+                """,
+                ("transactions",),
+            )
+
+
+def transactions_statement(client_id: Any, portfolio_id: Any) -> str:
+    """Name of the transactions statement matching the filters that are set."""
+    if client_id and portfolio_id:
+        return "transactions_by_client_portfolio"
+    if client_id:
+        return "transactions_by_client"
+    if portfolio_id:
+        return "transactions_by_portfolio"
+    return "transactions_list"
+
+
+def transactions_query(
+    client_id: Any,
+    portfolio_id: Any,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> Tuple[str, List[Any]]:
+    """Statement name and filter parameters for the filters that are set.
+
+    *from_date* and *to_date* are both inclusive and either may be open.
+    """
+    name = transactions_statement(client_id, portfolio_id)
+    filters: List[Any] = [v for v in (client_id, portfolio_id) if v]
+    if from_date is None and to_date is None:
+        return name, filters
+    first = from_date or date.min
+    last = min(to_date or date.max, date.max - timedelta(days=1))
+    filters += [first.isoformat(), (last + timedelta(days=1)).isoformat()]
+    if _MONTH_PRUNING:
+        filters += [first.isoformat()[:7], last.isoformat()[:7]]
+    return name + "_dated", filters
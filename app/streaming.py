@@ -0,0 +1,49 @@
+# ─────────────────────────────────────────────
+# app/streaming.py
+# ─────────────────────────────────────────────
+"""
+Newline-delimited JSON responses for list endpoints.
+
+A client opts in with ``Accept: application/x-ndjson``; rows are then written
+page by page as Athena hands them over, so neither time-to-first-byte nor
+peak memory grows with the size of the result.
+"""
+
+from __future__ import annotations
+
+from typing import AsyncIterator, Type
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.result_set import ResultSet
+from app.serialization import dump_lines
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_response(
+    pages: AsyncIterator[ResultSet], model: Type[BaseModel]
+) -> StreamingResponse:
+    """Stream *pages* as NDJSON, one *model*-shaped object per line.
+
+    The first page is awaited before the response starts so that query
+    errors still surface as a normal HTTP error instead of a cut-off body.
+    """
+    first = await pages.__anext__()
+
+    async def body() -> AsyncIterator[bytes]:
+        yield _encode(first, model)
+        async for page in pages:
+            yield _encode(page, model)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _encode(rows: ResultSet, model: Type[BaseModel]) -> bytes:
+    return dump_lines(rows, model)
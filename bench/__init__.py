@@ -0,0 +1,3 @@
+"""
+Offline micro-benchmarks; run a module with ``python -m bench.<name>``.
+"""
@@ -0,0 +1,127 @@
+# ─────────────────────────────────────────────
+# bench/admission_bench.py
+# ─────────────────────────────────────────────
+"""
+Interactive latency while report scans saturate the Athena workgroup.
+
+    python -m bench.admission_bench [--slots 20] [--reports 60] [--interactive 8]
+                                    [--seconds 10]
+
+Runs the app in-process against :class:`bench.fakes.FakeAthena` with a
+workgroup quota of ``--slots`` concurrent executions (past it the fake
+answers ``TooManyRequestsException``), twice: once without admission control
+(``ATHENA_MAX_CONCURRENT_QUERIES=0``) and once with the priority scheduler
+capped at the quota.  Each run first measures ``GET /portfolios/{id}``
+(interactive) on its own, then again while ``--reports`` workers keep
+requesting ``GET /transactions/`` (report).  Every request uses a fresh id, so
+nothing is answered from a cache.
+
+Per run and phase it prints p50/p99 of the interactive lookups, their
+non-2xx responses, and how many report requests completed or were turned
+away with 429.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("ATHENA_DB", "bench")
+os.environ.setdefault("ATHENA_OUTPUT", "s3://bench/results/")
+os.environ.setdefault("S3_BULK_MIN_BYTES", "0")  # the fake has no result objects
+os.environ.setdefault("SESSION_SECRET", "bench")
+os.environ.setdefault("WARM_UP", "0")  # no real clients or credential lookups
+os.environ.setdefault("SNAPSHOT_TABLES", "[]")  # lookups must reach Athena
+os.environ.setdefault("AUTH_INDEX_REFRESH_SECONDS", "0")
+
+import httpx  # noqa: E402
+
+from app.athena_admission import AdmissionScheduler  # noqa: E402
+from app.athena_client import AthenaClient  # noqa: E402
+from app.deps import get_athena_client  # noqa: E402
+from app.main import app  # noqa: E402
+from bench.fakes import FakeAthena, ident  # noqa: E402
+
+_ids = itertools.count()
+
+
+async def loop(client: httpx.AsyncClient, path: str, column: str, until: float,
+               latencies: List[float], statuses: Counter) -> None:
+    while time.monotonic() < until:
+        url = path.format(id=ident(column, next(_ids)))
+        started = time.perf_counter()
+        r = await client.get(url)
+        latencies.append(time.perf_counter() - started)
+        statuses[r.status_code] += 1
+        if r.status_code == 429:
+            await asyncio.sleep(float(r.headers.get("Retry-After", 1)))
+
+
+async def phase(client: httpx.AsyncClient, args: argparse.Namespace, reports: int) -> Dict[str, Any]:
+    until = time.monotonic() + args.seconds
+    lookups: List[float] = []
+    lookup_status: Counter = Counter()
+    scans: List[float] = []
+    scan_status: Counter = Counter()
+    await asyncio.gather(
+        *(loop(client, "/portfolios/{id}", "portfolio_id", until, lookups, lookup_status)
+          for _ in range(args.interactive)),
+        *(loop(client, "/transactions/?limit=100&client_id={id}", "client_id", until, scans, scan_status)
+          for _ in range(reports)),
+    )
+    cuts = statistics.quantiles(lookups, n=100, method="inclusive") if len(lookups) > 1 else lookups * 99
+    return {
+        "lookups": len(lookups),
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "lookup_errors": sum(n for s, n in lookup_status.items() if s >= 400),
+        "reports_ok": scan_status.get(200, 0),
+        "reports_429": scan_status.get(429, 0),
+    }
+
+
+async def run(args: argparse.Namespace, limit: int) -> Dict[str, Dict[str, Any]]:
+    fake = FakeAthena(queue_ms=args.athena_queue_ms, engine_ms=args.athena_engine_ms,
+                      max_concurrent=args.slots)
+    athena = AthenaClient(fake, admission=AdmissionScheduler(limit))
+    app.dependency_overrides[get_athena_client] = lambda: athena
+    out = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            out["alone"] = await phase(client, args, 0)
+            out["with reports"] = await phase(client, args, args.reports)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--slots", type=int, default=20, help="workgroup concurrent-query quota")
+    parser.add_argument("--reports", type=int, default=60, help="concurrent report workers")
+    parser.add_argument("--interactive", type=int, default=8, help="concurrent lookup workers")
+    parser.add_argument("--seconds", type=float, default=10, help="per phase")
+    parser.add_argument("--athena-queue-ms", type=float, default=100)
+    parser.add_argument("--athena-engine-ms", type=float, default=1_500)
+    args = parser.parse_args()
+
+    logging.getLogger("athena").setLevel(logging.ERROR)
+    print(f"workgroup quota {args.slots}; {args.interactive} lookup workers, "
+          f"{args.reports} report workers; Athena {args.athena_queue_ms:.0f}+{args.athena_engine_ms:.0f} ms")
+    print(f"{'admission':<12}{'phase':<15}{'lookups':>8}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+          f"{'reports':>9}{'429':>6}")
+    for label, limit in (("off", 0), (f"{args.slots} slots", args.slots)):
+        for name, r in asyncio.run(run(args, limit)).items():
+            print(f"{label:<12}{name:<15}{r['lookups']:>8}{r['p50_ms']:>9.0f}{r['p99_ms']:>9.0f}"
+                  f"{r['lookup_errors']:>8}{r['reports_ok']:>9}{r['reports_429']:>6}")
+
+
+if __name__ == "__main__":
+    main()
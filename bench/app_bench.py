@@ -0,0 +1,260 @@
+# ─────────────────────────────────────────────
+# bench/app_bench.py
+# ─────────────────────────────────────────────
+"""
+Load test of the real FastAPI app against simulated AWS backends.
+
+    python -m bench.app_bench [--concurrency 32] [--requests 200] [--only clients]
+                              [--json out.json] [--baseline out.json]
+
+``app.main.app`` runs in-process (lifespan included, so the credential index
+and dimension snapshot load as in production) behind ``httpx.ASGITransport``;
+Athena, Bedrock and QuickSight are the stand-ins from :mod:`bench.fakes`, with
+latencies and result sizes set by the flags below.  Every route is driven in
+turn by ``--concurrency`` workers until ``--requests`` have completed; ids
+cycle through ``--ids`` distinct values, so repeated ids exercise the caches
+the way real traffic would.
+
+Per endpoint it prints requests per second, p50/p95/p99 latency, non-2xx
+responses and the peak RSS sampled while it ran (Linux ``/proc``; elsewhere
+the process-wide ``ru_maxrss``).  ``--json`` saves the numbers and
+``--baseline`` prints the change against a saved run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("ATHENA_DB", "bench")
+os.environ.setdefault("ATHENA_OUTPUT", "s3://bench/results/")
+os.environ.setdefault("S3_BULK_MIN_BYTES", "0")  # the fake has no result objects
+os.environ.setdefault("SESSION_SECRET", "bench")
+os.environ.setdefault("WARM_UP", "0")  # no real clients or credential lookups
+
+import httpx  # noqa: E402
+
+from app.athena_client import AthenaClient  # noqa: E402
+from app.deps import get_athena_client, get_credential_index, get_snapshot  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routers import kb, quicksight_embed  # noqa: E402
+from bench.fakes import (  # noqa: E402
+    FakeAthena, FakeBedrockAgent, FakeBedrockRuntime, FakeQuickSight, ident,
+)
+
+
+@dataclass
+class Endpoint:
+    method: str
+    path: str  # "{id}" is replaced by an id drawn from *column*
+    column: str = ""
+    body: Optional[Callable[[int], Any]] = None
+    auth: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def _ids(column: str, k: int, n: int = 20) -> Dict[str, List[str]]:
+    return {"ids": [ident(column, k + j) for j in range(n)]}
+
+
+ENDPOINTS = [
+    Endpoint("POST", "/login", body=lambda k: {"username": f"user{k}", "password": f"pw{k}"}),
+    Endpoint("GET", "/me", auth=True),
+    Endpoint("GET", "/advisors/"),
+    Endpoint("GET", "/advisors/{id}", "advisor_id"),
+    Endpoint("GET", "/advisors/{id}/clients", "advisor_id"),
+    Endpoint("GET", "/clients/"),
+    Endpoint("GET", "/clients/{id}", "client_id"),
+    Endpoint("GET", "/clients/{id}/portfolios", "client_id"),
+    Endpoint("POST", "/clients/portfolios:batch", body=lambda k: _ids("client_id", k)),
+    Endpoint("GET", "/portfolios/{id}", "portfolio_id"),
+    Endpoint("GET", "/portfolios/{id}/holdings", "portfolio_id"),
+    Endpoint("POST", "/portfolios/holdings:batch", body=lambda k: _ids("portfolio_id", k)),
+    Endpoint("GET", "/content/"),
+    Endpoint("GET", "/content/{id}", "content_id"),
+    Endpoint("GET", "/transactions/?limit=100"),
+    Endpoint("GET", "/transactions/?limit=100&client_id={id}", "client_id"),
+    Endpoint("POST", "/getstructuredresponse",
+             body=lambda k: {"query": f"Which funds did portfolio {k} buy last quarter?"}),
+    Endpoint("POST", "/getunstructuredresponse",
+             body=lambda k: {"query": f"Summarize the outlook piece number {k}"}),
+    Endpoint("POST", "/getCombinedResponse",
+             body=lambda k: {"query": f"How does client {k} compare to the benchmark?"}),
+    Endpoint("POST", "/dashBoardEmbeddedUrl", body=lambda k: {
+        "dashboardid": f"dashboard-{k % 5}",
+        "userarn": f"arn:aws:quicksight:us-east-1:123456789012:user/default/user{k}",
+    }),
+    Endpoint("GET", "/metrics"),
+]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def drive(
+    client: httpx.AsyncClient, ep: Endpoint, requests: int, concurrency: int, ids: int,
+    token: str,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    todo = iter(range(requests))
+    peak = rss_bytes()
+    headers = {"Authorization": f"Bearer {token}"} if ep.auth else {}
+
+    async def worker() -> None:
+        for i in todo:
+            k = i % ids
+            url = ep.path.format(id=ident(ep.column, k)) if ep.column else ep.path
+            body = ep.body(k) if ep.body else None
+            started = time.perf_counter()
+            r = await client.request(ep.method, url, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[r.status_code] += 1
+
+    async def sample() -> None:
+        nonlocal peak
+        while True:
+            peak = max(peak, rss_bytes())
+            await asyncio.sleep(0.02)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    sampler.cancel()
+
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        cuts = latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": sum(n for s, n in statuses.items() if s >= 400),
+        "statuses": dict(statuses),
+        "rps": len(latencies) / wall,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "peak_rss_mb": max(peak, rss_bytes()) / 2**20,
+    }
+
+
+async def warm_up(timeout: float = 60) -> None:
+    """Wait for the background loads started by the lifespan."""
+    index, snapshot = get_credential_index(), get_snapshot()
+    until = time.monotonic() + timeout
+    while time.monotonic() < until:
+        if index.loaded and all(t in snapshot.loaded_at for t in snapshot.tables):
+            return
+        await asyncio.sleep(0.05)
+    print("warning: credential index / snapshot not loaded; falling back to Athena", file=sys.stderr)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    fake = FakeAthena(
+        queue_ms=args.athena_queue_ms,
+        engine_ms=args.athena_engine_ms,
+        result_rows=args.result_rows,
+        dimension_rows=args.dimension_rows,
+    )
+    athena = AthenaClient(fake)
+    app.dependency_overrides[get_athena_client] = lambda: athena
+    kb.agent = FakeBedrockAgent(args.bedrock_ms)
+    kb.runtime = FakeBedrockRuntime(args.bedrock_ms)
+    quicksight_embed.qs = FakeQuickSight(args.quicksight_ms)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    async with app.router.lifespan_context(app):
+        await warm_up()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            login = await client.post("/login", json={"username": "user0", "password": "pw0"})
+            token = login.json().get("token", "")
+            for ep in ENDPOINTS:
+                if args.only and args.only not in ep.path:
+                    continue
+                before = sum(fake.calls.values())
+                results[ep.name] = await drive(
+                    client, ep, args.requests, args.concurrency, args.ids, token
+                )
+                results[ep.name]["athena_calls"] = sum(fake.calls.values()) - before
+                report_line(ep.name, results[ep.name])
+    return results
+
+
+def report_header() -> None:
+    print(f"{'endpoint':<46}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'RSS MB':>8}{'Athena API':>11}")
+
+
+def report_line(name: str, r: Dict[str, Any]) -> None:
+    print(f"{name:<46}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+          f"{r['errors']:>8}{r['peak_rss_mb']:>8.0f}{r['athena_calls']:>11}")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{'vs. baseline':<46}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    change = lambda new, old: f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            continue
+        print(f"{name:<46}{change(r['rps'], b['rps']):>9}{change(r['p50_ms'], b['p50_ms']):>9}"
+              f"{change(r['p95_ms'], b['p95_ms']):>9}{change(r['p99_ms'], b['p99_ms']):>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="per endpoint")
+    parser.add_argument("--ids", type=int, default=200, help="distinct ids per endpoint")
+    parser.add_argument("--athena-queue-ms", type=float, default=200)
+    parser.add_argument("--athena-engine-ms", type=float, default=800)
+    parser.add_argument("--result-rows", type=int, default=50)
+    parser.add_argument("--dimension-rows", type=int, default=1_000)
+    parser.add_argument("--bedrock-ms", type=float, default=1_500)
+    parser.add_argument("--quicksight-ms", type=float, default=300)
+    parser.add_argument("--only", help="run endpoints whose path contains this")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--baseline", help="compare with results saved by --json")
+    args = parser.parse_args()
+
+    for name in ("kb", "quicksight_embed", "auth", "snapshot"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    print(f"{args.requests} requests per endpoint, {args.concurrency} concurrent; "
+          f"Athena {args.athena_queue_ms:.0f}+{args.athena_engine_ms:.0f} ms, "
+          f"Bedrock {args.bedrock_ms:.0f} ms, QuickSight {args.quicksight_ms:.0f} ms")
+    report_header()
+    results = asyncio.run(run(args))
+    print(f"\npeak RSS of the run: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# ─────────────────────────────────────────────
+# bench/fakes.py
+# ─────────────────────────────────────────────
+"""
+Local stand-ins for the boto3 clients the service uses, for benchmarks.
+
+:class:`FakeAthena` answers any statement in :mod:`app.statements` (inline or
+``EXECUTE``) and ``SELECT *`` on the dimension tables with synthetic rows:
+the columns come from the SELECT list (or :data:`SCHEMAS`), columns compared
+with ``= ?`` or ``IN (?, …)`` echo the bound ids so detail lookups find
+something, and the row count follows ``LIMIT``.  Executions go QUEUED →
+RUNNING → SUCCEEDED after the configured queue and engine time and report
+``Statistics`` like the real service.  With ``max_concurrent`` set, starting
+more executions than that at once fails with ``TooManyRequestsException``,
+as a workgroup at its quota does.  Given an ``s3``, a finished execution
+also writes its result CSV there, quoted the way Athena does, and reports
+it as ``ResultConfiguration.OutputLocation``.
+
+:class:`FakeS3` keeps objects in memory and answers ``head_object`` and
+(ranged) ``get_object``.
+
+:class:`FakeBedrockAgent`, :class:`FakeBedrockRuntime` and
+:class:`FakeQuickSight` just sleep for their latency and return a response
+of the right shape.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "advisors": [("advisor_id", "varchar"), ("first_name", "varchar"), ("last_name", "varchar"),
+                 ("email", "varchar")],
+    "clients": [("client_id", "varchar"), ("first_name", "varchar"), ("last_name", "varchar"),
+                ("age", "integer")],
+    "products": [("product_id", "varchar"), ("product_name", "varchar")],
+    "portfolios": [("portfolio_id", "varchar"), ("client_id", "varchar"),
+                   ("portfolio_name", "varchar"), ("total_value", "double")],
+    "thought_leadership_content": [("content_id", "varchar"), ("title", "varchar"),
+                                   ("content_type", "varchar"), ("theme", "varchar"),
+                                   ("creation_date", "varchar")],
+}
+
+TYPES = {
+    "age": "integer", "shares": "double", "market_value": "double", "total_value": "double",
+    "quantity": "double", "amount": "double",
+}
+
+_SELECT_RE = re.compile(r"SELECT\s+(?:DISTINCT\s+)?(.*?)\s+FROM\s+\"?(\w+)", re.I | re.S)
+_LIMIT_RE = re.compile(r"LIMIT\s+(\?|\d+)\s*$", re.I)
+_EQ_RE = re.compile(r"(\w+)\"?\s*=\s*$")
+_IN_RE = re.compile(r"(\w+)\"?\s+IN\s*\(\s*$", re.I)
+
+
+def ident(column: str, i: int) -> str:
+    """Synthetic id shared by the fake's rows and the benchmark's requests."""
+    return f"{column[:-3]}-{i}"
+
+
+def _value(column: str, i: int) -> str:
+    name = column.lower()
+    if name.endswith("_id") or name == "userid":
+        return ident(name if name.endswith("_id") else "user_id", i)
+    if name == "user":
+        return f"user{i}"
+    if name == "user_password":
+        return f"pw{i}"
+    if name.endswith("date"):
+        return (datetime(2024, 1, 1) + timedelta(days=i % 365)).strftime("%Y-%m-%d")
+    if TYPES.get(name) == "integer":
+        return str(20 + i % 60)
+    if TYPES.get(name) == "double":
+        return f"{(i * 37.5) % 10_000:.2f}"
+    return f"{column} {i}"
+
+
+def csv_line(values: List[Optional[str]]) -> str:
+    """One record as Athena writes it: every value quoted, NULL left empty."""
+    return ",".join("" if v is None else '"' + v.replace('"', '""') + '"' for v in values) + "\n"
+
+
+class FakeS3:
+    """The subset of the boto3 S3 client that :class:`S3ResultReader` calls."""
+
+    def __init__(self, *, latency_ms: float = 0) -> None:
+        self.latency_ms = latency_ms
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, uri: str, body: bytes) -> None:
+        bucket, _, key = uri[5:].partition("/")
+        self.objects[(bucket, key)] = body
+
+    def _object(self, op: str, bucket: str, key: str) -> bytes:
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, op) from None
+
+    def head_object(self, Bucket, Key, **_):
+        return {"ContentLength": len(self._object("HeadObject", Bucket, Key))}
+
+    def get_object(self, Bucket, Key, Range=None, **_):
+        body = self._object("GetObject", Bucket, Key)
+        if Range:
+            start, _, end = Range.removeprefix("bytes=").partition("-")
+            body = body[int(start):int(end) + 1]
+        return {"Body": io.BytesIO(body), "ContentLength": len(body)}
+
+
+class _Execution:
+    def __init__(self, columns: List[str], rows: int, echo: Dict[str, List[str]],
+                 queue_s: float, run_s: float) -> None:
+        self.columns = columns
+        self.rows = rows
+        self.echo = echo
+        self.started = time.monotonic()
+        self.queue_s = queue_s
+        self.run_s = run_s
+        self.cancelled = False
+
+    def state(self) -> str:
+        if self.cancelled:
+            return "CANCELLED"
+        elapsed = time.monotonic() - self.started
+        if elapsed < self.queue_s:
+            return "QUEUED"
+        return "RUNNING" if elapsed < self.queue_s + self.run_s else "SUCCEEDED"
+
+    def row(self, i: int) -> List[str]:
+        out = []
+        for c in self.columns:
+            ids = self.echo.get(c.lower())
+            out.append(ids[i % len(ids)] if ids else _value(c, i))
+        return out
+
+
+class FakeAthena:
+    """The subset of the boto3 Athena client that :class:`AthenaClient` calls."""
+
+    def __init__(
+        self,
+        *,
+        queue_ms: float = 200,
+        engine_ms: float = 800,
+        jitter: float = 0.2,
+        result_rows: int = 50,
+        dimension_rows: int = 1_000,
+        max_concurrent: int = 0,
+        s3: Optional[FakeS3] = None,
+    ) -> None:
+        self.queue_ms = queue_ms
+        self.engine_ms = engine_ms
+        self.jitter = jitter
+        self.result_rows = result_rows
+        self.dimension_rows = dimension_rows
+        self.max_concurrent = max_concurrent
+        self.s3 = s3
+        self._statements: Dict[str, str] = {}
+        self._executions: Dict[str, _Execution] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, op: str) -> None:
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+
+    # ---- prepared statements -------------------------------------------
+    def create_prepared_statement(self, StatementName, WorkGroup, QueryStatement, **_):
+        self._count("prepare")
+        self._statements[StatementName] = QueryStatement
+        return {}
+
+    update_prepared_statement = create_prepared_statement
+
+    # ---- executions ----------------------------------------------------
+    def start_query_execution(self, QueryString, ExecutionParameters=(), **_):
+        self._count("start")
+        if self.max_concurrent and self.running() >= self.max_concurrent:
+            self._count("throttled")
+            raise ClientError({"Error": {"Code": "TooManyRequestsException",
+                                         "Message": "workgroup query limit reached"}}, "StartQueryExecution")
+        sql = QueryString
+        if sql.startswith("EXECUTE "):
+            sql = self._statements[sql.split()[1]]
+        columns, rows, echo = self._plan(sql, list(ExecutionParameters or ()))
+        spread = lambda ms: max(0.0, ms * random.uniform(1 - self.jitter, 1 + self.jitter)) / 1000
+        qid = f"q{next(self._ids)}"
+        self._executions[qid] = _Execution(
+            columns, rows, echo, spread(self.queue_ms), spread(self.engine_ms)
+        )
+        return {"QueryExecutionId": qid}
+
+    def running(self) -> int:
+        """Executions queued or running right now."""
+        return sum(1 for ex in list(self._executions.values()) if ex.state() in ("QUEUED", "RUNNING"))
+
+    def _plan(self, sql: str, params: List[str]) -> Tuple[List[str], int, Dict[str, List[str]]]:
+        m = _SELECT_RE.search(sql)
+        if m is None:
+            raise ClientError({"Error": {"Code": "InvalidRequestException",
+                                         "Message": "fake Athena only runs SELECTs"}}, "StartQueryExecution")
+        select, table = m.group(1), m.group(2).lower()
+        if select.strip() == "*":
+            columns = [c for c, _ in SCHEMAS.get(table, [(f"{table}_id", "varchar")])]
+        else:
+            columns = [re.split(r"[\s.]", part.strip())[-1].strip('"') for part in select.split(",")]
+
+        # which column each "?" is bound to, in order
+        echo: Dict[str, List[str]] = {}
+        for n, mark in enumerate(re.finditer(r"\?", sql)):
+            if n >= len(params):
+                break
+            before = sql[:mark.start()]
+            hit = _EQ_RE.search(before) or _IN_RE.search(before[:before.rfind("(") + 1])
+            if hit:
+                echo.setdefault(hit.group(1).lower(), []).append(params[n])
+
+        limit = _LIMIT_RE.search(sql.strip())
+        if limit:
+            rows = int(params[-1]) if limit.group(1) == "?" else int(limit.group(1))
+            rows = min(rows, self.result_rows)
+        elif select.strip() == "*":
+            rows = self.dimension_rows
+        else:
+            rows = self.result_rows
+        if table == "role":
+            rows = self.dimension_rows if "=" not in sql else 1
+        return columns, rows, echo
+
+    def _meta(self, qid: str) -> Dict[str, Any]:
+        ex = self._executions[qid]
+        state = ex.state()
+        meta: Dict[str, Any] = {
+            "QueryExecutionId": qid, "StatementType": "DML", "Status": {"State": state},
+        }
+        if state == "SUCCEEDED":
+            if self.s3 is not None:
+                meta["ResultConfiguration"] = {"OutputLocation": self._write_csv(qid, ex)}
+            meta["Statistics"] = {
+                "QueryQueueTimeInMillis": int(ex.queue_s * 1000),
+                "EngineExecutionTimeInMillis": int(ex.run_s * 1000),
+                "TotalExecutionTimeInMillis": int((ex.queue_s + ex.run_s) * 1000),
+                "DataScannedInBytes": ex.rows * 120,
+            }
+        elif state == "CANCELLED":
+            meta["Status"]["StateChangeReason"] = "cancelled"
+        return meta
+
+    def rows(self, ex: _Execution, start: int, stop: int) -> List[List[Optional[str]]]:
+        """Result rows *start*..*stop* of *ex*; ``None`` is NULL."""
+        return [ex.row(i) for i in range(start, stop)]
+
+    def column_type(self, column: str) -> str:
+        return TYPES.get(column.lower(), "varchar")
+
+    def _write_csv(self, qid: str, ex: _Execution) -> str:
+        uri = f"s3://fake-athena-results/{qid}.csv"
+        if ("fake-athena-results", f"{qid}.csv") not in self.s3.objects:
+            lines = [csv_line(ex.columns)] + [csv_line(r) for r in self.rows(ex, 0, ex.rows)]
+            self.s3.put(uri, "".join(lines).encode())
+        return uri
+
+    def get_query_execution(self, QueryExecutionId):
+        self._count("get")
+        return {"QueryExecution": self._meta(QueryExecutionId)}
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        self._count("batch_get")
+        return {"QueryExecutions": [self._meta(q) for q in QueryExecutionIds]}
+
+    def stop_query_execution(self, QueryExecutionId):
+        self._count("stop")
+        self._executions[QueryExecutionId].cancelled = True
+        return {}
+
+    def get_query_results(self, QueryExecutionId, MaxResults=1000, NextToken=None):
+        self._count("results")
+        ex = self._executions[QueryExecutionId]
+        start = int(NextToken or 0)
+        cell = lambda v: {} if v is None else {"VarCharValue": v}
+        data = [] if NextToken else [{"Data": [cell(c) for c in ex.columns]}]
+        stop = min(ex.rows, start + MaxResults - len(data))
+        data += [{"Data": [cell(v) for v in row]} for row in self.rows(ex, start, stop)]
+        out: Dict[str, Any] = {"ResultSet": {
+            "ResultSetMetadata": {"ColumnInfo": [
+                {"Label": c, "Name": c, "Type": self.column_type(c)} for c in ex.columns
+            ]},
+            "Rows": data,
+        }}
+        if stop < ex.rows:
+            out["NextToken"] = str(stop)
+        return out
+
+
+class _Sleeper:
+    def __init__(self, latency_ms: float, jitter: float = 0.2) -> None:
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.calls = 0
+
+    def _sleep(self) -> None:
+        self.calls += 1
+        time.sleep(self.latency_ms * random.uniform(1 - self.jitter, 1 + self.jitter) / 1000)
+
+
+class FakeBedrockAgent(_Sleeper):
+    def retrieve_and_generate(self, input, retrieveAndGenerateConfiguration, **_):
+        self._sleep()
+        return {"output": {"text": f"Answer to: {input['text']}"}}
+
+
+class FakeBedrockRuntime(_Sleeper):
+    def converse(self, modelId, messages, **_):
+        self._sleep()
+        return {"output": {"message": {"content": [{"text": "Combined answer."}]}}}
+
+
+class FakeQuickSight(_Sleeper):
+    def generate_embed_url_for_registered_user(self, AwsAccountId, UserArn, ExperienceConfiguration,
+                                               SessionLifetimeInMinutes=600, **_):
+        self._sleep()
+        return {
+            "EmbedUrl": f"https://quicksight.local/embed/{AwsAccountId}/{abs(hash(UserArn))}",
+            "Expiration": datetime.now(timezone.utc) + timedelta(minutes=SessionLifetimeInMinutes),
+        }
@@ -0,0 +1,86 @@
+# ─────────────────────────────────────────────
+# bench/import_budget.py
+# ─────────────────────────────────────────────
+"""
+Cold-start budget: how long ``import app.main`` takes in a fresh interpreter.
+
+    python -m bench.import_budget [--budget-ms 900] [--runs 5] [--top 15]
+
+Each run is a new ``python -X importtime`` process, so nothing is warm but the
+OS file cache.  Prints the median cumulative import time of ``app.main``, the
+modules with the largest self time in the median run, and whether any module
+that should be imported lazily (boto3 and its dependencies, see
+:mod:`app.aws_clients`) was loaded anyway.  Exits non-zero when the median is
+over budget or a deferred module shows up, so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+# imported on first use only; loading any of these at import time is a regression
+DEFERRED = ("boto3", "botocore.session", "botocore.client", "s3transfer")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile() -> Tuple[int, List[Tuple[int, str]], List[str]]:
+    """One cold import: (cumulative µs of app.main, [(self µs, module)], deferred modules seen)."""
+    env = dict(os.environ)
+    env.setdefault("AWS_REGION", "us-east-1")
+    env.setdefault("ATHENA_DB", "budget")
+    env.setdefault("ATHENA_OUTPUT", "s3://budget/results/")
+    probe = f"import app.main, sys; print([m for m in {DEFERRED!r} if m in sys.modules])"
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    total = 0
+    modules: List[Tuple[int, str]] = []
+    for line in done.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        modules.append((int(m.group(1)), m.group(4)))
+        if m.group(4) == "app.main":
+            total = int(m.group(2))
+    seen = ast.literal_eval(done.stdout.strip().splitlines()[-1])  # the probe's list
+    return total, modules, seen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--budget-ms", type=float, default=900)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = sorted((profile() for _ in range(args.runs)), key=lambda r: r[0])
+    total, modules, seen = runs[len(runs) // 2]
+    median_ms = statistics.median(r[0] for r in runs) / 1000
+
+    print(f"{'self ms':>9}  module")
+    for us, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"{us / 1000:>9.1f}  {name}")
+    print(f"\nimport app.main: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {runs[0][0] / 1000:.0f}, max {runs[-1][0] / 1000:.0f}); budget {args.budget_ms:.0f} ms")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print("OVER BUDGET")
+        failed = True
+    if seen:
+        print(f"imported eagerly but should be deferred: {', '.join(seen)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
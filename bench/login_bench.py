@@ -0,0 +1,107 @@
+# ─────────────────────────────────────────────
+# bench/login_bench.py
+# ─────────────────────────────────────────────
+"""
+Logins per second: Athena query per login vs. the in-memory credential index.
+
+    python -m bench.login_bench [users] [athena_ms]
+
+The Athena path runs the ``login`` statement through ``AthenaClient`` against
+a stub that finishes every query after *athena_ms* (default 1 500, a typical
+small-table Athena latency; pass 0 for the client-side overhead alone), one
+login at a time as a single worker would.  The index path checks the same
+credentials with ``CredentialIndex.verify``; the last line is
+``sessions.verify`` for the token later requests present.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import sys
+import time
+import timeit
+
+from app.athena_client import AthenaClient
+from app.credentials import CredentialIndex
+from app.result_set import ResultSet
+from app.sessions import issue, verify
+from app.statements import bind
+
+COLUMNS = ["UserId", "AwsUserName", "User", "UserARN", "DashboardId", "Role", "Email", "Region"]
+
+
+def make_rows(n: int) -> ResultSet:
+    return ResultSet(
+        COLUMNS + ["user_password"],
+        [(str(i), f"aws{i}", f"user{i}", f"arn:aws:quicksight:us-east-1:123456789012:user/default/user{i}",
+          f"d{i % 7}", "advisor", f"user{i}@example.com", "us-east-1", f"pw{i}") for i in range(n)],
+    )
+
+
+class StubAthena:
+    """Just enough of the boto3 Athena client for one-row login queries."""
+
+    def __init__(self, latency_ms: float) -> None:
+        self.latency = latency_ms / 1000
+        self.started = {}
+        self.ids = itertools.count()
+
+    def start_query_execution(self, **kw):
+        qid = f"q{next(self.ids)}"
+        self.started[qid] = time.monotonic()
+        return {"QueryExecutionId": qid}
+
+    def get_query_execution(self, QueryExecutionId):
+        done = time.monotonic() - self.started[QueryExecutionId] >= self.latency
+        return {"QueryExecution": {
+            "QueryExecutionId": QueryExecutionId,
+            "Status": {"State": "SUCCEEDED" if done else "RUNNING"},
+            "Statistics": {"TotalExecutionTimeInMillis": self.latency * 1000},
+        }}
+
+    def get_query_results(self, QueryExecutionId, MaxResults, NextToken=None):
+        cell = lambda v: {"VarCharValue": v}
+        return {"ResultSet": {
+            "ResultSetMetadata": {"ColumnInfo": [{"Label": c, "Type": "varchar"} for c in COLUMNS]},
+            "Rows": [{"Data": [cell(c) for c in COLUMNS]},
+                     {"Data": [cell(v) for v in ("1", "aws1", "user1", "arn", "d1", "advisor", "e", "r")]}],
+        }}
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    athena_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 1_500
+
+    athena = AthenaClient(StubAthena(athena_ms))
+    n = 3 if athena_ms else 200
+    start = time.perf_counter()
+
+    async def logins() -> None:
+        for i in range(n):
+            await athena.aquery(bind("login", "user1", "pw1"))
+
+    asyncio.run(logins())
+    athena_rate = n / (time.perf_counter() - start)
+
+    index = CredentialIndex()
+    rows = make_rows(users)
+    load_ms = timeit.timeit(lambda: index.load(rows), number=1) * 1000
+    names = [f"user{i}" for i in range(0, users, max(1, users // 1000))]
+    loops = 20_000
+    ok = timeit.timeit(lambda: index.verify(names[0], "pw0"), number=loops)
+    bad = timeit.timeit(lambda: index.verify("nobody", "x"), number=loops)
+
+    token = issue({"sub": "1", "user": "user1", "role": "advisor"})
+    tok = timeit.timeit(lambda: verify(token), number=loops)
+
+    print(f"{users} users in the role table (index built in {load_ms:.0f} ms)")
+    print(f"{'path':<34}{'logins/s':>12}")
+    print(f"{f'Athena query per login ({athena_ms:.0f} ms)':<34}{athena_rate:>12,.1f}")
+    print(f"{'credential index, valid':<34}{loops / ok:>12,.0f}")
+    print(f"{'credential index, unknown user':<34}{loops / bad:>12,.0f}")
+    print(f"{'session token verify':<34}{loops / tok:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# ─────────────────────────────────────────────
+# bench/result_set_bench.py
+# ─────────────────────────────────────────────
+"""
+list-of-dict vs. ``ResultSet`` for a decoded transactions result.
+
+    python -m bench.result_set_bench [rows]
+
+Reported: heap held by the result, time to build it from decoded columns,
+time to read one field from every row, and time to validate it into
+``List[Transaction]`` (what ``response_model`` does).
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+
+from app.decoding import column_converters, decode_result_rows, to_dicts
+from app.models import Transaction
+from app.result_set import ResultSet
+from bench.decode_bench import make_page
+
+ADAPTER = TypeAdapter(List[Transaction])
+
+
+def _held_kib(build: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def _ms(fn: Callable[[], Any], loops: int) -> float:
+    return min(timeit.repeat(fn, number=loops, repeat=5)) / loops * 1000
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    page = make_page(n)
+    info = page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+    names = [c["Label"] for c in info]
+    columns = decode_result_rows(page["ResultSet"]["Rows"][1:], column_converters(info))
+    del page
+    loops = max(3, 50_000 // n)
+
+    variants = {
+        "list-of-dict": lambda: to_dicts(names, columns),
+        "ResultSet": lambda: ResultSet.from_columns(names, columns),
+    }
+    print(f"{n} rows x {len(names)} columns")
+    print(
+        f"{'representation':<15}{'held KiB':>10}{'build ms':>10}{'scan ms':>9}"
+        f"{'validate ms':>13}{'build+validate':>16}"
+    )
+    for name, build in variants.items():
+        held = _held_kib(build)
+        rows = build()
+        build_ms = _ms(build, loops)
+        scan_ms = _ms(lambda: [r["amount"] for r in rows], loops)
+        validate_ms = _ms(lambda: ADAPTER.validate_python(rows), loops)
+        print(
+            f"{name:<15}{held:>10.0f}{build_ms:>10.2f}{scan_ms:>9.2f}"
+            f"{validate_ms:>13.2f}{build_ms + validate_ms:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
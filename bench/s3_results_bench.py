@@ -0,0 +1,143 @@
+# ─────────────────────────────────────────────
+# bench/s3_results_bench.py
+# ─────────────────────────────────────────────
+"""
+The S3 bulk path for big results: same rows as ``GetQueryResults``, faster.
+
+    python -m bench.s3_results_bench [rows] [--latency-ms 20]
+
+:class:`bench.fakes.FakeAthena` writes its results to a
+:class:`bench.fakes.FakeS3` as Athena does (every value quoted, NULL as an
+empty unquoted field).  The rows are awkward on purpose: commas, quotes,
+values spanning lines (``\\n`` and ``\\r\\n``), multi-byte characters,
+empty strings next to NULLs, numbers and booleans.
+
+Checks, any mismatch fails the run:
+
+* :class:`~app.s3_results.S3ResultReader` alone, with parts from 1 byte to
+  the whole object (so part edges land inside quotes, line breaks and
+  UTF-8 sequences) and with ``skip``, against the rows as written;
+* :meth:`AthenaClient.query` with ``S3_BULK_MIN_BYTES`` at the object size
+  (bulk path: S3 GETs) and one byte above it (``GetQueryResults`` only),
+  which must decode to identical rows.
+
+Then the time for both paths with ``--latency-ms`` per API call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List, Optional, Tuple
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("ATHENA_DB", "bench")
+os.environ.setdefault("ATHENA_OUTPUT", "s3://bench/results/")
+os.environ.setdefault("SESSION_SECRET", "bench")
+os.environ.setdefault("ATHENA_POLL_INITIAL_MS", "1")
+os.environ.setdefault("S3_BULK_PART_SIZE", str(64 * 1024))
+
+from app.athena_admission import AdmissionScheduler
+from app.athena_client import AthenaClient
+from app.config import settings
+from app.s3_results import S3ResultReader
+from bench.fakes import FakeAthena, FakeS3, _Execution
+
+COLUMNS = ["label", "note", "amount", "age", "active"]
+TYPES = {"amount": "double", "age": "integer", "active": "boolean"}
+NOTES: List[Optional[str]] = [
+    "plain",
+    "comma, inside",
+    'say "hi"',
+    '""',
+    "",
+    None,
+    "two\nlines",
+    'quoted "\nand, split\r\nthree ways',
+    "naïve – 日本語 – 💶",
+    ",",
+    '"',
+    "\n",
+]
+
+
+def tricky_row(i: int) -> List[Optional[str]]:
+    note = NOTES[i % len(NOTES)]
+    return [
+        f"row {i}" if i % 7 else "",
+        note,
+        None if i % 5 == 0 else f"{(i * 37.5) % 10_000:.2f}",
+        None if i % 11 == 0 else str(i % 90),
+        ("true", "false", None)[i % 3],
+    ]
+
+
+class TrickyAthena(FakeAthena):
+    def rows(self, ex: _Execution, start: int, stop: int) -> List[List[Optional[str]]]:
+        return [tricky_row(i) for i in range(start, stop)]
+
+    def column_type(self, column: str) -> str:
+        return TYPES.get(column, "varchar")
+
+
+def execute(athena: FakeAthena, rows: int) -> Tuple[str, str, int]:
+    """SQL for *rows* rows, and the URI and size of its result CSV."""
+    sql = f"SELECT {', '.join(COLUMNS)} FROM tricky LIMIT {rows}"
+    qid = athena.start_query_execution(QueryString=sql)["QueryExecutionId"]
+    uri = athena.get_query_execution(qid)["QueryExecution"]["ResultConfiguration"]["OutputLocation"]
+    return sql, uri, len(athena.s3.objects[tuple(uri[5:].split("/", 1))])
+
+
+def check_reader(athena: FakeAthena, rows: int) -> None:
+    _, uri, size = execute(athena, rows)
+    expected = [tricky_row(i) for i in range(rows)]
+    for part_size in (1, 7, 61, 4096, size):
+        reader = S3ResultReader(athena.s3, part_size=part_size, concurrency=4)
+        got = list(reader.iter_rows(uri))
+        assert got == expected, f"part size {part_size}: rows differ"
+        got = list(reader.iter_rows(uri, skip=13))
+        assert got == expected[13:], f"part size {part_size}, skip 13: rows differ"
+    print(f"reader: {rows} rows match at part sizes 1, 7, 61, 4096 and {size}")
+
+
+def run(athena: FakeAthena, s3: FakeS3, sql: str, rows: int, min_bytes: int):
+    settings.s3_bulk_min_bytes = min_bytes
+    client = AthenaClient(athena, s3=s3, admission=AdmissionScheduler(0))
+    before = s3.calls.get("GetObject", 0)
+    started = time.perf_counter()
+    result = client.query(sql, ttl=0, max_rows=rows)
+    return result.to_dicts(), time.perf_counter() - started, s3.calls.get("GetObject", 0) - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rows", type=int, nargs="?", default=20_000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    s3 = FakeS3()
+    athena = TrickyAthena(queue_ms=0, engine_ms=0, result_rows=args.rows, s3=s3)
+    check_reader(athena, 500)
+
+    sql, _, size = execute(athena, args.rows)
+    bulk, _, gets = run(athena, s3, sql, args.rows, size)
+    paged, _, none = run(athena, s3, sql, args.rows, size + 1)
+    assert gets > 0, "S3_BULK_MIN_BYTES = size did not take the bulk path"
+    assert none == 0, "S3_BULK_MIN_BYTES = size + 1 still read S3"
+    assert len(bulk) == args.rows and bulk == paged, "bulk and GetQueryResults rows differ"
+    print(f"client: {args.rows} rows, {size / 1024:.0f} KiB CSV, identical on both sides of "
+          f"S3_BULK_MIN_BYTES ({gets} ranged GETs)")
+
+    s3.latency_ms = args.latency_ms
+    results = athena.get_query_results
+    athena.get_query_results = lambda **kw: (time.sleep(args.latency_ms / 1000), results(**kw))[1]
+    print(f"\n{args.latency_ms:.0f} ms per API call")
+    print(f"{'path':<20}{'seconds':>10}")
+    for name, min_bytes in (("GetQueryResults", size + 1), ("S3 bulk", size)):
+        _, seconds, _ = run(athena, s3, sql, args.rows, min_bytes)
+        print(f"{name:<20}{seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
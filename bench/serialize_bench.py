@@ -0,0 +1,109 @@
+# ─────────────────────────────────────────────
+# bench/serialize_bench.py
+# ─────────────────────────────────────────────
+"""
+CPU to turn a page of transactions into a JSON response body.
+
+    python -m bench.serialize_bench [rows]
+
+All paths start from the ``ResultSet`` the Athena client hands the router
+and produce the same bytes.  Reported per 1 000 rows:
+
+* ``response_model``: what FastAPI does for ``response_model=List[Transaction]``
+  – one model per row, dumped back to dicts, then ``json.dumps``;
+* ``response_model, dump_json``: the same models serialized by pydantic-core
+  (newer FastAPI releases);
+* ``RowsResponse``: :func:`app.serialization.dump_rows`, one list-level
+  validate and one ``dump_json``, no models.
+
+Then the whole :class:`~app.serialization.RowsResponse` per request, for a
+browser sending ``Accept-Encoding: gzip``: the first response for a result
+(serialize, hash, compress), a repeat of a result still in the query cache,
+and a repeat revalidated with ``If-None-Match`` (304).
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.decoding import column_converters, decode_result_rows
+from app.models import Transaction
+from app.result_set import ResultSet
+from app.serialization import RowsResponse, dump_rows
+from bench.decode_bench import make_page
+
+ADAPTER = TypeAdapter(List[Transaction])
+
+
+def _ms(fn: Callable[[], Any], loops: int) -> float:
+    return min(timeit.repeat(fn, number=loops, repeat=5)) / loops * 1000
+
+
+def response_model(rows: ResultSet) -> bytes:
+    models = ADAPTER.validate_python(rows)
+    return json.dumps(
+        ADAPTER.dump_python(models, mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def response_model_dump_json(rows: ResultSet) -> bytes:
+    return ADAPTER.dump_json(ADAPTER.validate_python(rows))
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def responses(rows: ResultSet, loops: int) -> None:
+    n = len(rows)
+    browser = _request(accept_encoding="gzip, deflate, br")
+    first = RowsResponse(rows, Transaction, browser)
+    revalidate = _request(accept_encoding="gzip, deflate, br", if_none_match=first.headers["etag"])
+    fresh = lambda: RowsResponse(ResultSet(rows.columns, rows.tuples), Transaction, browser)
+    variants = {
+        "first response": fresh,
+        "repeat, cached result": lambda: RowsResponse(rows, Transaction, browser),
+        "repeat, 304": lambda: RowsResponse(rows, Transaction, revalidate),
+    }
+    print(f"\nRowsResponse, gzip: {len(first.body) / 1024:.0f} KiB on the wire")
+    print(f"{'request':<28}{'ms / 1000 rows':>15}{'status':>8}")
+    for name, fn in variants.items():
+        ms = _ms(fn, loops) / n * 1000
+        print(f"{name:<28}{ms:>15.3f}{fn().status_code:>8}")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    page = make_page(n)
+    info = page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+    rows = ResultSet.from_columns(
+        [c["Label"] for c in info], decode_result_rows(page["ResultSet"]["Rows"][1:], column_converters(info))
+    )
+    loops = max(3, 20_000 // n)
+
+    variants = {
+        "response_model": response_model,
+        "response_model, dump_json": response_model_dump_json,
+        "RowsResponse": lambda r: dump_rows(r, Transaction),
+    }
+    expected = response_model(rows)
+    print(f"{n} rows, {len(expected) / 1024:.0f} KiB of JSON")
+    print(f"{'path':<28}{'ms / 1000 rows':>15}{'speed-up':>10}")
+    base = None
+    for name, fn in variants.items():
+        assert fn(rows) == expected, f"{name} writes different JSON"
+        ms = _ms(lambda: fn(rows), loops) / n * 1000
+        base = base or ms
+        print(f"{name:<28}{ms:>15.2f}{base / ms:>9.1f}x")
+    responses(rows, loops)
+
+
+if __name__ == "__main__":
+    main()
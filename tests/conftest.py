@@ -0,0 +1,15 @@
+# ─────────────────────────────────────────────
+# tests/conftest.py
+# ─────────────────────────────────────────────
+"""
+Settings the app needs at import time, set before any test imports it.
+
+    python -m pytest -q
+"""
+
+import os
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("ATHENA_DB", "test")
+os.environ.setdefault("ATHENA_OUTPUT", "s3://test/results/")
+os.environ.setdefault("SESSION_SECRET", "test")
@@ -0,0 +1,32 @@
+# ─────────────────────────────────────────────
+# tests/test_answer_cache.py
+# ─────────────────────────────────────────────
+from app.answer_cache import AnswerCache, jaccard, normalize_question, shingles
+
+WELL = "Which funds are performing well for retirement clients?"
+NOT_WELL = "Which funds are not performing well for retirement clients?"
+
+
+def _similarity(a: str, b: str) -> float:
+    return jaccard(shingles(normalize_question(a)), shingles(normalize_question(b)))
+
+
+def test_near_duplicate_is_served():
+    cache = AnswerCache(threshold=0.85)
+    cache.put(WELL, "answer", cost=1.0)
+    assert cache.get("which funds performing well for retirement client") == "answer"
+    assert cache.fuzzy_hits == 1
+
+
+def test_negation_is_not_a_near_duplicate():
+    assert _similarity(WELL, NOT_WELL) >= 0.85  # close enough to be a candidate
+    cache = AnswerCache(threshold=0.85)
+    cache.put(WELL, "well", cost=1.0)
+    assert cache.get(NOT_WELL) is None
+    assert cache.get("Which funds aren't performing well for retirement clients?") is None
+    assert cache.get("Which funds are performing well for non-retirement clients?") is None
+
+
+def test_polarity_words_are_kept():
+    assert normalize_question("Which are the best funds?") == "best funds"
+    assert normalize_question("Which are not the best funds?") == "not best funds"
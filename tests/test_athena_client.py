@@ -0,0 +1,50 @@
+# ─────────────────────────────────────────────
+# tests/test_athena_client.py
+# ─────────────────────────────────────────────
+import pytest
+
+from app.athena_admission import AdmissionScheduler
+from app.athena_client import AthenaClient
+
+
+class _Athena:
+    """Answers every statement with *rows* as its result, no header added."""
+
+    def __init__(self, statement_type, rows, labels):
+        self.statement_type = statement_type
+        self.rows = rows
+        self.labels = labels
+
+    def start_query_execution(self, **_):
+        return {"QueryExecutionId": "q1"}
+
+    def get_query_execution(self, QueryExecutionId):
+        return {"QueryExecution": {
+            "QueryExecutionId": QueryExecutionId,
+            "StatementType": self.statement_type,
+            "Status": {"State": "SUCCEEDED"},
+        }}
+
+    def get_query_results(self, QueryExecutionId, MaxResults=1000, NextToken=None):
+        return {"ResultSet": {
+            "ResultSetMetadata": {"ColumnInfo": [
+                {"Label": label, "Name": label, "Type": "varchar"} for label in self.labels
+            ]},
+            "Rows": [{"Data": [{"VarCharValue": v} for v in row]} for row in self.rows],
+        }}
+
+
+def _query(statement_type, rows, labels=("tab_name",)):
+    athena = AthenaClient(_Athena(statement_type, rows, list(labels)), admission=AdmissionScheduler(0))
+    return [tuple(r) for r in athena.query("SHOW TABLES", ttl=0).tuples]
+
+
+def test_utility_results_keep_their_first_row():
+    assert _query("UTILITY", [["tab_name"], ["b"]]) == [("tab_name",), ("b",)]
+
+
+@pytest.mark.parametrize("first", [["name"], ["alice"]])
+def test_query_results_drop_only_the_header(first):
+    # a data row equal to the labels is still data
+    rows = _query("DML", [["name"], first, ["bob"]], labels=("name",))
+    assert rows == [tuple(first), ("bob",)]
@@ -0,0 +1,27 @@
+# ─────────────────────────────────────────────
+# tests/test_compaction.py
+# ─────────────────────────────────────────────
+from app.compaction import COMPACTIONS, plan
+from app.config import settings
+from app.result_set import ResultSet
+
+OLD, ORPHAN = "transactions_parquet_v20240101000000", "transactions_parquet_v20240201000000"
+
+
+class _Athena:
+    """Two built versions; the view still reads the older one (the newer build failed)."""
+
+    def query(self, sql, ttl=None):
+        if sql.startswith("SHOW TABLES"):
+            return ResultSet(("tab_name",), [(ORPHAN,), (OLD,)])
+        if "information_schema.views" in sql:
+            return ResultSet(("view_definition",), [(f'SELECT * FROM "{OLD}"',)])
+        if sql.startswith("SELECT max("):
+            return ResultSet(("_col0",), [("2024-01-31",)])
+        return ResultSet(("_col0", "_col1"), [("2024-02", "2024-02")])
+
+
+def test_append_targets_the_table_the_view_reads(monkeypatch):
+    monkeypatch.setattr(settings, "compaction_location", "s3://test/compacted/")
+    statements = plan(_Athena(), COMPACTIONS["transactions"])
+    assert statements and all(s.startswith(f"INSERT INTO {OLD} ") for s in statements)
@@ -0,0 +1,40 @@
+# ─────────────────────────────────────────────
+# tests/test_detail_models.py
+# ─────────────────────────────────────────────
+import pytest
+from fastapi.testclient import TestClient
+
+from app.deps import get_athena_client, get_snapshot
+from app.main import app
+from app.result_set import ResultSet
+
+COLUMNS = ("id", "age", "rate", "active", "aum", "note")
+ROW = ("7", 42, 1.5, True, 1e8, None)
+
+
+class _Snapshot:
+    def lookup(self, table, column, value, columns=()):
+        return ResultSet(COLUMNS, [ROW])
+
+
+class _Athena:
+    async def aquery(self, query, **_):
+        return ResultSet(("product_name",), [("Fund A",)])
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_snapshot] = _Snapshot
+    app.dependency_overrides[get_athena_client] = _Athena
+    yield TestClient(app)  # no lifespan: nothing reaches AWS
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/advisors/7", "/clients/7"])
+def test_detail_extras_are_strings(client, path):
+    body = client.get(path).json()
+    assert {k: body[k] for k in COLUMNS} == {
+        "id": "7", "age": "42", "rate": "1.5", "active": "true", "aum": "1.0E8", "note": None,
+    }
+    if path.startswith("/clients"):
+        assert body["funds"] == ["Fund A"]
@@ -0,0 +1,42 @@
+# ─────────────────────────────────────────────
+# tests/test_pagination.py
+# ─────────────────────────────────────────────
+import asyncio
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.deps import get_athena_client
+from app.main import app
+from app.pagination import NEXT_CURSOR_HEADER, Keyset, paginate
+from app.result_set import ResultSet
+
+
+class _Athena:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    async def apage(self, sql, limit, *, resume=None):
+        return ResultSet(("client_id",), [(r,) for r in self.rows[:limit]]), "q1", None
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_athena_client] = _Athena
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/clients/", "/content/", "/transactions/"])
+@pytest.mark.parametrize("limit", [0, -1, settings.page_max_limit + 1])
+def test_out_of_range_limit_is_rejected(client, path, limit):
+    assert client.get(path, params={"limit": limit}).status_code == 422
+
+
+def test_empty_page_has_no_cursor():
+    response = Response()
+    pages = Keyset("clients_list", "clients_list_after", ("client_id",), "clients")
+    rows = asyncio.run(paginate(_Athena(), pages, (), 0, None, response))
+    assert len(rows) == 0 and NEXT_CURSOR_HEADER not in response.headers
@@ -0,0 +1,52 @@
+# ─────────────────────────────────────────────
+# tests/test_quicksight_embed.py
+# ─────────────────────────────────────────────
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import quicksight_embed
+
+BODY = {
+    "dashboardid": "dash-1",
+    "userarn": "arn:aws:quicksight:us-east-1:123456789012:user/default/alice",
+}
+
+
+class _QuickSight:
+    """Every call mints a new one-time URL, as the real API does."""
+
+    def __init__(self):
+        self.codes = itertools.count()
+        self.lock = threading.Lock()
+
+    def generate_embed_url_for_registered_user(self, **_):
+        time.sleep(0.05)  # long enough for concurrent requests to overlap
+        with self.lock:
+            code = next(self.codes)
+        return {"EmbedUrl": f"https://quicksight.local/embed?code={code}"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(quicksight_embed, "qs", _QuickSight())
+    monkeypatch.setattr(quicksight_embed, "env_snapshot", lambda: {})
+    return TestClient(app)
+
+
+def test_embed_url_is_never_served_twice(client):
+    def url():
+        response = client.post("/dashBoardEmbeddedUrl", json=BODY)
+        assert response.status_code == 200
+        return response.json()["embedUrl"]
+
+    sequential = [url(), url()]  # e.g. a reload
+    with ThreadPoolExecutor(4) as pool:  # e.g. several tabs at once
+        concurrent = list(pool.map(lambda _: url(), range(4)))
+    urls = sequential + concurrent
+    assert len(set(urls)) == len(urls)